@@ -0,0 +1,98 @@
+"""
+Content-addressed store for uploaded videos: each distinct upload is kept
+once, as data/blobs/<sha256[:2]>/<sha256>.
+
+Sessions keep their own data/sessions/<id>/raw.mp4, as a hard link to the
+blob, so every reader of `Session.video_path` is unchanged. Writers must
+replace a shared file (write a temp file, then `os.replace`) rather than
+rewrite it in place; the transcode step and all result writers already do.
+A blob whose link count drops to one is referenced by no session and is
+removed by `release` or `prune`.
+
+Where hard links are unavailable (another filesystem, some network mounts)
+sessions fall back to private copies.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+
+def blob_path(root: Path, sha256: str) -> Path:
+  return root / sha256[:2] / sha256
+
+
+def link_file(src: Path, dst: Path) -> bool:
+  """
+  Make `dst` a hard link to `src`, replacing it atomically. Falls back to a
+  copy and returns False when the filesystem cannot link them.
+  """
+  tmp_path = dst.with_name(dst.name + ".link")
+  tmp_path.unlink(missing_ok=True)
+  try:
+    try:
+      os.link(src, tmp_path)
+      linked = True
+    except OSError:
+      shutil.copyfile(src, tmp_path)
+      linked = False
+    os.replace(tmp_path, dst)
+  finally:
+    tmp_path.unlink(missing_ok=True)
+  return linked
+
+
+def store(root: Path, path: Path, sha256: str) -> bool:
+  """
+  Add the file at `path`, whose content hashes to `sha256`, to the store.
+  If the blob already exists `path` is replaced by a link to it and its
+  duplicate bytes are freed. Returns whether `path` now shares the blob.
+  """
+  blob = blob_path(root, sha256)
+  blob.parent.mkdir(parents=True, exist_ok=True)
+  if not blob.is_file():
+    try:
+      os.link(path, blob)
+      return True
+    except FileExistsError:
+      pass  # stored concurrently by another upload of the same video
+    except OSError:
+      return False
+  if os.path.samefile(blob, path):
+    return True
+  tmp_path = path.with_name(path.name + ".link")
+  try:
+    os.link(blob, tmp_path)
+    os.replace(tmp_path, path)
+  except OSError:
+    return False
+  finally:
+    tmp_path.unlink(missing_ok=True)
+  return True
+
+
+def release(root: Path, sha256: str) -> None:
+  """Remove the blob once no session links to it."""
+  blob = blob_path(root, sha256)
+  try:
+    if blob.stat().st_nlink <= 1:
+      blob.unlink()
+  except FileNotFoundError:
+    pass
+
+
+def prune(root: Path) -> int:
+  """
+  Remove every unreferenced blob, e.g. one left behind when its only session
+  was transcoded to a new file. Returns the number removed.
+  """
+  removed = 0
+  if not root.is_dir():
+    return removed
+  for blob in root.glob("??/*"):
+    if blob.is_file() and blob.stat().st_nlink <= 1:
+      blob.unlink(missing_ok=True)
+      removed += 1
+  return removed
@@ -8,14 +8,41 @@ class Settings(BaseSettings):
   redis_url: str = "redis://localhost:6379/0"
   data_root: Path = Path("data") / "sessions"
   process_fps: float = 10.0
+  frame_source: str = "opencv"
+  frame_source_long_side: int = 0
+  decode_mode: str = "grab"
+  prefetch_frames: int = 8
   detector_min_conf: float = 0.4
   detector_type: str = "yolov8n"
   detector_model: str = "yolov8n.pt"
   detector_device: str = "cpu"
   detector_imgsz: int = 640
+  detector_batch_size: int = 8
+  detector_threads: int = 0
+  onnx_quantized: bool = False
+  motion_gate_threshold: float = 0.0
+  motion_gate_max_skip: int = 10
+  roi_inference: bool = False
+  roi_imgsz: int = 320
+  roi_expand: float = 1.0
+  roi_refresh_interval: int = 30
+  adaptive_sampling: bool = False
+  adaptive_max_multiplier: int = 4
+  adaptive_still_speed: float = 0.02
+  adaptive_fast_speed: float = 0.15
+  adaptive_min_iou: float = 0.5
   tracker_type: str = "single-target-iou"
   max_gap_frames: int = 5
   processing_timeout_seconds: int = 1800
+  parallel_workers: int = 0
+  detection_cache: bool = True
+  reuse_results: bool = True
+  sweep_workers: int = 0
+  stream_results: bool = False
+  stream_chunk_size: int = 4096
+  progress_interval_seconds: float = 2.0
+  checkpoint_interval_seconds: float = 60.0
+  upload_chunk_bytes: int = 8 * 1024 * 1024
 
   class Config:
     env_prefix = "BACKEND_"
@@ -11,4 +11,8 @@ def init_db() -> None:
   from . import models  # noqa: F401
 
   Base.metadata.create_all(bind=engine)
+  # create_all skips tables that already exist, including their indexes.
+  for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+      index.create(bind=engine, checkfirst=True)
 
@@ -0,0 +1,128 @@
+"""
+Conditional requests and pre-compressed bodies for immutable responses.
+
+Result files are written once per completed job, so each gets `.gz` (and,
+with the optional `brotli` package, `.br`) siblings at the same time, and
+requests are answered with whichever variant the client accepts. ETags are
+derived from the result version plus the representation, never from the
+body, so checking `If-None-Match` costs no file or payload reads.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+try:
+  import brotli
+except ImportError:  # optional: pip install -e ".[compression]"
+  brotli = None
+
+
+# Preferred first; brotli only when the package is installed.
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_CHUNK_BYTES = 1 << 20
+
+
+def write_compressed_variants(path: Path) -> None:
+  """Write `path`.gz and `path`.br next to `path`, streaming the file."""
+  gz_path = path.with_name(path.name + ".gz")
+  tmp_path = gz_path.with_name(gz_path.name + ".tmp")
+  # mtime=0 keeps the bytes identical for identical input.
+  with path.open("rb") as src, gzip.GzipFile(tmp_path, "wb", compresslevel=6, mtime=0) as dst:
+    shutil.copyfileobj(src, dst, _CHUNK_BYTES)
+  os.replace(tmp_path, gz_path)
+
+  br_path = path.with_name(path.name + ".br")
+  if brotli is None:
+    br_path.unlink(missing_ok=True)
+    return
+  tmp_path = br_path.with_name(br_path.name + ".tmp")
+  compressor = brotli.Compressor(quality=5)
+  with path.open("rb") as src, tmp_path.open("wb") as dst:
+    while chunk := src.read(_CHUNK_BYTES):
+      dst.write(compressor.process(chunk))
+    dst.write(compressor.finish())
+  os.replace(tmp_path, br_path)
+
+
+def remove_variants(path: Path) -> None:
+  for suffix in ("", *ENCODING_SUFFIXES.values()):
+    path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _accepted_encodings(request: Request) -> set[str]:
+  accepted = set()
+  for part in request.headers.get("accept-encoding", "").split(","):
+    name, _, params = part.strip().partition(";")
+    quality = params.strip()
+    if quality.startswith("q="):
+      try:
+        if float(quality[2:]) <= 0.0:
+          continue
+      except ValueError:
+        continue
+    if name:
+      accepted.add(name.strip().lower())
+  return accepted
+
+
+def make_etag(*parts: Any) -> str:
+  digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8"))
+  return f'"{digest.hexdigest()[:32]}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+  """`If-None-Match` check with the weak comparison RFC 9110 prescribes for it."""
+  header = request.headers.get("if-none-match")
+  if not header:
+    return False
+  if header.strip() == "*":
+    return True
+  return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+  # no-cache: clients may store the body but must revalidate, which is a 304.
+  return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+
+
+def not_modified_response(etag: str) -> Response:
+  return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cached_file_response(
+  request: Request,
+  path: Path,
+  media_type: str,
+  version: str,
+) -> Response:
+  """
+  Serve `path` (or a pre-compressed sibling the client accepts) with an ETag
+  derived from `version` and the variant, or 304 when the client has it.
+  """
+  accepted = _accepted_encodings(request)
+  encoding: Optional[str] = None
+  for name, suffix in ENCODING_SUFFIXES.items():
+    if name in accepted and path.with_name(path.name + suffix).is_file():
+      encoding = name
+      break
+  etag = make_etag(version, path.name, encoding or "identity")
+  if not_modified(request, etag):
+    return not_modified_response(etag)
+  headers = cache_headers(etag)
+  if encoding is None:
+    return FileResponse(path, media_type=media_type, headers=headers)
+  headers["Content-Encoding"] = encoding
+  return FileResponse(
+    path.with_name(path.name + ENCODING_SUFFIXES[encoding]),
+    media_type=media_type,
+    headers=headers,
+  )
@@ -1,13 +1,28 @@
+import base64
+import os
 import shutil
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List
-
-from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile, status
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+from fastapi import (
+  Depends,
+  FastAPI,
+  File,
+  HTTPException,
+  Query,
+  Request,
+  Response,
+  UploadFile,
+  status,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.params import Form
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, contains_eager
 from redis import Redis
 from rq import Queue, Worker
 from rq.command import send_stop_job_command
@@ -18,12 +33,19 @@ import json
 
 from .config import settings
 from .database import SessionLocal, init_db
-from . import models, schemas
-from .worker import process_job
+from . import blob_store, fast_json, http_cache, models, results_files, schemas, uploads
+from .processing import tracking_binary
+from .processing.detection_cache import result_config_sha256
+from .processing.schemas import ProcessingConfig
+from .processing.sweep import variant_config
+from .processing.windowing import window_columns
+from .worker import process_job, process_sweep, processing_config
 
 # Resolve session video path from backend dir so it works regardless of process cwd
 _BACKEND_DIR = Path(__file__).resolve().parent.parent
 _SESSION_VIDEO_ROOT = _BACKEND_DIR / "data" / "sessions"
+_UPLOAD_ROOT = _BACKEND_DIR / "data" / "uploads"
+_BLOB_ROOT = _BACKEND_DIR / "data" / "blobs"
 
 
 def _session_video_path(session) -> Path | None:
@@ -56,6 +78,7 @@ app.add_middleware(
   allow_credentials=True,
   allow_methods=["*"],
   allow_headers=["*"],
+  expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -64,6 +87,7 @@ def on_startup() -> None:
   settings.data_root.mkdir(parents=True, exist_ok=True)
   _SESSION_VIDEO_ROOT.mkdir(parents=True, exist_ok=True)
   init_db()
+  blob_store.prune(_BLOB_ROOT)
 
 
 def _generate_session_id() -> str:
@@ -74,6 +98,30 @@ def _generate_job_id() -> str:
   return f"job-{uuid.uuid4().hex[:8]}"
 
 
+def _generate_sweep_id() -> str:
+  return f"sweep-{uuid.uuid4().hex[:8]}"
+
+
+def _generate_upload_id() -> str:
+  return f"upload-{uuid.uuid4().hex}"
+
+
+def _sweep_response(sweep: models.SweepJob) -> schemas.SweepResponse:
+  result = sweep.result if isinstance(sweep.result, dict) else {}
+  return schemas.SweepResponse(
+    id=sweep.sweep_id,
+    status=sweep.status,
+    progress=sweep.progress,
+    sessionId=sweep.session.session_id,
+    createdAt=sweep.created_at,
+    startedAt=sweep.started_at,
+    finishedAt=sweep.finished_at,
+    error=sweep.error,
+    results=result.get("results", []),
+    diagnostics=result.get("diagnostics", {}),
+  )
+
+
 @app.post("/sessions/import", response_model=schemas.ImportSessionResponse, status_code=201)
 async def import_session(
   video: UploadFile = File(...),
@@ -91,9 +139,7 @@ async def import_session(
   session_dir.mkdir(parents=True, exist_ok=True)
 
   raw_path = session_dir / "raw.mp4"
-  with raw_path.open("wb") as buffer:
-    content = await video.read()
-    buffer.write(content)
+  video_sha256, video_bytes = await uploads.save_upload(video, raw_path)
 
   metadata_obj: dict | None = None
   if metadata:
@@ -102,7 +148,29 @@ async def import_session(
     except json.JSONDecodeError:
       metadata_obj = None
 
+  return _create_session(db, session_id, raw_path, metadata_obj, video_sha256, video_bytes)
+
+
+def _create_session(
+  db: Session,
+  session_id: str,
+  raw_path: Path,
+  metadata_obj: dict | None,
+  video_sha256: str,
+  video_bytes: int,
+) -> schemas.ImportSessionResponse:
+  """
+  Create the session and its processing job for an uploaded video, and
+  enqueue the job unless an identical upload already has a result to reuse.
+  """
   name = metadata_obj.get("sessionName") if isinstance(metadata_obj, dict) else None
+  if metadata_obj is None or isinstance(metadata_obj, dict):
+    metadata_obj = {
+      **(metadata_obj or {}),
+      "videoSha256": video_sha256,
+      "videoBytes": video_bytes,
+    }
+  blob_store.store(_BLOB_ROOT, raw_path, video_sha256)
 
   db_session = models.Session(
     session_id=session_id,
@@ -124,6 +192,10 @@ async def import_session(
     created_at=datetime.utcnow(),
   )
   db.add(job)
+  if settings.reuse_results and _reuse_tracking_result(db, db_session, job, video_sha256):
+    db.commit()
+    blob_store.release(_BLOB_ROOT, video_sha256)
+    return schemas.ImportSessionResponse(jobId=job_id, sessionId=session_id)
   db.commit()
 
   # Enqueue job for background processing
@@ -143,17 +215,246 @@ async def import_session(
   return schemas.ImportSessionResponse(jobId=job_id, sessionId=session_id)
 
 
-@app.get("/jobs/{job_id}", response_model=schemas.JobResponse)
-def get_job(job_id: str, db: Session = Depends(get_db)) -> schemas.JobResponse:
-  job = (
-    db.query(models.ProcessingJob)
-    .filter(models.ProcessingJob.job_id == job_id)
-    .join(models.Session)
+def _reuse_tracking_result(
+  db: Session,
+  db_session: models.Session,
+  job: models.ProcessingJob,
+  video_sha256: str,
+) -> bool:
+  """
+  Complete `job` with the result of an earlier session that processed the
+  same upload with the same settings, sharing its video and result files by
+  hard link. Returns False when there is no such result on disk.
+  """
+  config_sha256 = result_config_sha256(processing_config())
+  match = (
+    db.query(models.InstructorTrackingResult, models.Session)
+    .join(
+      models.ResultFingerprint,
+      models.ResultFingerprint.result_id == models.InstructorTrackingResult.id,
+    )
+    .join(models.Session, models.Session.id == models.InstructorTrackingResult.session_id)
+    .filter(
+      models.ResultFingerprint.video_sha256 == video_sha256,
+      models.ResultFingerprint.config_sha256 == config_sha256,
+      models.Session.status == "completed",
+    )
+    .order_by(models.ResultFingerprint.created_at.desc())
     .first()
   )
-  if not job:
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+  if match is None:
+    return False
+  source, source_session = match
+  source_video = _session_video_path(source_session)
+  source_dir = Path(source_session.video_path).parent / "results"
+  summary = source.summary
+  if (
+    source_video is None
+    or summary is None
+    or not (source_dir / results_files.TRACKING_JSON).is_file()
+  ):
+    return False
+
+  raw_path = Path(db_session.video_path)
+  results_files.link_results(source_dir, raw_path.parent / "results")
+  # The earlier session's video may have been transcoded for browsers; share that one.
+  blob_store.link_file(source_video, raw_path)
+
+  # Stored like a streamed result: the header here, frames and points in results/.
+  header = (
+    db.query(
+      func.json_remove(
+        models.InstructorTrackingResult.payload, "$.frameDetections", "$.trackPoints"
+      )
+    )
+    .filter(models.InstructorTrackingResult.id == source.id)
+    .scalar()
+  )
+  now = datetime.utcnow()
+  tracking = models.InstructorTrackingResult(
+    session_id=db_session.id,
+    payload={
+      **fast_json.loads(header),
+      "resultsFile": results_files.TRACKING_JSON,
+      "frameCount": summary.frame_count,
+      "pointCount": summary.point_count,
+    },
+    created_at=now,
+  )
+  tracking.summary = models.TrackingResultSummary(
+    version=summary.version,
+    frame_count=summary.frame_count,
+    point_count=summary.point_count,
+    byte_size=summary.byte_size,
+    derived_metrics=summary.derived_metrics,
+    created_at=now,
+  )
+  tracking.fingerprint = models.ResultFingerprint(
+    video_sha256=video_sha256, config_sha256=config_sha256, created_at=now
+  )
+  db.add(tracking)
+
+  db_session.video_width = source_session.video_width
+  db_session.video_height = source_session.video_height
+  db_session.fps = source_session.fps
+  db_session.status = "completed"
+  if isinstance(db_session.metadata_json, dict):
+    source_meta = (
+      source_session.metadata_json if isinstance(source_session.metadata_json, dict) else {}
+    )
+    db_session.metadata_json = {
+      **db_session.metadata_json,
+      "processingDiagnostics": source_meta.get("processingDiagnostics"),
+      "reusedResultFrom": source_session.session_id,
+    }
+  job.status = "completed"
+  job.progress = 1.0
+  job.started_at = now
+  job.finished_at = now
+  return True
+
+
+def _get_upload(db: Session, upload_id: str) -> models.Upload:
+  upload = db.query(models.Upload).filter(models.Upload.upload_id == upload_id).first()
+  if not upload:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+  return upload
+
+
+def _upload_status(upload: models.Upload) -> schemas.UploadStatus:
+  data_path = _UPLOAD_ROOT / upload.upload_id / uploads.UPLOAD_DATA
+  return schemas.UploadStatus(
+    uploadId=upload.upload_id,
+    offset=data_path.stat().st_size if data_path.is_file() else 0,
+    size=upload.total_bytes,
+    chunkSize=settings.upload_chunk_bytes,
+  )
+
+
+@asynccontextmanager
+async def _hold_upload(
+  upload_id: str, data_path: Path
+) -> AsyncIterator[tuple[uploads.UploadState, BinaryIO]]:
+  try:
+    async with uploads.hold(upload_id, data_path) as held:
+      yield held
+  except FileNotFoundError:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+
+
+@app.post("/uploads", response_model=schemas.UploadStatus, status_code=201)
+def create_upload(
+  body: schemas.CreateUploadRequest, db: Session = Depends(get_db)
+) -> schemas.UploadStatus:
+  """
+  Start a resumable upload. Send the file with `PUT /uploads/{id}?offset=`
+  in chunks, then `POST /uploads/{id}/complete` to create the session.
+  """
+  upload_id = _generate_upload_id()
+  upload_dir = _UPLOAD_ROOT / upload_id
+  upload_dir.mkdir(parents=True, exist_ok=True)
+  (upload_dir / uploads.UPLOAD_DATA).touch()
+  upload = models.Upload(
+    upload_id=upload_id,
+    filename=body.filename,
+    total_bytes=body.size,
+    metadata_json=body.metadata,
+    created_at=datetime.utcnow(),
+  )
+  db.add(upload)
+  db.commit()
+  return _upload_status(upload)
+
+
+@app.get("/uploads/{upload_id}", response_model=schemas.UploadStatus)
+def get_upload(upload_id: str, db: Session = Depends(get_db)) -> schemas.UploadStatus:
+  return _upload_status(_get_upload(db, upload_id))
+
+
+@app.put("/uploads/{upload_id}", response_model=schemas.UploadStatus)
+async def put_upload_chunk(
+  upload_id: str,
+  request: Request,
+  offset: int = Query(..., ge=0),
+  db: Session = Depends(get_db),
+) -> schemas.UploadStatus:
+  """
+  Append the raw request body at `offset`, which must equal the bytes received
+  so far (409 otherwise; `GET /uploads/{id}` reports the current offset).
+  """
+  upload = _get_upload(db, upload_id)
+  data_path = _UPLOAD_ROOT / upload_id / uploads.UPLOAD_DATA
+  # A retry racing a slow first attempt must not append the same bytes twice.
+  async with _hold_upload(upload_id, data_path) as (state, out):
+    if offset != state.size:
+      raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Upload is at offset {state.size}, not {offset}",
+      )
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and offset + int(length) > upload.total_bytes:
+      raise HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Chunk would exceed the declared size of {upload.total_bytes} bytes",
+      )
+    try:
+      await uploads.append_stream(request.stream(), out, upload.total_bytes, state)
+    except uploads.UploadTooLarge as exc:
+      raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc))
+  return _upload_status(upload)
+
+
+@app.post(
+  "/uploads/{upload_id}/complete",
+  response_model=schemas.ImportSessionResponse,
+  status_code=201,
+)
+async def complete_upload(
+  upload_id: str,
+  body: Optional[schemas.CompleteUploadRequest] = None,
+  db: Session = Depends(get_db),
+) -> schemas.ImportSessionResponse:
+  """Turn a fully received upload into a session and processing job."""
+  upload = _get_upload(db, upload_id)
+  upload_dir = _UPLOAD_ROOT / upload_id
+  data_path = upload_dir / uploads.UPLOAD_DATA
+  async with _hold_upload(upload_id, data_path) as (state, _):
+    if state.size != upload.total_bytes:
+      raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Upload incomplete: {state.size} of {upload.total_bytes} bytes received",
+      )
+    video_sha256 = state.digest.hexdigest()
+    if body is not None and body.sha256 and body.sha256.lower() != video_sha256:
+      raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Uploaded file does not match the expected sha256",
+      )
 
+    session_id = _generate_session_id()
+    session_dir = _SESSION_VIDEO_ROOT / session_id
+    session_dir.mkdir(parents=True, exist_ok=True)
+    raw_path = session_dir / "raw.mp4"
+    os.replace(data_path, raw_path)
+    metadata_obj = upload.metadata_json
+    db.delete(upload)
+    shutil.rmtree(upload_dir, ignore_errors=True)
+    uploads.forget(upload_id)
+  return _create_session(db, session_id, raw_path, metadata_obj, video_sha256, state.size)
+
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+def abort_upload(upload_id: str, db: Session = Depends(get_db)) -> None:
+  upload = _get_upload(db, upload_id)
+  db.delete(upload)
+  db.commit()
+  shutil.rmtree(_UPLOAD_ROOT / upload_id, ignore_errors=True)
+  uploads.forget(upload_id)
+  return None
+
+
+def _job_response(job: models.ProcessingJob) -> schemas.JobResponse:
+  live = job.live_progress
   return schemas.JobResponse(
     id=job.job_id,
     status=job.status,
@@ -164,29 +465,84 @@ def get_job(job_id: str, db: Session = Depends(get_db)) -> schemas.JobResponse:
     finishedAt=job.finished_at,
     updatedAt=job.updated_at or job.created_at,
     error=job.error,
+    framesProcessed=live.frames_processed if live else None,
+    frameCount=live.frame_count if live else None,
+    framesPerSecond=live.frames_per_second if live else None,
+    etaSeconds=live.eta_seconds if live and job.status == "running" else None,
   )
 
 
+@app.get("/jobs/{job_id}", response_model=schemas.JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)) -> schemas.JobResponse:
+  job = (
+    db.query(models.ProcessingJob)
+    .filter(models.ProcessingJob.job_id == job_id)
+    .join(models.Session)
+    .first()
+  )
+  if not job:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+  return _job_response(job)
+
+
+def _encode_cursor(row: models.Session | models.ProcessingJob) -> str:
+  raw = json.dumps([row.created_at.isoformat(), row.id]).encode("utf-8")
+  return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _after_cursor(model: type[models.Session] | type[models.ProcessingJob], cursor: str):
+  """Keyset filter for rows after `cursor` in (created_at, id) descending order."""
+  try:
+    created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    created_at = datetime.fromisoformat(created_at)
+    row_id = int(row_id)
+  except (ValueError, TypeError):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+  return tuple_(model.created_at, model.id) < tuple_(created_at, row_id)
+
+
+def _page(query, model, cursor: Optional[str], limit: int):
+  """
+  Newest-first keyset page of `query`, with one extra row to tell whether more
+  follow (see `_next_cursor`).
+  """
+  if cursor:
+    query = query.filter(_after_cursor(model, cursor))
+  return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def _next_cursor(rows: list, limit: int, response: Response) -> list:
+  """
+  Trim `_page` results to `limit`. When more rows follow, their cursor is sent
+  in `X-Next-Cursor`; pass it back as `cursor` to get the next page.
+  """
+  if len(rows) <= limit:
+    return rows
+  rows = rows[:limit]
+  # Multi-entity queries yield rows whose first element is the model.
+  last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+  response.headers["X-Next-Cursor"] = _encode_cursor(last)
+  return rows
+
+
 @app.get("/jobs", response_model=List[schemas.JobResponse])
-def list_jobs(active: bool = False, db: Session = Depends(get_db)) -> List[schemas.JobResponse]:
-  query = db.query(models.ProcessingJob).join(models.Session)
+def list_jobs(
+  response: Response,
+  active: bool = False,
+  cursor: Optional[str] = None,
+  limit: int = Query(100, ge=1, le=500),
+  db: Session = Depends(get_db),
+) -> List[schemas.JobResponse]:
+  query = (
+    db.query(models.ProcessingJob)
+    .join(models.Session)
+    .options(contains_eager(models.ProcessingJob.session))
+  )
   if active:
     query = query.filter(models.ProcessingJob.status.in_(("queued", "running")))
-  jobs = query.order_by(models.ProcessingJob.created_at.desc()).all()
-  return [
-    schemas.JobResponse(
-      id=job.job_id,
-      status=job.status,
-      progress=job.progress,
-      sessionId=job.session.session_id,
-      createdAt=job.created_at,
-      startedAt=job.started_at,
-      finishedAt=job.finished_at,
-      updatedAt=job.updated_at or job.created_at,
-      error=job.error,
-    )
-    for job in jobs
-  ]
+  jobs = _next_cursor(_page(query, models.ProcessingJob, cursor, limit).all(), limit, response)
+  return [_job_response(job) for job in jobs]
 
 
 @app.get("/queue/health")
@@ -244,22 +600,47 @@ def recover_queue(db: Session = Depends(get_db)):
 
 
 @app.get("/sessions", response_model=List[schemas.SessionSummary])
-def list_sessions(db: Session = Depends(get_db)) -> List[schemas.SessionSummary]:
-  sessions = db.query(models.Session).order_by(models.Session.created_at.desc()).all()
-  summaries: list[schemas.SessionSummary] = []
-  for s in sessions:
-    latest_job = (
-      db.query(models.ProcessingJob)
-      .filter(models.ProcessingJob.session_id == s.id)
-      .order_by(models.ProcessingJob.created_at.desc())
-      .first()
+def list_sessions(
+  response: Response,
+  cursor: Optional[str] = None,
+  limit: int = Query(100, ge=1, le=500),
+  db: Session = Depends(get_db),
+) -> List[schemas.SessionSummary]:
+  """
+  Sessions newest first, a page at a time (see `_next_cursor`), each with its
+  latest job found in the same query.
+  """
+  page = aliased(
+    models.Session, _page(select(models.Session), models.Session, cursor, limit).subquery()
+  )
+  jobs = models.ProcessingJob
+  # Rank only the page's jobs, so the cost follows the page size, not the history.
+  latest = (
+    select(
+      jobs.session_id,
+      jobs.job_id,
+      jobs.status,
+      func.row_number()
+      .over(partition_by=jobs.session_id, order_by=(jobs.created_at.desc(), jobs.id.desc()))
+      .label("rank"),
     )
+    .where(jobs.session_id.in_(select(page.id)))
+    .subquery()
+  )
+  rows = (
+    db.query(page, latest.c.job_id, latest.c.status)
+    .outerjoin(latest, and_(latest.c.session_id == page.id, latest.c.rank == 1))
+    .order_by(page.created_at.desc(), page.id.desc())
+    .all()
+  )
+  summaries: list[schemas.SessionSummary] = []
+  for s, job_id, job_status in _next_cursor(rows, limit, response):
     effective_status = s.status
-    if latest_job and latest_job.status in ("queued", "running"):
+    if job_status in ("queued", "running"):
       effective_status = "processing"
-    elif latest_job and latest_job.status == "failed":
+    elif job_status == "failed":
       effective_status = "failed"
-    elif latest_job and latest_job.status == "completed":
+    elif job_status == "completed":
       effective_status = "completed"
 
     summaries.append(
@@ -268,7 +649,7 @@ def list_sessions(db: Session = Depends(get_db)) -> List[schemas.SessionSummary]
         name=s.name,
         createdAt=s.created_at,
         status=effective_status,  # type: ignore[arg-type]
-        relatedJobId=latest_job.job_id if latest_job else None,
+        relatedJobId=job_id,
       )
     )
   return summaries
@@ -305,6 +686,7 @@ def stream_session_video(session_id: str, db: Session = Depends(get_db)):
 def get_session_detail(
   session_id: str,
   request: Request,
+  response: Response,
   db: Session = Depends(get_db),
 ) -> schemas.SessionDetail:
   session = (
@@ -346,20 +728,62 @@ def get_session_detail(
 
   processing = schemas.ProcessingInfo(status=processing_status, error=error)
 
-  has_tracking = (
-    db.query(models.InstructorTrackingResult)
+  tracking = (
+    db.query(models.InstructorTrackingResult.id, models.TrackingResultSummary)
+    .outerjoin(models.InstructorTrackingResult.summary)
     .filter(models.InstructorTrackingResult.session_id == session.id)
     .first()
-    is not None
   )
+  tracking_summary = None
+  if tracking is not None and tracking.TrackingResultSummary is not None:
+    row = tracking.TrackingResultSummary
+    tracking_summary = schemas.TrackingSummary(
+      version=row.version,
+      frameCount=row.frame_count,
+      pointCount=row.point_count,
+      byteSize=row.byte_size,
+      derivedMetrics=row.derived_metrics,
+      createdAt=row.created_at,
+    )
 
-  return schemas.SessionDetail(
+  detail = schemas.SessionDetail(
     session=summary,
     media=media,
     processing=processing,
     relatedJobId=latest_job.job_id if latest_job else None,
-    hasInstructorTrackingResult=has_tracking,
+    hasInstructorTrackingResult=tracking is not None,
+    trackingSummary=tracking_summary,
   )
+  # The detail is a handful of small rows, so hashing it is cheaper than tracking versions.
+  etag = http_cache.make_etag(detail.model_dump_json())
+  if http_cache.not_modified(request, etag):
+    return http_cache.not_modified_response(etag)
+  response.headers.update(http_cache.cache_headers(etag))
+  return detail
+
+
+def _accepts(request: Request, media_type: str) -> bool:
+  accept = request.headers.get("accept", "")
+  return any(part.split(";")[0].strip() == media_type for part in accept.split(","))
+
+
+def _streamed_results_path(
+  db: Session, tracking: models.InstructorTrackingResult, results_dir: Path
+) -> Path | None:
+  """Full payload file for streamed results, whose DB payload is only a summary."""
+  results_file = (
+    db.query(models.InstructorTrackingResult.payload["resultsFile"].as_string())
+    .filter(models.InstructorTrackingResult.id == tracking.id)
+    .scalar()
+  )
+  if not results_file:
+    return None
+  path = results_dir / Path(results_file).name
+  if not path.is_file():
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND, detail="Tracking results not available"
+    )
+  return path
 
 
 @app.get(
@@ -368,8 +792,22 @@ def get_session_detail(
 )
 def get_tracking_results(
   session_id: str,
+  request: Request,
+  fromMs: Optional[int] = Query(None, ge=0),
+  toMs: Optional[int] = Query(None, ge=0),
+  maxPoints: Optional[int] = Query(None, ge=3, le=100_000),
   db: Session = Depends(get_db),
-) -> schemas.TrackingResponse:
+) -> Response:
+  """
+  JSON by default; clients sending `Accept: application/vnd.instructor-tracking.columns`
+  get the memory-mappable columnar file (see processing/tracking_binary.py).
+  Bodies are pre-encoded or written with orjson; `response_model` only documents
+  the JSON shape.
+
+  `fromMs`/`toMs` restrict the result to that time window (inclusive) and
+  `maxPoints` downsamples track points with LTTB; the response then carries
+  a `window` summary.
+  """
   session = (
     db.query(models.Session).filter(models.Session.session_id == session_id).first()
   )
@@ -385,8 +823,63 @@ def get_tracking_results(
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND, detail="Tracking results not available"
     )
+  results_dir = Path(session.video_path).parent / "results"
+  binary_path = results_dir / results_files.TRACKING_BINARY
+  wants_binary = _accepts(request, tracking_binary.MEDIA_TYPE)
+  windowed = fromMs is not None or toMs is not None or maxPoints is not None
+  if windowed and fromMs is not None and toMs is not None and fromMs > toMs:
+    raise HTTPException(
+      status_code=status.HTTP_400_BAD_REQUEST, detail="fromMs must not be after toMs"
+    )
+  # Results are immutable until the session is reprocessed, which bumps created_at.
+  version = f"{tracking.id}:{tracking.created_at.isoformat()}"
 
-  return schemas.TrackingResponse(version="v1", data=tracking.payload)  # type: ignore[arg-type]
+  if windowed:
+    etag = http_cache.make_etag(
+      version, "binary" if wants_binary else "json", fromMs, toMs, maxPoints
+    )
+    if http_cache.not_modified(request, etag):
+      return http_cache.not_modified_response(etag)
+    if not binary_path.is_file():
+      _write_missing_result(db, tracking, results_dir, binary=True)
+    results = tracking_binary.TrackingBinary.open(binary_path)
+    columns, window = window_columns(results.columns, fromMs, toMs, maxPoints)
+    if wants_binary:
+      header = {key: value for key, value in results.header.items() if key != "qualityNames"}
+      return Response(
+        tracking_binary.encode_tracking_binary({**header, "window": window}, columns),
+        media_type=tracking_binary.MEDIA_TYPE,
+        headers=http_cache.cache_headers(etag),
+      )
+    data = tracking_binary.TrackingBinary(header=results.header, columns=columns).to_payload()
+    return fast_json.json_response(
+      {"version": "v1", "data": {**data, "window": window}},
+      headers=http_cache.cache_headers(etag),
+    )
+
+  if wants_binary:
+    path, media_type = binary_path, tracking_binary.MEDIA_TYPE
+  else:
+    path, media_type = results_dir / results_files.TRACKING_RESPONSE, "application/json"
+  if not path.is_file():
+    _write_missing_result(db, tracking, results_dir, binary=wants_binary)
+  return http_cache.cached_file_response(request, path, media_type, version)
+
+
+def _write_missing_result(
+  db: Session,
+  tracking: models.InstructorTrackingResult,
+  results_dir: Path,
+  binary: bool,
+) -> None:
+  """Results from before pre-encoded responses: build the file once and keep it."""
+  streamed_path = _streamed_results_path(db, tracking, results_dir)
+  payload = None if streamed_path is not None else tracking.payload
+  results_dir.mkdir(parents=True, exist_ok=True)
+  if binary:
+    results_files.write_binary_file(results_dir, payload=payload, streamed_path=streamed_path)
+  else:
+    results_files.write_response_file(results_dir, payload=payload, streamed_path=streamed_path)
 
 
 @app.post(
@@ -429,6 +922,61 @@ def retry_processing(session_id: str, db: Session = Depends(get_db)) -> schemas.
   return schemas.RetryJobResponse(jobId=job_id)
 
 
+@app.post(
+  "/sessions/{session_id}/sweeps",
+  response_model=schemas.SweepResponse,
+  status_code=201,
+)
+def create_sweep(
+  session_id: str,
+  body: schemas.SweepRequest,
+  db: Session = Depends(get_db),
+) -> schemas.SweepResponse:
+  """Queue a parameter sweep: detect once, then score every variant."""
+  session = (
+    db.query(models.Session).filter(models.Session.session_id == session_id).first()
+  )
+  if not session:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+  try:
+    for overrides in body.variants:
+      variant_config(ProcessingConfig(), overrides)
+  except (TypeError, ValueError) as exc:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+  sweep = models.SweepJob(
+    sweep_id=_generate_sweep_id(),
+    session_id=session.id,
+    status="queued",
+    progress=0.0,
+    variants=body.variants,
+    created_at=datetime.utcnow(),
+  )
+  db.add(sweep)
+  db.commit()
+
+  try:
+    redis_conn = Redis.from_url(settings.redis_url)
+    q = Queue(
+      "processing",
+      connection=redis_conn,
+      default_timeout=settings.processing_timeout_seconds + 120,
+    )
+    q.enqueue(process_sweep, sweep.sweep_id, job_id=sweep.sweep_id)
+  except Exception as e:
+    print(f"Warning: Could not enqueue sweep {sweep.sweep_id}: {e}")
+
+  return _sweep_response(sweep)
+
+
+@app.get("/sweeps/{sweep_id}", response_model=schemas.SweepResponse)
+def get_sweep(sweep_id: str, db: Session = Depends(get_db)) -> schemas.SweepResponse:
+  sweep = db.query(models.SweepJob).filter(models.SweepJob.sweep_id == sweep_id).first()
+  if not sweep:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sweep not found")
+  return _sweep_response(sweep)
+
+
 @app.delete("/jobs/{job_id}", status_code=204)
 def cancel_job(job_id: str, db: Session = Depends(get_db)):
   """Cancel a queued or running job, and delete it from the database."""
@@ -499,18 +1047,39 @@ def delete_session(session_id: str, db: Session = Depends(get_db)):
       except Exception:
         pass
 
+  result_ids = db.query(models.InstructorTrackingResult.id).filter(
+    models.InstructorTrackingResult.session_id == session.id
+  )
+  db.query(models.TrackingResultSummary).filter(
+    models.TrackingResultSummary.result_id.in_(result_ids)
+  ).delete(synchronize_session=False)
+  db.query(models.ResultFingerprint).filter(
+    models.ResultFingerprint.result_id.in_(result_ids)
+  ).delete(synchronize_session=False)
   db.query(models.InstructorTrackingResult).filter(
     models.InstructorTrackingResult.session_id == session.id
   ).delete()
+  job_ids = db.query(models.ProcessingJob.id).filter(
+    models.ProcessingJob.session_id == session.id
+  )
+  db.query(models.JobProgress).filter(models.JobProgress.job_id.in_(job_ids)).delete(
+    synchronize_session=False
+  )
   db.query(models.ProcessingJob).filter(
     models.ProcessingJob.session_id == session.id
   ).delete()
+  db.query(models.SweepJob).filter(models.SweepJob.session_id == session.id).delete()
+  video_sha256 = (
+    session.metadata_json.get("videoSha256") if isinstance(session.metadata_json, dict) else None
+  )
   db.delete(session)
   db.commit()
 
   session_dir = _SESSION_VIDEO_ROOT / session_id
   if session_dir.exists():
     shutil.rmtree(session_dir, ignore_errors=True)
+  if video_sha256:
+    blob_store.release(_BLOB_ROOT, video_sha256)
 
   return None
 
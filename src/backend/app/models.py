@@ -1,13 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import deferred, relationship
 
 from .database import Base
+from .fast_json import PayloadJSON
 
 
 class Session(Base):
   __tablename__ = "sessions"
+  # Listing pages through (created_at, id) descending.
+  __table_args__ = (Index("ix_sessions_created_at_id", "created_at", "id"),)
 
   id = Column(Integer, primary_key=True, index=True)
   session_id = Column(String, unique=True, index=True, nullable=False)
@@ -20,14 +23,23 @@ class Session(Base):
   video_height = Column(Integer, nullable=True)
   fps = Column(Float, nullable=True)
 
-  jobs = relationship("ProcessingJob", back_populates="session", lazy="selectin")
+  # Loaded on access only, so a session's job history never rides along with it.
+  jobs = relationship("ProcessingJob", back_populates="session", lazy="select")
+  sweeps = relationship("SweepJob", back_populates="session", lazy="select")
+  # Loaded on access only; the API reads TrackingResultSummary instead.
   tracking_result = relationship(
-    "InstructorTrackingResult", back_populates="session", uselist=False, lazy="selectin"
+    "InstructorTrackingResult", back_populates="session", uselist=False, lazy="select"
   )
 
 
 class ProcessingJob(Base):
   __tablename__ = "processing_jobs"
+  __table_args__ = (
+    # Latest job per session, and job listings (all or by status) newest first.
+    Index("ix_processing_jobs_session_id_created_at", "session_id", "created_at"),
+    Index("ix_processing_jobs_status_created_at", "status", "created_at"),
+    Index("ix_processing_jobs_created_at_id", "created_at", "id"),
+  )
 
   id = Column(Integer, primary_key=True, index=True)
   job_id = Column(String, unique=True, index=True, nullable=False)
@@ -41,6 +53,29 @@ class ProcessingJob(Base):
   updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
   session = relationship("Session", back_populates="jobs")
+  live_progress = relationship(
+    "JobProgress",
+    back_populates="job",
+    uselist=False,
+    lazy="selectin",
+    cascade="all, delete-orphan",
+  )
+
+
+class JobProgress(Base):
+  """Latest frame-level progress of a running job, written by the worker."""
+
+  __tablename__ = "job_progress"
+
+  id = Column(Integer, primary_key=True, index=True)
+  job_id = Column(Integer, ForeignKey("processing_jobs.id"), unique=True, nullable=False)
+  frames_processed = Column(Integer, default=0, nullable=False)
+  frame_count = Column(Integer, default=0, nullable=False)
+  frames_per_second = Column(Float, default=0.0, nullable=False)
+  eta_seconds = Column(Float, nullable=True)
+  updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+  job = relationship("ProcessingJob", back_populates="live_progress")
 
 
 class InstructorTrackingResult(Base):
@@ -48,8 +83,90 @@ class InstructorTrackingResult(Base):
 
   id = Column(Integer, primary_key=True, index=True)
   session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
-  payload = Column(JSON, nullable=False)
+  # Megabytes for long sessions: only loaded when the attribute is read. The
+  # tracking endpoint serves the files in results/ instead.
+  payload = deferred(Column(PayloadJSON, nullable=False))
   created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
   session = relationship("Session", back_populates="tracking_result")
+  summary = relationship(
+    "TrackingResultSummary", back_populates="result", uselist=False, lazy="select"
+  )
+  fingerprint = relationship(
+    "ResultFingerprint", back_populates="result", uselist=False, lazy="select"
+  )
+
+
+class TrackingResultSummary(Base):
+  """Small facts about a tracking result, readable without its payload."""
+
+  __tablename__ = "tracking_result_summaries"
+
+  id = Column(Integer, primary_key=True, index=True)
+  result_id = Column(
+    Integer, ForeignKey("instructor_tracking_results.id"), unique=True, nullable=False
+  )
+  version = Column(String, nullable=False)  # payload format, e.g. "v1"
+  frame_count = Column(Integer, nullable=False)
+  point_count = Column(Integer, nullable=False)
+  # Size of the uncompressed JSON response body.
+  byte_size = Column(Integer, nullable=False)
+  derived_metrics = Column(JSON, nullable=True)
+  created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+  result = relationship("InstructorTrackingResult", back_populates="summary")
+
+
+class ResultFingerprint(Base):
+  """
+  The uploaded video and processing settings a tracking result came from; a
+  later upload matching both reuses the result instead of processing again.
+  """
+
+  __tablename__ = "result_fingerprints"
+  __table_args__ = (
+    Index("ix_result_fingerprints_video_config", "video_sha256", "config_sha256"),
+  )
+
+  id = Column(Integer, primary_key=True, index=True)
+  result_id = Column(
+    Integer, ForeignKey("instructor_tracking_results.id"), unique=True, nullable=False
+  )
+  video_sha256 = Column(String, nullable=False)  # of the upload, before any transcode
+  config_sha256 = Column(String, nullable=False)  # result_config_sha256()
+  created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+  result = relationship("InstructorTrackingResult", back_populates="fingerprint")
+
+
+class SweepJob(Base):
+  """Parameter sweep: many cleaning/tracking variants over one detection pass."""
 
+  __tablename__ = "sweep_jobs"
+
+  id = Column(Integer, primary_key=True, index=True)
+  sweep_id = Column(String, unique=True, index=True, nullable=False)
+  session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+  status = Column(String, default="queued", nullable=False)
+  progress = Column(Float, default=0.0, nullable=False)  # 0..1
+  error = Column(Text, nullable=True)
+  variants = Column(JSON, nullable=False)
+  result = Column(JSON, nullable=True)
+  created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+  started_at = Column(DateTime, nullable=True)
+  finished_at = Column(DateTime, nullable=True)
+
+  session = relationship("Session", back_populates="sweeps")
+
+
+class Upload(Base):
+  """Resumable video upload in progress; the bytes live under data/uploads/<upload_id>."""
+
+  __tablename__ = "uploads"
+
+  id = Column(Integer, primary_key=True, index=True)
+  upload_id = Column(String, unique=True, index=True, nullable=False)
+  filename = Column(String, nullable=False)
+  total_bytes = Column(Integer, nullable=False)
+  metadata_json = Column("metadata", JSON, nullable=True)
+  created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
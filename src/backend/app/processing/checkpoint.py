@@ -0,0 +1,112 @@
+"""
+Checkpoint/resume for long processing jobs.
+
+A checkpoint is the raw detections of every sampled frame processed so far,
+spooled as append-only column files, plus `checkpoint.json` recording the
+detection-cache key and how many rows of each column are complete. Tracker
+state and track points are not stored: they are a pure function of the
+detections and the cleaning/tracking settings, so resuming replays the
+checkpointed detections through tracking (microseconds per frame) and then
+continues decoding and inference after the last checkpointed frame.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from .detection_cache import SPOOL_COLUMNS, CachedDetections, DetectionRecorder
+from .schemas import Detection
+
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+class CheckpointRecorder(DetectionRecorder):
+  """
+  `DetectionRecorder` spooling into `directory`, which survives the process.
+  At most every `interval_seconds` the columns are flushed and
+  `checkpoint.json` is rewritten; `close` checkpoints and keeps the files for
+  a later resume, while `save`/`discard` remove them after a finished run.
+  """
+
+  def __init__(
+    self,
+    directory: Path,
+    key: dict[str, Any],
+    interval_seconds: float,
+    resume: bool = False,
+  ) -> None:
+    if not resume:
+      (directory / CHECKPOINT_FILE).unlink(missing_ok=True)
+    super().__init__(spool_dir=directory, append=resume)
+    self.key = key
+    self.interval_seconds = interval_seconds
+    self._last_checkpoint = time.monotonic()
+
+  def add(self, frame_idx: int, detections: Optional[Sequence[Detection]]) -> None:
+    super().add(frame_idx, detections)
+    if time.monotonic() - self._last_checkpoint >= self.interval_seconds:
+      self.checkpoint()
+
+  def checkpoint(self) -> None:
+    self._flush()
+    for handle in self._handles.values():
+      handle.flush()
+      os.fsync(handle.fileno())
+    path = self._spool_dir / CHECKPOINT_FILE
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"key": self.key, "rows": self._rows}), encoding="utf-8")
+    os.replace(tmp_path, path)
+    self._last_checkpoint = time.monotonic()
+
+  def close(self) -> None:
+    if not self._handles["frame_idx"].closed:
+      self.checkpoint()
+    for handle in self._handles.values():
+      handle.close()
+
+
+def load_checkpoint(directory: Path, key: dict[str, Any]) -> Optional[CachedDetections]:
+  """
+  Return the checkpointed detections when `directory` holds a checkpoint for
+  `key`, truncating rows written after the last checkpoint so a recorder can
+  append to the files. Returns None when there is nothing to resume.
+  """
+  try:
+    state = json.loads((directory / CHECKPOINT_FILE).read_text(encoding="utf-8"))
+  except (OSError, ValueError):
+    return None
+  if state.get("key") != key:
+    return None
+  rows: dict[str, int] = state.get("rows") or {}
+  columns: dict[str, np.ndarray] = {}
+  try:
+    for name, (dtype, width) in SPOOL_COLUMNS.items():
+      path = directory / f"{name}.bin"
+      count = int(rows[name]) * width
+      size = count * np.dtype(dtype).itemsize
+      if path.stat().st_size < size:
+        return None
+      os.truncate(path, size)
+      column = np.fromfile(path, dtype=dtype, count=count)
+      columns[name] = column.reshape(-1, width) if width > 1 else column
+  except (OSError, KeyError, ValueError):
+    return None
+  if columns["frame_idx"].shape[0] == 0:
+    return None
+  offsets = np.zeros(columns["counts"].shape[0] + 1, dtype=np.int64)
+  np.cumsum(columns["counts"], out=offsets[1:])
+  return CachedDetections(
+    frame_idx=columns["frame_idx"],
+    gated=columns["gated"],
+    offsets=offsets,
+    boxes=columns["boxes"],
+    conf=columns["conf"],
+    cls=columns["cls"],
+  )
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
 
-from .schemas import BBox, Detection, ProcessingConfig
+import numpy as np
+
+from .schemas import BBox, Detection, DetectionArrays, ProcessingConfig
+
+
+# Column layout of the (N, 6) detection arrays used by the vectorized path.
+DET_X, DET_Y, DET_W, DET_H, DET_CONF, DET_CLS = range(6)
+
+# Below this many detections the scalar loop is cheaper than NumPy call overhead
+# (see benchmarks/bench_cleaning.py).
+VECTORIZE_MIN_DETECTIONS = 16
 
 
 def _passes_size_and_shape(bbox: BBox, config: ProcessingConfig) -> bool:
@@ -20,7 +30,7 @@ def _passes_size_and_shape(bbox: BBox, config: ProcessingConfig) -> bool:
 
 
 def select_instructor_detection(
-  detections: list[Detection],
+  detections: Sequence[Detection],
   prev_bbox: Optional[BBox],
   lost_count: int,
   config: ProcessingConfig,
@@ -56,3 +66,84 @@ def select_instructor_detection(
     return None
   return best_candidate
 
+
+def detections_to_array(detections: Sequence[Detection]) -> np.ndarray:
+  """Pack detections into an (N, 6) float64 array of x, y, w, h, conf, cls."""
+  array = np.empty((len(detections), 6), dtype=np.float64)
+  for row, det in enumerate(detections):
+    array[row] = (det.bbox.x, det.bbox.y, det.bbox.w, det.bbox.h, det.conf, det.cls)
+  return array
+
+
+def select_instructor_index(
+  detections: np.ndarray,
+  prev_bbox: Optional[BBox],
+  lost_count: int,
+  config: ProcessingConfig,
+) -> Optional[int]:
+  """
+  Vectorized `select_instructor_detection` over an (N, 6) array; returns the
+  selected row or None. Every comparison and float operation mirrors the
+  scalar code in the same order, so both pick the same detection.
+  """
+  if detections.shape[0] == 0:
+    return None
+  x = detections[:, DET_X]
+  y = detections[:, DET_Y]
+  w = detections[:, DET_W]
+  h = detections[:, DET_H]
+  conf = detections[:, DET_CONF]
+
+  area = np.maximum(0.0, w) * np.maximum(0.0, h)
+  keep = (detections[:, DET_CLS] == 0) & (conf >= config.min_conf)
+  keep &= (area >= config.min_area_ratio) & (area <= config.max_area_ratio) & (h > 0.0)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    aspect_ratio = w / h
+  if config.min_aspect_ratio is not None:
+    keep &= aspect_ratio >= config.min_aspect_ratio
+  if config.max_aspect_ratio is not None:
+    keep &= aspect_ratio <= config.max_aspect_ratio
+  candidates = np.flatnonzero(keep)
+  if candidates.size == 0:
+    return None
+
+  if prev_bbox is None:
+    return int(candidates[np.argmax(conf[candidates])])
+
+  x = x[candidates]
+  y = y[candidates]
+  w = w[candidates]
+  h = h[candidates]
+  bx1, by1, bx2, by2 = prev_bbox.to_xyxy()
+  iw = np.maximum(0.0, np.minimum(x + w, bx2) - np.maximum(x, bx1))
+  ih = np.maximum(0.0, np.minimum(y + h, by2) - np.maximum(y, by1))
+  inter_area = iw * ih
+  union = (area[candidates] + prev_bbox.area()) - inter_area
+  iou = np.zeros(candidates.size, dtype=np.float64)
+  overlapping = (inter_area > 0.0) & (union > 0.0)
+  iou[overlapping] = inter_area[overlapping] / union[overlapping]
+
+  score = (config.iou_weight * iou) + (config.conf_weight * conf[candidates])
+  best = int(np.argmax(score))  # first maximum, like the strict `>` scan
+  if not score[best] > -1.0:
+    return None
+  if iou[best] < config.low_iou_reject_threshold and lost_count < config.low_iou_reject_patience:
+    # Avoid jumping to another person during short occlusion periods.
+    return None
+  return int(candidates[best])
+
+
+def select_instructor(
+  detections: Sequence[Detection],
+  prev_bbox: Optional[BBox],
+  lost_count: int,
+  config: ProcessingConfig,
+) -> Optional[Detection]:
+  """
+  Pick the instructor from one frame's detections, reading columnar
+  `DetectionArrays` directly when there are enough rows to pay off.
+  """
+  if isinstance(detections, DetectionArrays) and len(detections) >= VECTORIZE_MIN_DETECTIONS:
+    index = select_instructor_index(detections.to_array(), prev_bbox, lost_count, config)
+    return None if index is None else detections[index]
+  return select_instructor_detection(detections, prev_bbox, lost_count, config)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .detectors import Detector
+from .frames import DecodeStats, FrameSource, PrefetchingFrameSource, create_frame_source
+from .gating import MotionGate
+from .roi import RoiPlanner, RoiWindow
+from .sampling import AdaptiveSampler
+from .schemas import Detection, ProcessingConfig, VideoMeta
+
+
+# Detections for one sampled frame; None means the motion gate skipped the
+# detector and the previous frame's detection should be carried forward.
+RawDetections = tuple[int, Optional[Sequence[Detection]]]
+
+
+def create_motion_gate(cfg: ProcessingConfig) -> Optional[MotionGate]:
+  if cfg.motion_gate_threshold <= 0.0:
+    return None
+  return MotionGate(threshold=cfg.motion_gate_threshold, max_skip=cfg.motion_gate_max_skip)
+
+
+@dataclass(slots=True)
+class _PendingFrame:
+  frame_idx: int
+  frame: Optional[np.ndarray]  # None when the motion gate skipped detection
+  window: Optional[RoiWindow] = None  # set for crop-around-instructor inference
+
+
+def detect_stream(
+  source: FrameSource,
+  detector: Detector,
+  cfg: ProcessingConfig,
+  diagnostics: dict[str, Any],
+  start_time: float,
+  roi_planner: Optional[RoiPlanner] = None,
+  roi_detector: Optional[Detector] = None,
+  sampler: Optional[AdaptiveSampler] = None,
+) -> Iterator[RawDetections]:
+  """
+  Yield (frame_idx, detections) in frame order, running the detector on
+  batches of `cfg.detector_batch_size` sampled frames. Frames rejected by the
+  motion gate yield None without reaching the detector; frames the adaptive
+  `sampler` skips are not yielded at all.
+
+  With `roi_planner`/`roi_detector`, frames are detected on a crop around the
+  tracked instructor when possible and fall back to `detector` on the full
+  frame when the crop finds nobody. Crops are planned when a frame joins a
+  batch, so within a batch they use the tracker state from the batch start.
+  """
+  batch_size = max(1, cfg.detector_batch_size)
+  gate = create_motion_gate(cfg)
+  pending: list[_PendingFrame] = []
+  pending_count = 0
+
+  def run_detector(det: Detector, frames: list[np.ndarray]) -> list[Sequence[Detection]]:
+    started = time.perf_counter()
+    results = det.detect_batch(frames)
+    diagnostics["detectorSeconds"] += time.perf_counter() - started
+    diagnostics["detectorCalls"] += 1
+    return results
+
+  def flush() -> Iterator[RawDetections]:
+    results: list[Optional[Sequence[Detection]]] = [None] * len(pending)
+    full_positions = [
+      pos for pos, item in enumerate(pending) if item.frame is not None and item.window is None
+    ]
+    roi_positions = [pos for pos, item in enumerate(pending) if item.window is not None]
+
+    if roi_positions and roi_detector is not None:
+      crops = [pending[pos].window.crop(pending[pos].frame) for pos in roi_positions]
+      for pos, crop_detections in zip(roi_positions, run_detector(roi_detector, crops)):
+        window = pending[pos].window
+        if crop_detections:
+          results[pos] = [window.to_frame(det) for det in crop_detections]
+          diagnostics["roiDetections"] += 1
+        else:
+          full_positions.append(pos)
+          diagnostics["roiFallbacks"] += 1
+      full_positions.sort()
+
+    if full_positions:
+      frames = [pending[pos].frame for pos in full_positions]
+      for pos, frame_detections in zip(full_positions, run_detector(detector, frames)):
+        results[pos] = frame_detections
+
+    emitted = [(item.frame_idx, result) for item, result in zip(pending, results)]
+    pending.clear()
+    yield from emitted
+
+  for frame_idx, frame in source:
+    diagnostics["totalFramesRead"] = source.stats.frames_grabbed
+
+    if (time.monotonic() - start_time) > cfg.processing_timeout_seconds:
+      raise TimeoutError(
+        f"processing timeout after {cfg.processing_timeout_seconds}s "
+        f"(read={diagnostics['totalFramesRead']}, processed={diagnostics['processedFrames']})"
+      )
+
+    if sampler is not None and not sampler.should_analyze():
+      diagnostics["adaptiveSkippedFrames"] += 1
+      continue
+    if gate is not None and not gate.should_detect(frame):
+      diagnostics["skippedDetections"] += 1
+      pending.append(_PendingFrame(frame_idx=frame_idx, frame=None))
+      continue
+    window = roi_planner.window_for(frame) if roi_planner is not None else None
+    pending.append(_PendingFrame(frame_idx=frame_idx, frame=frame, window=window))
+    pending_count += 1
+    if pending_count >= batch_size:
+      yield from flush()
+      pending_count = 0
+  if pending:
+    yield from flush()
+
+
+def detect_range(
+  video_path: Path,
+  video_meta: VideoMeta,
+  cfg: ProcessingConfig,
+  detector: Detector,
+  stride: int,
+  diagnostics: dict[str, Any],
+  decode_stats: list[DecodeStats],
+  start_time: float,
+  start_frame: int = 0,
+  end_frame: Optional[int] = None,
+  roi_planner: Optional[RoiPlanner] = None,
+  roi_detector: Optional[Detector] = None,
+  sampler: Optional[AdaptiveSampler] = None,
+) -> Iterator[RawDetections]:
+  """
+  Decode and detect frames [start_frame, end_frame) of `video_path`.
+
+  The frame source is closed when the generator finishes or is closed, and
+  its decode (and prefetch) statistics are recorded at that point.
+  """
+  source = create_frame_source(
+    video_path,
+    video_meta,
+    cfg,
+    stride=stride,
+    start_frame=start_frame,
+    end_frame=end_frame,
+  )
+  try:
+    yield from detect_stream(
+      source,
+      detector,
+      cfg,
+      diagnostics,
+      start_time,
+      roi_planner=roi_planner,
+      roi_detector=roi_detector,
+      sampler=sampler,
+    )
+  finally:
+    source.close()
+    decode_stats.append(source.stats)
+    if isinstance(source, PrefetchingFrameSource):
+      diagnostics.update(source.prefetch_stats.to_diagnostics())
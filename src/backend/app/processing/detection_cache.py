@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .detection import RawDetections
+from .detectors import canonical_detector_name
+from .schemas import BBox, Detection, DetectionArrays, ProcessingConfig
+
+
+CACHE_FORMAT_VERSION = 1
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+  digest = hashlib.sha256()
+  with Path(path).open("rb") as handle:
+    while True:
+      chunk = handle.read(_HASH_CHUNK_BYTES)
+      if not chunk:
+        break
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def cache_key(video_sha256: str, cfg: ProcessingConfig) -> dict[str, Any]:
+  """
+  Everything that changes which frames reach the detector or what it returns.
+  Cleaning, tracking and output settings are deliberately left out: changing
+  them reuses the cached detections.
+  """
+  return {
+    "version": CACHE_FORMAT_VERSION,
+    "videoSha256": video_sha256,
+    "detectorType": canonical_detector_name(cfg.detector_type),
+    "detectorModel": cfg.detector_model,
+    "detectorDevice": cfg.detector_device,
+    "detectorImgsz": cfg.detector_imgsz,
+    "onnxQuantized": cfg.onnx_quantized,
+    "minConf": cfg.min_conf,
+    "processFps": cfg.process_fps,
+    "frameSource": cfg.frame_source,
+    "frameSourceLongSide": cfg.frame_source_long_side,
+    "motionGateThreshold": cfg.motion_gate_threshold,
+    "motionGateMaxSkip": cfg.motion_gate_max_skip,
+  }
+
+
+# How a job runs rather than what it produces: left out of result_config_sha256.
+_EXECUTION_ONLY_FIELDS = frozenset({
+  "prefetch_frames",
+  "detector_batch_size",
+  "detector_threads",
+  "processing_timeout_seconds",
+  "parallel_workers",
+  "stream_chunk_size",
+  "checkpoint_interval_seconds",
+})
+
+
+def result_config_sha256(cfg: ProcessingConfig) -> str:
+  """
+  Hash of every setting that can change a tracking result, so a new upload of
+  an already processed video can reuse its result when they match.
+  """
+  settings = {
+    field.name: getattr(cfg, field.name)
+    for field in dataclasses.fields(cfg)
+    if field.name not in _EXECUTION_ONLY_FIELDS
+  }
+  settings["detector_type"] = canonical_detector_name(cfg.detector_type)
+  encoded = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+  return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cacheable(cfg: ProcessingConfig) -> bool:
+  # ROI crops and adaptive sampling are steered by the tracker, so their raw
+  # detections depend on cleaning/tracking settings and cannot be replayed.
+  return not (cfg.roi_inference or cfg.adaptive_sampling)
+
+
+class CachedDetections:
+  """
+  Raw per-frame detections held as compact arrays. Iterating yields
+  (frame_idx, detections | None) per sampled frame, building the `Detection`
+  objects for one frame at a time.
+  """
+
+  def __init__(
+    self,
+    frame_idx: np.ndarray,
+    gated: np.ndarray,
+    offsets: np.ndarray,
+    boxes: np.ndarray,
+    conf: np.ndarray,
+    cls: np.ndarray,
+    detector_version: Optional[str] = None,
+    model_source: str = "ultralytics",
+  ) -> None:
+    self.frame_idx = frame_idx
+    self.gated = gated
+    self.offsets = offsets
+    self.boxes = boxes
+    self.conf = conf
+    self.cls = cls
+    self.detector_version = detector_version
+    self.model_source = model_source
+
+  def __iter__(self) -> Iterator[RawDetections]:
+    offsets = self.offsets
+    for pos, idx in enumerate(self.frame_idx.tolist()):
+      if self.gated[pos]:
+        yield idx, None
+        continue
+      start, end = int(offsets[pos]), int(offsets[pos + 1])
+      yield idx, [
+        Detection(bbox=BBox(*box), conf=score, cls=label)
+        for box, score, label in zip(
+          self.boxes[start:end].tolist(),
+          self.conf[start:end].tolist(),
+          self.cls[start:end].tolist(),
+        )
+      ]
+
+  def __len__(self) -> int:
+    return int(self.frame_idx.shape[0])
+
+
+# Spooled recorder columns: name -> (dtype, values per row).
+SPOOL_COLUMNS = {
+  "frame_idx": (np.int64, 1),
+  "gated": (np.bool_, 1),
+  "counts": (np.int64, 1),
+  "boxes": (np.float64, 4),
+  "conf": (np.float64, 1),
+  "cls": (np.int32, 1),
+}
+
+
+class DetectionRecorder:
+  """
+  Spool raw detections to per-column files next to the cache as they stream
+  past, so recording a long video does not keep its detections in memory.
+  With `spool_dir` the columns go to that directory instead of a temporary
+  one, appending to what is already there when `append` is set.
+  """
+
+  def __init__(
+    self,
+    cache_path: Optional[Path] = None,
+    flush_frames: int = 4096,
+    spool_dir: Optional[Path] = None,
+    append: bool = False,
+  ) -> None:
+    if spool_dir is None:
+      if cache_path is None:
+        raise ValueError("DetectionRecorder needs a cache_path or a spool_dir")
+      cache_path.parent.mkdir(parents=True, exist_ok=True)
+      spool_dir = Path(tempfile.mkdtemp(prefix=".raw-detections-", dir=cache_path.parent))
+    else:
+      spool_dir.mkdir(parents=True, exist_ok=True)
+    self._spool_dir = spool_dir
+    mode = "ab" if append else "wb"
+    self._handles = {name: (spool_dir / f"{name}.bin").open(mode) for name in SPOOL_COLUMNS}
+    # Rows written to the column files so far (not counting the buffers).
+    self._rows = {
+      name: self._handles[name].tell() // (np.dtype(dtype).itemsize * width)
+      for name, (dtype, width) in SPOOL_COLUMNS.items()
+    }
+    self._buffers: dict[str, list[Any]] = {name: [] for name in SPOOL_COLUMNS}
+    self._flush_frames = max(1, flush_frames)
+    self._pending_frames = 0
+
+  def add(self, frame_idx: int, detections: Optional[Sequence[Detection]]) -> None:
+    buffers = self._buffers
+    buffers["frame_idx"].append(frame_idx)
+    buffers["gated"].append(detections is None)
+    buffers["counts"].append(0 if detections is None else len(detections))
+    if isinstance(detections, DetectionArrays):
+      buffers["boxes"].extend(detections.xywh.astype(np.float64).ravel().tolist())
+      buffers["conf"].extend(detections.conf.tolist())
+      buffers["cls"].extend(detections.cls.tolist())
+    else:
+      for det in detections or ():
+        buffers["boxes"].extend((det.bbox.x, det.bbox.y, det.bbox.w, det.bbox.h))
+        buffers["conf"].append(det.conf)
+        buffers["cls"].append(det.cls)
+    self._pending_frames += 1
+    if self._pending_frames >= self._flush_frames:
+      self._flush()
+
+  def wrap(self, stream: Iterable[RawDetections]) -> Iterator[RawDetections]:
+    """Pass `stream` through unchanged, recording every item."""
+    for frame_idx, detections in stream:
+      self.add(frame_idx, detections)
+      yield frame_idx, detections
+
+  def _flush(self) -> None:
+    for name, (dtype, width) in SPOOL_COLUMNS.items():
+      values = self._buffers[name]
+      if values:
+        np.asarray(values, dtype=dtype).tofile(self._handles[name])
+        self._rows[name] += len(values) // width
+        values.clear()
+    self._pending_frames = 0
+
+  def _column(self, name: str) -> np.ndarray:
+    dtype, width = SPOOL_COLUMNS[name]
+    path = self._spool_dir / f"{name}.bin"
+    if self._rows[name] == 0:
+      return np.empty((0, width) if width > 1 else 0, dtype=dtype)
+    # Memory-mapped, so writing the cache streams from the page cache.
+    column = np.memmap(path, dtype=dtype, mode="r", shape=(self._rows[name] * width,))
+    return column.reshape(-1, width) if width > 1 else column
+
+  def save(
+    self,
+    path: Path,
+    key: dict[str, Any],
+    detector_version: Optional[str],
+    model_source: str,
+  ) -> None:
+    """
+    Store detections as flat arrays: per sampled frame its index, a gated
+    flag and an offset into the per-detection box/conf/cls arrays. Written to
+    a temporary file and renamed so readers never see a partial cache.
+    """
+    self._flush()
+    for handle in self._handles.values():
+      handle.close()
+    counts = self._column("counts")
+    offsets = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    meta = {"key": key, "detectorVersion": detector_version, "modelSource": model_source}
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+      with tmp_path.open("wb") as handle:
+        np.savez(
+          handle,
+          meta=np.array(json.dumps(meta, sort_keys=True)),
+          frame_idx=self._column("frame_idx"),
+          gated=self._column("gated"),
+          offsets=offsets,
+          boxes=self._column("boxes"),
+          conf=self._column("conf"),
+          cls=self._column("cls"),
+        )
+      os.replace(tmp_path, path)
+    finally:
+      tmp_path.unlink(missing_ok=True)
+      self.discard()
+
+  def discard(self) -> None:
+    for handle in self._handles.values():
+      handle.close()
+    shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+
+def load_detections(path: Path, key: dict[str, Any]) -> Optional[CachedDetections]:
+  """Return the cached detections, or None when missing, unreadable or stale."""
+  if not path.is_file():
+    return None
+  try:
+    with np.load(path, allow_pickle=False) as data:
+      meta = json.loads(str(data["meta"]))
+      if meta.get("key") != key:
+        return None
+      return CachedDetections(
+        frame_idx=data["frame_idx"],
+        gated=data["gated"],
+        offsets=data["offsets"],
+        boxes=data["boxes"],
+        conf=data["conf"],
+        cls=data["cls"],
+        detector_version=meta.get("detectorVersion"),
+        model_source=meta.get("modelSource") or "ultralytics",
+      )
+  except (OSError, ValueError, KeyError):
+    return None
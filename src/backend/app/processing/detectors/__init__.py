@@ -1,16 +1,18 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
 
 from ..schemas import ProcessingConfig
 from .base import Detector
-from .yolov8n import YoloV8NDetector
 
 
 DetectorFactory = Callable[[ProcessingConfig], Detector]
 
 
 def _create_yolov8n_detector(config: ProcessingConfig) -> Detector:
+  # Imported lazily: ultralytics pulls in torch, which the ONNX backend avoids.
+  from .yolov8n import YoloV8NDetector
+
   return YoloV8NDetector(
     model_name=config.detector_model,
     device=config.detector_device,
@@ -19,13 +21,30 @@ def _create_yolov8n_detector(config: ProcessingConfig) -> Detector:
   )
 
 
+def _create_onnx_detector(config: ProcessingConfig) -> Detector:
+  from .onnx_yolo import OnnxYoloDetector
+
+  return OnnxYoloDetector(
+    model_name=config.detector_model,
+    device=config.detector_device,
+    imgsz=config.detector_imgsz,
+    conf=config.min_conf,
+    intra_op_threads=config.detector_threads,
+    quantized=config.onnx_quantized,
+  )
+
+
 _DETECTOR_ALIASES: dict[str, str] = {
   "yolov8n": "yolov8n",
   "yolov8": "yolov8n",
+  "onnx": "onnx",
+  "onnxruntime": "onnx",
+  "yolov8n-onnx": "onnx",
 }
 
 _DETECTOR_FACTORIES: dict[str, DetectorFactory] = {
   "yolov8n": _create_yolov8n_detector,
+  "onnx": _create_onnx_detector,
 }
 
 
@@ -46,10 +65,22 @@ def create_detector(config: ProcessingConfig) -> Detector:
   return factory(config)
 
 
+def __getattr__(name: str) -> Any:
+  if name == "YoloV8NDetector":
+    from .yolov8n import YoloV8NDetector
+
+    return YoloV8NDetector
+  if name == "OnnxYoloDetector":
+    from .onnx_yolo import OnnxYoloDetector
+
+    return OnnxYoloDetector
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
   "Detector",
+  "OnnxYoloDetector",
   "YoloV8NDetector",
   "canonical_detector_name",
   "create_detector",
 ]
-
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Sequence
 
 import numpy as np
 
@@ -9,8 +10,16 @@ from ..schemas import Detection
 
 class Detector(ABC):
   @abstractmethod
-  def detect_frame(self, image: np.ndarray) -> list[Detection]:
+  def detect_frame(self, image: np.ndarray) -> Sequence[Detection]:
     """
-    Run detector inference on a frame and return detections in normalized xywh.
+    Run detector inference on a frame and return detections in normalized xywh,
+    either as a list or as columnar `DetectionArrays`.
     """
 
+  def detect_batch(self, frames: Sequence[np.ndarray]) -> list[Sequence[Detection]]:
+    """
+    Run inference on several frames; results are returned in input order.
+
+    Backends with a real batched forward pass should override this.
+    """
+    return [self.detect_frame(frame) for frame in frames]
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Sequence
+
+import cv2
+import numpy as np
+
+from ..schemas import Detection, DetectionArrays
+from .base import Detector
+from .paths import resolve_model_path
+
+try:
+  import onnxruntime as ort
+except Exception as exc:  # pragma: no cover
+  ort = None
+  _ONNXRUNTIME_IMPORT_ERROR = exc
+else:  # pragma: no cover
+  _ONNXRUNTIME_IMPORT_ERROR = None
+
+
+PERSON_CLASS = 0
+_LETTERBOX_FILL = 114
+
+
+@lru_cache(maxsize=4)
+def _load_session(model_name: str, intra_op_threads: int, device: str, quantized: bool) -> Any:
+  if ort is None:
+    raise RuntimeError("onnxruntime is not available") from _ONNXRUNTIME_IMPORT_ERROR
+  model_path = resolve_model_path(model_name)
+  if not Path(model_path).is_file():
+    raise FileNotFoundError(
+      f"ONNX model not found: '{model_name}'. Export one with "
+      "`yolo export model=yolov8n.pt format=onnx dynamic=True`."
+    )
+  if quantized:
+    model_path = str(quantized_model_path(Path(model_path)))
+  options = ort.SessionOptions()
+  options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+  if intra_op_threads > 0:
+    options.intra_op_num_threads = intra_op_threads
+  providers = ["CPUExecutionProvider"]
+  if device.startswith("cuda"):
+    providers.insert(0, "CUDAExecutionProvider")
+  return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+
+def quantize_int8(model_path: Path, output_path: Path) -> Path:
+  """
+  Write a dynamically int8-quantized copy of an exported YOLOv8 ONNX model.
+  Weights are stored as int8 and activations quantized at runtime, which
+  needs no calibration data.
+  """
+  from onnxruntime.quantization import QuantType, quantize_dynamic
+
+  quantize_dynamic(str(model_path), str(output_path), weight_type=QuantType.QInt8)
+  return output_path
+
+
+def quantized_model_path(model_path: Path) -> Path:
+  """
+  Return the int8 copy of `model_path` (`<name>.int8.onnx` beside it),
+  quantizing it first when it is missing or older than the model.
+  """
+  output_path = model_path.with_name(f"{model_path.stem}.int8.onnx")
+  if output_path.is_file() and output_path.stat().st_mtime >= model_path.stat().st_mtime:
+    return output_path
+  tmp_path = output_path.with_name(output_path.name + ".tmp")
+  try:
+    quantize_int8(model_path, tmp_path)
+    os.replace(tmp_path, output_path)
+  finally:
+    tmp_path.unlink(missing_ok=True)
+  return output_path
+
+
+def letterbox(image: np.ndarray, size: int) -> tuple[np.ndarray, float, float, float]:
+  """
+  Resize `image` to fit a `size` x `size` square keeping its aspect ratio and
+  pad the rest, as Ultralytics does. Returns (square, scale, pad_x, pad_y).
+  """
+  height, width = image.shape[:2]
+  scale = min(size / float(height), size / float(width))
+  resized_w = max(1, int(round(width * scale)))
+  resized_h = max(1, int(round(height * scale)))
+  pad_x = (size - resized_w) / 2.0
+  pad_y = (size - resized_h) / 2.0
+  square = np.full((size, size, 3), _LETTERBOX_FILL, dtype=np.uint8)
+  left = int(round(pad_x - 0.1))
+  top = int(round(pad_y - 0.1))
+  if (resized_w, resized_h) != (width, height):
+    image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+  square[top : top + resized_h, left : left + resized_w] = image
+  return square, scale, float(left), float(top)
+
+
+def nms(boxes_xyxy: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+  """Greedy non-maximum suppression; returns kept indices by descending score."""
+  order = np.argsort(-scores, kind="stable")
+  x1, y1, x2, y2 = boxes_xyxy.T
+  areas = np.maximum(0.0, x2 - x1) * np.maximum(0.0, y2 - y1)
+  keep: list[int] = []
+  while order.size:
+    best = order[0]
+    keep.append(int(best))
+    rest = order[1:]
+    iw = np.maximum(0.0, np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]))
+    ih = np.maximum(0.0, np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]))
+    inter = iw * ih
+    union = areas[best] + areas[rest] - inter
+    iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0.0)
+    order = rest[iou <= iou_threshold]
+  return np.asarray(keep, dtype=np.int64)
+
+
+def decode_predictions(
+  prediction: np.ndarray,
+  conf: float,
+  iou: float,
+  scale: float,
+  pad_x: float,
+  pad_y: float,
+  width: int,
+  height: int,
+  max_det: int = 300,
+) -> DetectionArrays:
+  """
+  Turn one image's raw YOLOv8 output (4 + num_classes, anchors) into
+  person detections normalized to the original `width` x `height` frame.
+  """
+  person_scores = prediction[4 + PERSON_CLASS]
+  mask = person_scores > conf
+  if not np.any(mask):
+    return DetectionArrays.empty()
+  cx, cy, w, h = prediction[:4, mask]
+  scores = person_scores[mask]
+  boxes = np.stack((cx - (w / 2.0), cy - (h / 2.0), cx + (w / 2.0), cy + (h / 2.0)), axis=1)
+  keep = nms(boxes, scores, iou)[:max_det]
+  # Undo the letterbox; clipping and normalization happen in from_xyxy.
+  boxes = boxes[keep]
+  boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
+  boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
+  return DetectionArrays.from_xyxy(
+    boxes, scores[keep], np.full(keep.size, PERSON_CLASS), width, height
+  )
+
+
+@dataclass(slots=True)
+class OnnxYoloDetector(Detector):
+  """
+  YOLOv8 exported to ONNX, run with onnxruntime. Letterboxing and NMS are
+  done in NumPy, so torch/ultralytics are not imported.
+  """
+
+  model_name: str = "yolov8n.onnx"
+  device: str = "cpu"
+  imgsz: int = 640
+  conf: float = 0.25
+  iou: float = 0.5
+  intra_op_threads: int = 0
+  quantized: bool = False
+
+  def __post_init__(self) -> None:
+    self._session = _load_session(
+      self.model_name, self.intra_op_threads, self.device, self.quantized
+    )
+    model_input = self._session.get_inputs()[0]
+    self._input_name = model_input.name
+    # Models exported without dynamic=True only accept a batch of one.
+    self._dynamic_batch = not isinstance(model_input.shape[0], int)
+    input_size = model_input.shape[2]
+    if isinstance(input_size, int):
+      self.imgsz = input_size
+
+  def _infer(self, frames: Sequence[np.ndarray]) -> list[DetectionArrays]:
+    tensors = []
+    transforms = []
+    for frame in frames:
+      square, scale, pad_x, pad_y = letterbox(frame, self.imgsz)
+      # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+      tensors.append(square[:, :, ::-1].transpose(2, 0, 1))
+      transforms.append((scale, pad_x, pad_y))
+    batch = np.ascontiguousarray(np.stack(tensors), dtype=np.float32) / 255.0
+    predictions = self._session.run(None, {self._input_name: batch})[0]
+
+    output: list[DetectionArrays] = []
+    for frame, prediction, (scale, pad_x, pad_y) in zip(frames, predictions, transforms):
+      height, width = frame.shape[:2]
+      output.append(
+        decode_predictions(
+          prediction,
+          conf=self.conf,
+          iou=self.iou,
+          scale=scale,
+          pad_x=pad_x,
+          pad_y=pad_y,
+          width=width,
+          height=height,
+        )
+      )
+    return output
+
+  def detect_frame(self, image: np.ndarray) -> Sequence[Detection]:
+    height, width = image.shape[:2]
+    if height <= 0 or width <= 0:
+      return DetectionArrays.empty()
+    return self._infer([image])[0]
+
+  def detect_batch(self, frames: Sequence[np.ndarray]) -> list[Sequence[Detection]]:
+    valid = [idx for idx, frame in enumerate(frames) if frame.shape[0] > 0 and frame.shape[1] > 0]
+    output: list[Sequence[Detection]] = [DetectionArrays.empty() for _ in frames]
+    if not valid:
+      return output
+    if self._dynamic_batch:
+      results = self._infer([frames[idx] for idx in valid])
+    else:
+      results = [self._infer([frames[idx]])[0] for idx in valid]
+    for idx, detections in zip(valid, results):
+      output[idx] = detections
+    return output
+
+  @property
+  def model_source(self) -> str:
+    return "onnxruntime"
+
+  @property
+  def detector_version(self) -> str | None:
+    return getattr(ort, "__version__", None)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def resolve_model_path(model_name: str) -> str:
+  candidate = Path(model_name)
+  backend_root = Path(__file__).resolve().parents[3]
+  if candidate.is_absolute():
+    resolved_candidate = candidate.resolve()
+    if resolved_candidate.exists() and resolved_candidate.is_relative_to(backend_root):
+      return str(resolved_candidate)
+  else:
+    local_candidate = (backend_root / candidate).resolve()
+    if local_candidate.exists() and local_candidate.is_relative_to(backend_root):
+      return str(local_candidate)
+
+  for local_dir in (backend_root / "models", backend_root / "data" / "models"):
+    local_model = local_dir / model_name
+    if local_model.exists():
+      return str(local_model)
+
+  # Allow plain model names (for Ultralytics download/cache behavior), but
+  # block path-based lookups that do not resolve inside backend/.
+  if candidate.is_absolute() or len(candidate.parts) > 1:
+    raise FileNotFoundError(
+      "Detector model path must resolve inside backend/. "
+      f"Got '{model_name}'."
+    )
+  return model_name
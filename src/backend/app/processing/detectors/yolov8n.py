@@ -2,13 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import lru_cache
-from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 import numpy as np
 
-from ..schemas import BBox, Detection
+from ..schemas import Detection, DetectionArrays
 from .base import Detector
+from .paths import resolve_model_path
 
 try:
   from ultralytics import YOLO
@@ -19,38 +19,20 @@ else:  # pragma: no cover
   _ULTRALYTICS_IMPORT_ERROR = None
 
 
-def _resolve_model_path(model_name: str) -> str:
-  candidate = Path(model_name)
-  backend_root = Path(__file__).resolve().parents[3]
-  if candidate.is_absolute():
-    resolved_candidate = candidate.resolve()
-    if resolved_candidate.exists() and resolved_candidate.is_relative_to(backend_root):
-      return str(resolved_candidate)
-  else:
-    local_candidate = (backend_root / candidate).resolve()
-    if local_candidate.exists() and local_candidate.is_relative_to(backend_root):
-      return str(local_candidate)
-
-  for local_dir in (backend_root / "models", backend_root / "data" / "models"):
-    local_model = local_dir / model_name
-    if local_model.exists():
-      return str(local_model)
-
-  # Allow plain model names (for Ultralytics download/cache behavior), but
-  # block path-based lookups that do not resolve inside backend/.
-  if candidate.is_absolute() or len(candidate.parts) > 1:
-    raise FileNotFoundError(
-      "Detector model path must resolve inside backend/. "
-      f"Got '{model_name}'."
-    )
-  return model_name
-
-
 @lru_cache(maxsize=4)
 def _load_model(model_name: str) -> Any:
   if YOLO is None:
     raise RuntimeError("Ultralytics is not available") from _ULTRALYTICS_IMPORT_ERROR
-  return YOLO(_resolve_model_path(model_name))
+  return YOLO(resolve_model_path(model_name))
+
+
+def _result_detections(result: Any, width: int, height: int) -> DetectionArrays:
+  boxes = getattr(result, "boxes", None)
+  if boxes is None or len(boxes) == 0:
+    return DetectionArrays.empty()
+  # One device-to-host copy of (N, 6+) rows: x1, y1, x2, y2, [track id,] conf, cls.
+  data = boxes.data.cpu().numpy()
+  return DetectionArrays.from_xyxy(data[:, :4], data[:, -2], data[:, -1], width, height)
 
 
 @dataclass(slots=True)
@@ -64,13 +46,9 @@ class YoloV8NDetector(Detector):
   def __post_init__(self) -> None:
     self._model = _load_model(self.model_name)
 
-  def detect_frame(self, image: np.ndarray) -> list[Detection]:
-    height, width = image.shape[:2]
-    if height <= 0 or width <= 0:
-      return []
-
-    results = self._model.predict(
-      image,
+  def _predict(self, source: Any) -> list[Any]:
+    return self._model.predict(
+      source,
       conf=self.conf,
       iou=self.iou,
       classes=[0],  # person
@@ -79,33 +57,28 @@ class YoloV8NDetector(Detector):
       verbose=False,
     )
 
-    output: list[Detection] = []
-    for result in results:
-      boxes = getattr(result, "boxes", None)
-      if boxes is None:
-        continue
-      for box in boxes:
-        x1, y1, x2, y2 = [float(v) for v in box.xyxy[0].tolist()]
-        x1 = max(0.0, min(x1, float(width)))
-        y1 = max(0.0, min(y1, float(height)))
-        x2 = max(0.0, min(x2, float(width)))
-        y2 = max(0.0, min(y2, float(height)))
-        w = max(0.0, x2 - x1)
-        h = max(0.0, y2 - y1)
-        if w <= 0.0 or h <= 0.0:
-          continue
-        output.append(
-          Detection(
-            bbox=BBox(
-              x=x1 / float(width),
-              y=y1 / float(height),
-              w=w / float(width),
-              h=h / float(height),
-            ),
-            conf=float(box.conf[0]),
-            cls=int(box.cls[0]),
-          )
-        )
+  def detect_frame(self, image: np.ndarray) -> Sequence[Detection]:
+    height, width = image.shape[:2]
+    if height <= 0 or width <= 0:
+      return DetectionArrays.empty()
+
+    # A single image yields a single result.
+    results = self._predict(image)
+    if not results:
+      return DetectionArrays.empty()
+    return _result_detections(results[0], width=width, height=height)
+
+  def detect_batch(self, frames: Sequence[np.ndarray]) -> list[Sequence[Detection]]:
+    valid = [idx for idx, frame in enumerate(frames) if frame.shape[0] > 0 and frame.shape[1] > 0]
+    output: list[Sequence[Detection]] = [DetectionArrays.empty() for _ in frames]
+    if not valid:
+      return output
+
+    # Ultralytics returns one result per input image, in input order.
+    results = self._predict([frames[idx] for idx in valid])
+    for idx, result in zip(valid, results):
+      height, width = frames[idx].shape[:2]
+      output[idx] = _result_detections(result, width=width, height=height)
     return output
 
   @property
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+import cv2
+import numpy as np
+
+from .schemas import ProcessingConfig, VideoMeta
+
+
+@dataclass(slots=True)
+class DecodeStats:
+  mode: str
+  frames_grabbed: int = 0
+  frames_decoded: int = 0
+  decode_seconds: float = 0.0
+
+  def to_diagnostics(self) -> dict[str, Any]:
+    seconds = self.decode_seconds
+    return {
+      "decodeMode": self.mode,
+      "decodedFrames": self.frames_decoded,
+      "decodeSeconds": round(seconds, 3),
+      "decodeFps": round(self.frames_grabbed / seconds, 2) if seconds > 0.0 else 0.0,
+    }
+
+  @classmethod
+  def combine(cls, parts: list["DecodeStats"]) -> "DecodeStats":
+    total = cls(mode=parts[0].mode if parts else "none")
+    for part in parts:
+      total.frames_grabbed += part.frames_grabbed
+      total.frames_decoded += part.frames_decoded
+      total.decode_seconds += part.decode_seconds
+    return total
+
+
+class FrameSource(Protocol):
+  """
+  Iterable of (frame_idx, frame) pairs for the frames the pipeline analyzes.
+
+  Frame indices are absolute positions in the source video, so callers can
+  derive timestamps without knowing how frames were sampled.
+  """
+
+  stats: DecodeStats
+
+  def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+    ...
+
+  def close(self) -> None:
+    ...
+
+
+def probe_fps(video_path: Path, default: float = 30.0) -> float:
+  cap = cv2.VideoCapture(str(video_path))
+  try:
+    return float(cap.get(cv2.CAP_PROP_FPS) or 0.0) or default
+  finally:
+    cap.release()
+
+
+def scaled_frame_size(width: int, height: int, long_side: int) -> tuple[int, int]:
+  """
+  Size with the same aspect ratio whose long side is at most `long_side`.
+  Dimensions are kept even, as most ffmpeg pixel formats require.
+  """
+  if width <= 0 or height <= 0 or long_side <= 0:
+    return width, height
+  scale = min(1.0, float(long_side) / float(max(width, height)))
+  scaled_w = max(2, int(round(width * scale / 2.0)) * 2)
+  scaled_h = max(2, int(round(height * scale / 2.0)) * 2)
+  return scaled_w, scaled_h
+
+
+class OpenCvFrameSource:
+  """
+  Sampled decode through cv2.VideoCapture.
+
+  In "grab" mode skipped frames are only grabbed (demuxed and decoded by the
+  backend, but never converted to BGR or copied out), and only every
+  `stride`-th frame is retrieved. "read" mode is the legacy full-decode path.
+  A non-zero `start_frame` seeks first (the backend decodes forward from the
+  preceding keyframe); iteration stops before `end_frame`.
+  """
+
+  def __init__(
+    self,
+    video_path: Path,
+    stride: int,
+    decode_mode: str = "grab",
+    start_frame: int = 0,
+    end_frame: int | None = None,
+  ) -> None:
+    if decode_mode not in ("grab", "read"):
+      raise ValueError(f"Unsupported decode_mode '{decode_mode}'. Supported: grab, read.")
+    self.stride = max(1, int(stride))
+    self.decode_mode = decode_mode
+    self.start_frame = max(0, int(start_frame))
+    self.end_frame = end_frame
+    self.stats = DecodeStats(mode=f"opencv-{decode_mode}")
+    self._cap = cv2.VideoCapture(str(video_path))
+    if not self._cap.isOpened():
+      raise RuntimeError(f"Unable to open video: {video_path}")
+    if self.start_frame > 0:
+      self._cap.set(cv2.CAP_PROP_POS_FRAMES, float(self.start_frame))
+
+  def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+    frame_idx = self.start_frame
+    stats = self.stats
+    grab_only = self.decode_mode == "grab"
+    while self.end_frame is None or frame_idx < self.end_frame:
+      wanted = frame_idx % self.stride == 0
+      started = time.perf_counter()
+      if wanted or not grab_only:
+        ok, frame = self._cap.read()
+      else:
+        ok, frame = self._cap.grab(), None
+      stats.decode_seconds += time.perf_counter() - started
+      if not ok:
+        return
+      stats.frames_grabbed += 1
+      if wanted:
+        stats.frames_decoded += 1
+        yield frame_idx, frame
+      elif not grab_only:
+        stats.frames_decoded += 1
+      frame_idx += 1
+
+  def close(self) -> None:
+    self._cap.release()
+
+
+class FfmpegRawFrameSource:
+  """
+  Sampled, downscaled decode through an ffmpeg `rawvideo` pipe.
+
+  ffmpeg drops unsampled frames with a `select` filter, scales the rest to
+  `width`x`height` and streams packed BGR24 into a fixed ring of preallocated
+  NumPy buffers via `readinto`, so no per-frame arrays are allocated.
+
+  A yielded frame is a view into the ring and is overwritten `pool_size`
+  frames later; `pool_size` must exceed the number of frames the consumer
+  holds at once (prefetch queue + detector batch).
+
+  `start_frame` should be a multiple of `stride` so sampled frames line up
+  with a decode from frame 0. It is reached with a fast input-side `-ss` seek
+  to a second earlier, then frames are selected by timestamp (`-copyts`);
+  this assumes constant frame rate starting at t=0, which holds for the
+  worker's transcoded uploads.
+  """
+
+  def __init__(
+    self,
+    video_path: Path,
+    stride: int,
+    width: int,
+    height: int,
+    pool_size: int,
+    fps: float = 0.0,
+    start_frame: int = 0,
+    end_frame: int | None = None,
+  ) -> None:
+    if width <= 0 or height <= 0:
+      raise ValueError(f"Invalid ffmpeg output size {width}x{height}")
+    if start_frame > 0 and fps <= 0.0:
+      raise ValueError("fps is required to seek the ffmpeg frame source")
+    self.video_path = video_path
+    self.stride = max(1, int(stride))
+    self.width = width
+    self.height = height
+    self.fps = fps
+    self.start_frame = max(0, int(start_frame))
+    self.end_frame = end_frame
+    self.stats = DecodeStats(mode="ffmpeg-rawvideo")
+    self._pool = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(2, pool_size))]
+    self._proc: subprocess.Popen[bytes] | None = None
+    self._stderr = tempfile.TemporaryFile()
+
+  def _command(self) -> list[str]:
+    seek: list[str] = []
+    select = f"select='not(mod(n\\,{self.stride}))'"
+    if self.start_frame > 0:
+      seek = ["-ss", f"{max(0.0, (self.start_frame / self.fps) - 1.0):.6f}", "-copyts"]
+      frame_expr = f"round(t*{self.fps:.6f})"
+      select = (
+        f"select='gte({frame_expr}\\,{self.start_frame})"
+        f"*not(mod({frame_expr}\\,{self.stride}))'"
+      )
+    limit: list[str] = []
+    if self.end_frame is not None:
+      wanted = max(0, -(-(self.end_frame - self.start_frame) // self.stride))
+      limit = ["-frames:v", str(wanted)]
+    return [
+      "ffmpeg",
+      "-nostdin",
+      "-nostats",
+      "-loglevel",
+      "error",
+      *seek,
+      "-i",
+      str(self.video_path),
+      *limit,
+      "-an",
+      "-sn",
+      "-vf",
+      f"{select},scale={self.width}:{self.height}",
+      # Emit selected frames as-is so output frame k is start_frame + k * stride.
+      "-vsync",
+      "0",
+      "-pix_fmt",
+      "bgr24",
+      "-f",
+      "rawvideo",
+      "pipe:1",
+    ]
+
+  def _read_into(self, stream: Any, view: memoryview) -> int:
+    filled = 0
+    total = len(view)
+    while filled < total:
+      count = stream.readinto(view[filled:])
+      if not count:
+        break
+      filled += count
+    return filled
+
+  def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+    try:
+      self._proc = subprocess.Popen(
+        self._command(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=self._stderr,
+      )
+    except FileNotFoundError as e:
+      raise RuntimeError("ffmpeg not found. Install with: apt install ffmpeg") from e
+
+    stream = self._proc.stdout
+    assert stream is not None
+    views = [memoryview(buffer).cast("B") for buffer in self._pool]
+    stats = self.stats
+    output_idx = 0
+    while True:
+      slot = output_idx % len(self._pool)
+      started = time.perf_counter()
+      filled = self._read_into(stream, views[slot])
+      stats.decode_seconds += time.perf_counter() - started
+      if filled < len(views[slot]):
+        break
+      frame_idx = self.start_frame + (output_idx * self.stride)
+      stats.frames_decoded += 1
+      # ffmpeg decodes every frame and selects each stride-th one: count the frames
+      # this source read since its previous output, so segment stats add up.
+      stats.frames_grabbed += self.stride if output_idx else 1
+      yield frame_idx, self._pool[slot]
+      output_idx += 1
+
+    returncode = self._proc.wait()
+    if returncode != 0:
+      self._stderr.seek(0)
+      err_text = self._stderr.read().decode("utf-8", errors="replace").strip()
+      raise RuntimeError(f"ffmpeg failed: {err_text or returncode}")
+
+  def close(self) -> None:
+    if self._proc is not None:
+      if self._proc.poll() is None:
+        self._proc.kill()
+      if self._proc.stdout is not None:
+        self._proc.stdout.close()
+      self._proc.wait()
+    self._stderr.close()
+
+
+@dataclass(slots=True)
+class PrefetchStats:
+  capacity: int
+  depth_sum: int = 0
+  depth_samples: int = 0
+  max_depth: int = 0
+  producer_blocked_seconds: float = 0.0
+  consumer_wait_seconds: float = 0.0
+
+  def to_diagnostics(self) -> dict[str, Any]:
+    samples = self.depth_samples
+    return {
+      "prefetchCapacity": self.capacity,
+      "prefetchAvgQueueDepth": round(self.depth_sum / samples, 2) if samples else 0.0,
+      "prefetchMaxQueueDepth": self.max_depth,
+      "prefetchProducerBlockedSeconds": round(self.producer_blocked_seconds, 3),
+      "prefetchConsumerWaitSeconds": round(self.consumer_wait_seconds, 3),
+    }
+
+
+_END_OF_STREAM = object()
+
+
+class PrefetchingFrameSource:
+  """
+  Decodes frames from `inner` on a background thread into a bounded queue.
+
+  The queue bound is the backpressure: once `capacity` frames are waiting the
+  decoder blocks until the consumer catches up, so memory stays bounded while
+  decode overlaps with detection. Decoder exceptions are re-raised in the
+  consuming thread.
+  """
+
+  def __init__(self, inner: FrameSource, capacity: int) -> None:
+    self.inner = inner
+    self.prefetch_stats = PrefetchStats(capacity=max(1, int(capacity)))
+    self._queue: queue.Queue[Any] = queue.Queue(maxsize=self.prefetch_stats.capacity)
+    self._stop = threading.Event()
+    self._thread: threading.Thread | None = None
+
+  @property
+  def stats(self) -> DecodeStats:
+    return self.inner.stats
+
+  def _put(self, item: Any) -> bool:
+    started = time.perf_counter()
+    while not self._stop.is_set():
+      try:
+        self._queue.put(item, timeout=0.1)
+      except queue.Full:
+        continue
+      self.prefetch_stats.producer_blocked_seconds += time.perf_counter() - started
+      return True
+    return False
+
+  def _produce(self) -> None:
+    try:
+      for item in self.inner:
+        if not self._put(item):
+          return
+      self._put(_END_OF_STREAM)
+    except BaseException as exc:  # noqa: BLE001
+      self._put(exc)
+
+  def __iter__(self) -> Iterator[tuple[int, np.ndarray]]:
+    if self._thread is not None:
+      raise RuntimeError("PrefetchingFrameSource can only be iterated once")
+    self._thread = threading.Thread(target=self._produce, name="frame-prefetch", daemon=True)
+    self._thread.start()
+    stats = self.prefetch_stats
+    while True:
+      depth = self._queue.qsize()
+      stats.depth_sum += depth
+      stats.depth_samples += 1
+      stats.max_depth = max(stats.max_depth, depth)
+      started = time.perf_counter()
+      item = self._queue.get()
+      stats.consumer_wait_seconds += time.perf_counter() - started
+      if item is _END_OF_STREAM:
+        return
+      if isinstance(item, BaseException):
+        raise item
+      yield item
+
+  def close(self) -> None:
+    self._stop.set()
+    if self._thread is not None:
+      # Unblock a producer waiting on a full queue, then let it observe _stop.
+      while self._thread.is_alive():
+        try:
+          self._queue.get_nowait()
+        except queue.Empty:
+          pass
+        self._thread.join(timeout=0.05)
+    self.inner.close()
+
+
+def create_frame_source(
+  video_path: Path,
+  video_meta: VideoMeta,
+  config: ProcessingConfig,
+  stride: int,
+  start_frame: int = 0,
+  end_frame: int | None = None,
+) -> FrameSource:
+  """
+  Build the decoder selected by `config.frame_source`, wrapped in a
+  prefetching thread when `config.prefetch_frames` is positive.
+  """
+  name = (config.frame_source or "").strip().lower()
+  decoder: FrameSource
+  if name == "opencv":
+    decoder = OpenCvFrameSource(
+      video_path,
+      stride=stride,
+      decode_mode=config.decode_mode,
+      start_frame=start_frame,
+      end_frame=end_frame,
+    )
+  elif name == "ffmpeg":
+    width, height = scaled_frame_size(
+      video_meta.width,
+      video_meta.height,
+      config.frame_source_long_side or config.detector_imgsz,
+    )
+    decoder = FfmpegRawFrameSource(
+      video_path,
+      stride=stride,
+      width=width,
+      height=height,
+      # Frames alive at once: queued + batched + in hand-off + the one being filled.
+      pool_size=max(0, config.prefetch_frames) + max(1, config.detector_batch_size) + 3,
+      fps=video_meta.fps,
+      start_frame=start_frame,
+      end_frame=end_frame,
+    )
+  else:
+    raise ValueError(
+      f"Unsupported frame_source '{config.frame_source}'. Supported frame sources: ffmpeg, opencv."
+    )
+
+  if config.prefetch_frames > 0:
+    return PrefetchingFrameSource(decoder, capacity=config.prefetch_frames)
+  return decoder
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+  """
+  Cheap frame-difference gate in front of the detector.
+
+  Each frame is reduced to a small grayscale thumbnail and compared with the
+  thumbnail of the last frame that was sent to the detector. When the mean
+  absolute difference (0..1) stays below `threshold` the frame is skipped and
+  the previous detection is carried forward. At most `max_skip` consecutive
+  frames are skipped so slow drift cannot accumulate indefinitely.
+  """
+
+  def __init__(self, threshold: float, max_skip: int, size: tuple[int, int] = (64, 36)) -> None:
+    self.threshold = threshold
+    self.max_skip = max(0, max_skip)
+    self.size = size
+    self.skipped_total = 0
+    self._reference: Optional[np.ndarray] = None
+    self._skipped_run = 0
+
+  def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+  def should_detect(self, frame: np.ndarray) -> bool:
+    thumbnail = self._thumbnail(frame)
+    if self._reference is not None and self._skipped_run < self.max_skip:
+      motion = float(cv2.absdiff(thumbnail, self._reference).mean()) / 255.0
+      if motion < self.threshold:
+        self._skipped_run += 1
+        self.skipped_total += 1
+        return False
+    self._reference = thumbnail
+    self._skipped_run = 0
+    return True
+
+  def reset(self) -> None:
+    self._reference = None
+    self._skipped_run = 0
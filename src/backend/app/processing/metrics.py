@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-import math
+from typing import Sequence, Union
 
 import numpy as np
 
-from .schemas import TrackPoint
+from .schemas import QUALITY_LOST, TrackArrays, TrackPoint
 
 
-def compute_derived_metrics(points: list[TrackPoint]) -> dict[str, float | int]:
-  if not points:
+def _sequential_sum(values: np.ndarray) -> float:
+  # np.sum uses pairwise summation; a running sum keeps the left-to-right
+  # rounding of a plain Python loop.
+  return float(np.cumsum(values)[-1]) if values.size else 0.0
+
+
+def compute_derived_metrics(
+  points: Union[Sequence[TrackPoint], TrackArrays],
+  nominal_interval_ms: float | None = None,
+) -> dict[str, float | int]:
+  """
+  Coverage, gap and movement metrics for a track.
+
+  Points are treated as evenly spaced unless `nominal_interval_ms` is given
+  (adaptive sampling). Then coverage is weighted by how long each point
+  stands for, and jitter is computed on steps rescaled to the nominal
+  interval so it stays comparable with fixed-rate runs.
+  """
+  track = points if isinstance(points, TrackArrays) else TrackArrays.from_points(points)
+  if len(track) == 0:
     return {
       "coverage": 0.0,
       "gapCount": 0,
@@ -17,28 +35,28 @@ def compute_derived_metrics(points: list[TrackPoint]) -> dict[str, float | int]:
       "jitter": 0.0,
     }
 
-  total = len(points)
-  covered = sum(1 for p in points if p.quality in {"measured", "interpolated"})
-  coverage = covered / float(total)
+  valid = track.quality != QUALITY_LOST
+  if nominal_interval_ms is None:
+    coverage = int(np.count_nonzero(valid)) / float(len(track))
+  else:
+    durations = np.empty(len(track), dtype=np.float64)
+    durations[:-1] = np.maximum(0, np.diff(track.t_ms))
+    durations[-1] = nominal_interval_ms
+    total_ms = _sequential_sum(durations)
+    covered_ms = _sequential_sum(durations[valid])
+    coverage = covered_ms / total_ms if total_ms > 0.0 else 0.0
 
-  gap_count = 0
+  # A gap runs from its first lost point to the next non-lost point (or the
+  # last point when the track ends lost).
+  starts, ends = track.lost_runs()
+  gap_count = int(starts.size)
   longest_gap_ms = 0
-  gap_start_t: int | None = None
-  for point in points:
-    if point.quality == "lost":
-      if gap_start_t is None:
-        gap_start_t = point.t_ms
-    elif gap_start_t is not None:
-      gap_count += 1
-      longest_gap_ms = max(longest_gap_ms, max(0, point.t_ms - gap_start_t))
-      gap_start_t = None
+  if gap_count:
+    gap_ends = track.t_ms[np.minimum(ends, len(track) - 1)]
+    longest_gap_ms = max(0, int(np.max(gap_ends - track.t_ms[starts])))
 
-  if gap_start_t is not None:
-    gap_count += 1
-    longest_gap_ms = max(longest_gap_ms, max(0, points[-1].t_ms - gap_start_t))
-
-  valid = [p for p in points if p.quality in {"measured", "interpolated"}]
-  if len(valid) < 2:
+  valid_t = track.t_ms[valid]
+  if valid_t.size < 2:
     return {
       "coverage": coverage,
       "gapCount": gap_count,
@@ -47,18 +65,17 @@ def compute_derived_metrics(points: list[TrackPoint]) -> dict[str, float | int]:
       "jitter": 0.0,
     }
 
-  step_vectors: list[tuple[float, float]] = []
-  step_magnitudes: list[float] = []
-  distance = 0.0
-  for idx in range(1, len(valid)):
-    dx = valid[idx].cx - valid[idx - 1].cx
-    dy = valid[idx].cy - valid[idx - 1].cy
-    step_vectors.append((dx, dy))
-    magnitude = math.sqrt((dx * dx) + (dy * dy))
-    step_magnitudes.append(magnitude)
-    distance += magnitude
+  dx = np.diff(track.cx[valid])
+  dy = np.diff(track.cy[valid])
+  # sqrt of the sum of squares (not np.hypot) matches the scalar math.sqrt result.
+  magnitudes = np.sqrt((dx * dx) + (dy * dy))
+  distance = _sequential_sum(magnitudes)
+  if nominal_interval_ms is not None:
+    dt_ms = np.diff(valid_t)
+    moving = dt_ms > 0
+    magnitudes[moving] *= nominal_interval_ms / dt_ms[moving].astype(np.float64)
 
-  jitter = float(np.std(np.asarray(step_magnitudes, dtype=float))) if step_magnitudes else 0.0
+  jitter = float(np.std(magnitudes))
   return {
     "coverage": coverage,
     "gapCount": gap_count,
@@ -66,4 +83,3 @@ def compute_derived_metrics(points: list[TrackPoint]) -> dict[str, float | int]:
     "distance": float(distance),
     "jitter": jitter,
   }
-
@@ -0,0 +1,208 @@
+"""
+Split one video into frame ranges and run decode + detection for each range
+in a separate process.
+
+Only detection is parallelized. Cleaning and tracking depend on the previous
+frame's state, so the caller replays the stitched per-frame detections through
+the tracker serially, which keeps the output identical to a serial run
+unless the motion gate is on. Each segment then starts with a fresh gate: its
+first sampled frame is always detected and the skip cadence restarts there,
+so which frames carry a detection forward (and, in a moving scene, their
+boxes) can differ from a serial run.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import cv2
+
+from .detection import RawDetections, detect_range
+from .detectors import create_detector
+from .frames import DecodeStats
+from .schemas import ProcessingConfig, VideoMeta
+
+
+@dataclass(slots=True)
+class Segment:
+  start_frame: int
+  end_frame: Optional[int]  # exclusive; None runs to the end of the video
+
+
+@dataclass(slots=True)
+class SegmentResult:
+  segment: Segment
+  detections: list[RawDetections]
+  decode_stats: DecodeStats
+  detector_calls: int
+  detector_seconds: float
+  skipped_detections: int
+  wall_seconds: float
+  detector_version: Optional[str] = None
+  model_source: str = "ultralytics"
+
+
+def keyframe_indices(video_path: Path, fps: float) -> list[int]:
+  """
+  Frame indices of video keyframes, read from packet flags with ffprobe
+  (no decoding). Returns an empty list when ffprobe is unavailable or fails.
+  """
+  if fps <= 0.0:
+    return []
+  try:
+    output = subprocess.run(
+      [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,flags",
+        "-of",
+        "csv=print_section=0",
+        str(video_path),
+      ],
+      check=False,
+      stdout=subprocess.PIPE,
+      stderr=subprocess.DEVNULL,
+      text=True,
+      timeout=120,
+    ).stdout
+  except Exception:  # noqa: BLE001
+    return []
+
+  indices: set[int] = set()
+  for line in output.splitlines():
+    pts_time, _, flags = line.partition(",")
+    if "K" not in flags:
+      continue
+    try:
+      indices.add(int(round(float(pts_time) * fps)))
+    except ValueError:
+      continue
+  return sorted(indices)
+
+
+def plan_segments(
+  frame_count: int,
+  stride: int,
+  count: int,
+  keyframes: Optional[list[int]] = None,
+  min_sampled_frames: int = 32,
+) -> list[Segment]:
+  """
+  Split [0, frame_count) into up to `count` contiguous segments.
+
+  Boundaries are snapped to the nearest keyframe when keyframes are known
+  (so each worker's seek lands on a cheap decode start) and then rounded up
+  to a multiple of `stride` so every worker samples the same frames a serial
+  decode would.
+  """
+  stride = max(1, stride)
+  count = max(1, min(count, frame_count // (stride * max(1, min_sampled_frames))))
+  if frame_count <= 0 or count <= 1:
+    return [Segment(start_frame=0, end_frame=None)]
+
+  boundaries: list[int] = []
+  for idx in range(1, count):
+    target = (frame_count * idx) // count
+    if keyframes:
+      target = min(keyframes, key=lambda k: abs(k - target))
+    aligned = -(-target // stride) * stride
+    if 0 < aligned < frame_count and (not boundaries or aligned > boundaries[-1]):
+      boundaries.append(aligned)
+
+  starts = [0, *boundaries]
+  ends: list[Optional[int]] = [*boundaries, None]
+  return [Segment(start_frame=s, end_frame=e) for s, e in zip(starts, ends)]
+
+
+def _init_segment_worker(threads: int) -> None:
+  # Keep N processes x M intra-op threads within the machine's cores.
+  cv2.setNumThreads(threads)
+  torch = sys.modules.get("torch")
+  if torch is not None:
+    torch.set_num_threads(threads)
+
+
+def _detect_segment(
+  video_path: Path,
+  video_meta: VideoMeta,
+  cfg: ProcessingConfig,
+  stride: int,
+  segment: Segment,
+  start_time: float,
+) -> SegmentResult:
+  started = time.monotonic()
+  detector = create_detector(cfg)
+  diagnostics: dict[str, Any] = {
+    "totalFramesRead": 0,
+    "processedFrames": 0,
+    "detectorCalls": 0,
+    "detectorSeconds": 0.0,
+    "skippedDetections": 0,
+  }
+  decode_stats: list[DecodeStats] = []
+  detections = list(
+    detect_range(
+      video_path,
+      video_meta,
+      cfg,
+      detector,
+      stride=stride,
+      diagnostics=diagnostics,
+      decode_stats=decode_stats,
+      start_time=start_time,
+      start_frame=segment.start_frame,
+      end_frame=segment.end_frame,
+    )
+  )
+  return SegmentResult(
+    segment=segment,
+    detections=detections,
+    decode_stats=DecodeStats.combine(decode_stats),
+    detector_calls=diagnostics["detectorCalls"],
+    detector_seconds=diagnostics["detectorSeconds"],
+    skipped_detections=diagnostics["skippedDetections"],
+    wall_seconds=time.monotonic() - started,
+    detector_version=getattr(detector, "detector_version", None),
+    model_source=getattr(detector, "model_source", "ultralytics"),
+  )
+
+
+def detect_parallel(
+  video_path: Path,
+  video_meta: VideoMeta,
+  cfg: ProcessingConfig,
+  stride: int,
+  start_time: float,
+) -> list[SegmentResult]:
+  """
+  Run detection over `cfg.parallel_workers` segments of the video in a
+  process pool. Results are returned in segment (and therefore frame) order.
+  """
+  workers = max(1, cfg.parallel_workers)
+  keyframes = keyframe_indices(video_path, video_meta.fps)
+  segments = plan_segments(video_meta.frame_count, stride, workers, keyframes)
+  if len(segments) == 1:
+    return [_detect_segment(video_path, video_meta, cfg, stride, segments[0], start_time)]
+
+  threads = max(1, (os.cpu_count() or workers) // len(segments))
+  with ProcessPoolExecutor(
+    max_workers=len(segments),
+    initializer=_init_segment_worker,
+    initargs=(threads,),
+  ) as pool:
+    futures = [
+      pool.submit(_detect_segment, video_path, video_meta, cfg, stride, segment, start_time)
+      for segment in segments
+    ]
+    return [future.result() for future in futures]
@@ -1,18 +1,49 @@
 from __future__ import annotations
 
+import itertools
 import json
+import math
 import time
-from dataclasses import asdict
+from dataclasses import asdict, replace
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional
 
-import cv2
+import numpy as np
 
-from .cleaning import select_instructor_detection
+from .cleaning import select_instructor
+from .checkpoint import CheckpointRecorder, load_checkpoint
+from .detection import RawDetections, detect_range
+from .detection_cache import (
+  CachedDetections,
+  DetectionRecorder,
+  cache_key,
+  cacheable,
+  file_sha256,
+  load_detections,
+)
 from .detectors import canonical_detector_name, create_detector
+from .frames import DecodeStats, probe_fps
 from .metrics import compute_derived_metrics
-from .schemas import ProcessingConfig, ProcessingMeta, VideoMeta
-from .tracking import canonical_tracker_name, create_tracker, interpolate_short_gaps
+from .parallel import detect_parallel
+from .roi import RoiPlanner
+from .sampling import AdaptiveSampler
+from .schemas import (
+  QUALITY_INTERPOLATED,
+  FrameDetection,
+  PipelineProgress,
+  ProcessingConfig,
+  ProcessingMeta,
+  TrackArrays,
+  TrackPoint,
+  VideoMeta,
+)
+from .streaming import (
+  OnlineTrackMetrics,
+  StreamingInterpolator,
+  StreamingResultWriter,
+  write_track_stream,
+)
+from .tracking import canonical_tracker_name, create_tracker, interpolate_track
 
 
 def _frame_stride(source_fps: float, process_fps: float) -> int:
@@ -54,96 +85,339 @@ def _default_diagnostics() -> dict[str, Any]:
     "totalFramesRead": 0,
     "lostFrames": 0,
     "interpolatedFrames": 0,
+    "detectorBatchSize": 1,
+    "detectorCalls": 0,
+    "detectorSeconds": 0.0,
+    "skippedDetections": 0,
+    "carriedFrames": 0,
+    "roiDetections": 0,
+    "roiFallbacks": 0,
+    "adaptiveSkippedFrames": 0,
+    "decodeMode": None,
+    "decodedFrames": 0,
+    "decodeSeconds": 0.0,
+    "decodeFps": 0.0,
+    "detectionCache": "disabled",
     "config": {},
   }
 
 
+def _report_progress(
+  stream: Iterable[RawDetections],
+  frame_count: int,
+  on_progress: Callable[[PipelineProgress], None],
+  replayed_until: int = 0,
+) -> Iterator[RawDetections]:
+  """
+  Call `on_progress` once each sampled frame has been tracked, and at the end.
+  Frames before `replayed_until` come from a checkpoint and are left out of
+  the processing rate.
+  """
+  started = time.monotonic()
+  frames_done = 0
+  for frame_idx, detections in stream:
+    yield frame_idx, detections
+    frames_done = frame_idx + 1
+    on_progress(
+      PipelineProgress(
+        frames_done,
+        frame_count,
+        time.monotonic() - started,
+        frames_replayed=min(frames_done, replayed_until),
+      )
+    )
+  on_progress(
+    PipelineProgress(
+      max(frames_done, frame_count),
+      frame_count,
+      time.monotonic() - started,
+      frames_replayed=min(frames_done, replayed_until),
+    )
+  )
+
+
+def iter_tracked(
+  raw_stream: Iterable[RawDetections],
+  cfg: ProcessingConfig,
+  tracker: Any,
+  source_fps: float,
+  diagnostics: dict[str, Any],
+  sampler: Optional[AdaptiveSampler] = None,
+) -> Iterator[tuple[FrameDetection, TrackPoint]]:
+  """Clean and track raw per-frame detections, counting into `diagnostics`."""
+  previous: Optional[FrameDetection] = None
+  for frame_idx, detections in raw_stream:
+    t_ms = int((frame_idx / max(source_fps, 1.0)) * 1000.0)
+    if detections is None:
+      # Motion gate skipped the detector: carry the previous frame's box forward.
+      selected_bbox = previous.bbox if previous is not None else None
+      selected_conf = previous.conf if previous is not None else None
+    else:
+      selected = select_instructor(
+        detections=detections,
+        prev_bbox=tracker.prev_bbox,
+        lost_count=tracker.lost_count,
+        config=cfg,
+      )
+      selected_bbox = selected.bbox if selected is not None else None
+      selected_conf = selected.conf if selected is not None else None
+    frame_det, track_point = tracker.update(
+      t_ms=t_ms,
+      bbox=selected_bbox,
+      conf=selected_conf,
+    )
+    if detections is None:
+      frame_det.carried = True
+      diagnostics["carriedFrames"] += 1
+    if sampler is not None:
+      sampler.observe(t_ms, selected_bbox)
+    if track_point.quality == "lost":
+      diagnostics["lostFrames"] += 1
+
+    diagnostics["processedFrames"] += 1
+    previous = frame_det
+    yield frame_det, track_point
+
+
+def track_detections(
+  raw_stream: Iterable[RawDetections],
+  cfg: ProcessingConfig,
+  tracker: Any,
+  source_fps: float,
+  diagnostics: dict[str, Any],
+  sampler: Optional[AdaptiveSampler] = None,
+) -> tuple[list[FrameDetection], list[TrackPoint]]:
+  frame_detections: list[FrameDetection] = []
+  track_points: list[TrackPoint] = []
+  for frame_det, track_point in iter_tracked(
+    raw_stream, cfg, tracker, source_fps, diagnostics, sampler=sampler
+  ):
+    frame_detections.append(frame_det)
+    track_points.append(track_point)
+  return frame_detections, track_points
+
+
 def run_pipeline(
   video_path: Path,
   video_meta: VideoMeta,
   config: Optional[ProcessingConfig] = None,
   diagnostics_path: Optional[Path] = None,
+  cache_path: Optional[Path] = None,
+  output_path: Optional[Path] = None,
+  checkpoint_dir: Optional[Path] = None,
+  on_progress: Optional[Callable[[PipelineProgress], None]] = None,
+  binary_output_path: Optional[Path] = None,
 ) -> tuple[dict[str, Any], dict[str, Any]]:
+  """
+  With `cache_path`, raw detections are stored there after a successful run
+  and replayed on later runs whose video content and detector settings match,
+  skipping decode and inference.
+
+  With `output_path`, the payload is streamed to that file in chunks with
+  constant memory, and the returned payload is a summary without
+  frameDetections/trackPoints (`resultsFile` names the file, `frameCount` and
+  `pointCount` give their lengths). With `binary_output_path` as well, the
+  columnar form (tracking_binary.py) is spooled alongside and written there.
+
+  With `checkpoint_dir`, detections are checkpointed there every
+  `checkpoint_interval_seconds` and on failure, and a later run with the same
+  video and detector settings resumes after the last checkpointed frame. Not
+  used with ROI inference, adaptive sampling or parallel workers.
+
+  `on_progress` is called after every sampled frame with the source frames
+  covered so far; callers throttle it themselves.
+  """
   cfg = config or ProcessingConfig()
+  if cfg.parallel_workers > 1 and (cfg.roi_inference or cfg.adaptive_sampling):
+    raise ValueError(
+      "roi_inference and adaptive_sampling need tracker feedback "
+      "and cannot run with parallel_workers > 1"
+    )
   diagnostics = _default_diagnostics()
   diagnostics["config"] = asdict(cfg)
+  diagnostics["detectorBatchSize"] = max(1, cfg.detector_batch_size)
 
-  detector = create_detector(cfg)
   tracker = create_tracker(cfg)
 
-  cap = cv2.VideoCapture(str(video_path))
-  if not cap.isOpened():
-    raise RuntimeError(f"Unable to open video: {video_path}")
-
-  source_fps = video_meta.fps if video_meta.fps > 0 else float(cap.get(cv2.CAP_PROP_FPS) or 30.0)
+  source_fps = video_meta.fps if video_meta.fps > 0 else probe_fps(video_path)
   stride = _frame_stride(source_fps=source_fps, process_fps=cfg.process_fps)
   start_time = time.monotonic()
+  decode_stats: list[DecodeStats] = []
+  detector_version: Optional[str] = None
+  model_source = "ultralytics"
 
-  frame_detections = []
-  track_points = []
-  frame_idx = 0
   payload: dict[str, Any] | None = None
+  raw_stream: Optional[Generator[RawDetections, None, None]] = None
+  sampler: Optional[AdaptiveSampler] = None
+  # Adaptive sampling leaves uneven gaps between points; interpolation and
+  # metrics then work in time rather than point counts.
+  nominal_interval_ms = (stride / max(source_fps, 1.0)) * 1000.0
+  max_gap_ms: Optional[int] = None
+  if cfg.adaptive_sampling:
+    max_gap_ms = int(math.ceil((cfg.max_gap_frames + 1) * nominal_interval_ms)) + 1
+  key: Optional[dict[str, Any]] = None
+  cached: Optional[CachedDetections] = None
+  recorder: Optional[DetectionRecorder] = None
+  resumed: Optional[CachedDetections] = None
+  resume_frame = 0
+  writer: Optional[StreamingResultWriter] = None
+  pixels_size: Optional[tuple[float, float]] = None
   try:
-    while True:
-      ok, frame = cap.read()
-      if not ok:
-        break
-      diagnostics["totalFramesRead"] += 1
-
-      if frame_idx % stride != 0:
-        frame_idx += 1
-        continue
-
-      if (time.monotonic() - start_time) > cfg.processing_timeout_seconds:
-        raise TimeoutError(
-          f"processing timeout after {cfg.processing_timeout_seconds}s "
-          f"(read={diagnostics['totalFramesRead']}, processed={diagnostics['processedFrames']})"
+    if cfg.coordinate_system not in ("normalized", "pixels"):
+      raise ValueError(f"Unsupported coordinate system: {cfg.coordinate_system}")
+    if cfg.coordinate_system == "pixels":
+      pixels_size = (float(video_meta.width or 1), float(video_meta.height or 1))
+      if pixels_size[0] <= 0.0 or pixels_size[1] <= 0.0:
+        pixels_size = None
+    if (cache_path is not None or checkpoint_dir is not None) and cacheable(cfg):
+      diagnostics["videoSha256"] = file_sha256(video_path)
+      key = cache_key(diagnostics["videoSha256"], cfg)
+    if cache_path is not None:
+      if key is not None:
+        cached = load_detections(cache_path, key)
+        diagnostics["detectionCache"] = "hit" if cached is not None else "miss"
+      else:
+        diagnostics["detectionCache"] = "bypass"
+    if key is not None and cached is None:
+      if checkpoint_dir is not None and cfg.parallel_workers <= 1:
+        resumed = load_checkpoint(checkpoint_dir, key)
+        recorder = CheckpointRecorder(
+          checkpoint_dir,
+          key,
+          interval_seconds=cfg.checkpoint_interval_seconds,
+          resume=resumed is not None,
         )
+        if resumed is not None:
+          resume_frame = int(resumed.frame_idx[-1]) + stride
+          diagnostics["resumedFromFrame"] = resume_frame
+      elif cache_path is not None:
+        recorder = DetectionRecorder(cache_path)
 
-      t_ms = int((frame_idx / max(source_fps, 1.0)) * 1000.0)
-      detections = detector.detect_frame(frame)
-      selected = select_instructor_detection(
-        detections=detections,
-        prev_bbox=tracker.prev_bbox,
-        lost_count=tracker.lost_count,
-        config=cfg,
-      )
-      selected_bbox = selected.bbox if selected is not None else None
-      selected_conf = selected.conf if selected is not None else None
-      frame_det, track_point = tracker.update(
-        t_ms=t_ms,
-        bbox=selected_bbox,
-        conf=selected_conf,
+    if cached is not None:
+      detector_version = cached.detector_version
+      model_source = cached.model_source
+      raw_stream = (item for item in cached)
+    elif cfg.parallel_workers > 1:
+      segments = detect_parallel(video_path, video_meta, cfg, stride, start_time)
+      for result in segments:
+        decode_stats.append(result.decode_stats)
+        diagnostics["detectorCalls"] += result.detector_calls
+        diagnostics["detectorSeconds"] += result.detector_seconds
+        diagnostics["skippedDetections"] += result.skipped_detections
+      diagnostics["parallelSegments"] = [
+        {
+          "startFrame": result.segment.start_frame,
+          "endFrame": result.segment.end_frame,
+          "sampledFrames": len(result.detections),
+          "wallSeconds": round(result.wall_seconds, 3),
+        }
+        for result in segments
+      ]
+      detector_version = segments[0].detector_version
+      model_source = segments[0].model_source
+      raw_stream = (item for result in segments for item in result.detections)
+    else:
+      detector = create_detector(cfg)
+      detector_version = getattr(detector, "detector_version", None)
+      model_source = getattr(detector, "model_source", "ultralytics")
+      roi_planner = None
+      roi_detector = None
+      if cfg.adaptive_sampling:
+        sampler = AdaptiveSampler(
+          max_multiplier=cfg.adaptive_max_multiplier,
+          still_speed=cfg.adaptive_still_speed,
+          fast_speed=cfg.adaptive_fast_speed,
+          min_iou=cfg.adaptive_min_iou,
+        )
+      if cfg.roi_inference:
+        roi_planner = RoiPlanner(
+          tracker,
+          expand=cfg.roi_expand,
+          refresh_interval=cfg.roi_refresh_interval,
+        )
+        roi_detector = create_detector(replace(cfg, detector_imgsz=cfg.roi_imgsz))
+      raw_stream = detect_range(
+        video_path,
+        video_meta,
+        cfg,
+        detector,
+        stride=stride,
+        diagnostics=diagnostics,
+        decode_stats=decode_stats,
+        start_time=start_time,
+        start_frame=resume_frame,
+        roi_planner=roi_planner,
+        roi_detector=roi_detector,
+        sampler=sampler,
       )
-      if track_point.quality == "lost":
-        diagnostics["lostFrames"] += 1
-
-      frame_detections.append(frame_det)
-      track_points.append(track_point)
-      diagnostics["processedFrames"] += 1
-      frame_idx += 1
-    if cfg.interpolate_gaps:
-      interpolated_points = interpolate_short_gaps(track_points, max_gap_frames=cfg.max_gap_frames)
-      diagnostics["interpolatedFrames"] = sum(
-        1 for point in interpolated_points if point.quality == "interpolated"
+
+    stream: Iterable[RawDetections] = raw_stream
+    if recorder is not None:
+      stream = recorder.wrap(raw_stream)
+    if resumed is not None:
+      # Replaying the checkpoint rebuilds the tracker state and earlier points.
+      stream = itertools.chain(resumed, stream)
+    if on_progress is not None:
+      stream = _report_progress(
+        stream, video_meta.frame_count, on_progress, replayed_until=resume_frame
       )
+    tracked = iter_tracked(stream, cfg, tracker, source_fps, diagnostics, sampler=sampler)
+    metrics_interval_ms = nominal_interval_ms if cfg.adaptive_sampling else None
+    if output_path is None:
+      frame_detections: list[FrameDetection] = []
+      track_points: list[TrackPoint] = []
+      for frame_det, track_point in tracked:
+        frame_detections.append(frame_det)
+        track_points.append(track_point)
+      track = TrackArrays.from_points(track_points)
+      if cfg.interpolate_gaps:
+        track = interpolate_track(
+          track, max_gap_frames=cfg.max_gap_frames, max_gap_ms=max_gap_ms
+        )
+        diagnostics["interpolatedFrames"] = int(
+          np.count_nonzero(track.quality == QUALITY_INTERPOLATED)
+        )
+      metrics = compute_derived_metrics(track, nominal_interval_ms=metrics_interval_ms)
     else:
-      interpolated_points = track_points
+      writer = StreamingResultWriter(
+        output_path,
+        chunk_size=cfg.stream_chunk_size,
+        pixels_size=pixels_size,
+        binary_path=binary_output_path,
+      )
+      interpolator = StreamingInterpolator(
+        cfg.max_gap_frames if cfg.interpolate_gaps else 0, max_gap_ms=max_gap_ms
+      )
+      online_metrics = OnlineTrackMetrics(nominal_interval_ms=metrics_interval_ms)
+      write_track_stream(tracked, writer, interpolator, online_metrics)
+      diagnostics["interpolatedFrames"] = interpolator.interpolated
+      metrics = online_metrics.result()
 
-    metrics = compute_derived_metrics(interpolated_points)
+    if recorder is not None:
+      if cache_path is None:
+        recorder.discard()
+      else:
+        try:
+          recorder.save(cache_path, key, detector_version, model_source)
+        except OSError as exc:
+          diagnostics["detectionCacheError"] = str(exc)
+      recorder = None
     detector_name = canonical_detector_name(cfg.detector_type)
     tracker_name = canonical_tracker_name(cfg.tracker_type)
     processing_meta = ProcessingMeta(
       detector=detector_name,
       detector_runtime=cfg.detector_device,
-      detector_version=getattr(detector, "detector_version", None),
-      model_source=getattr(detector, "model_source", "ultralytics"),
+      detector_version=detector_version,
+      model_source=model_source,
       tracker=tracker_name,
       tracker_params={
         "trackId": getattr(tracker, "track_id", 1),
         "maxGapFrames": cfg.max_gap_frames,
         "interpolateGaps": cfg.interpolate_gaps,
         "processFps": cfg.process_fps,
+        "motionGateThreshold": cfg.motion_gate_threshold,
+        "motionGateMaxSkip": cfg.motion_gate_max_skip,
+        "adaptiveSampling": cfg.adaptive_sampling,
       },
       cleaning={
         "minConf": cfg.min_conf,
@@ -158,7 +432,7 @@ def run_pipeline(
       },
     )
 
-    payload = {
+    header = {
       "coordinateSystem": "normalized",
       "video": {
         "width": video_meta.width,
@@ -166,21 +440,47 @@ def run_pipeline(
         "fps": video_meta.fps,
       },
       "processingMeta": processing_meta.to_payload(),
-      "frameDetections": [fd.to_payload() for fd in frame_detections],
-      "trackPoints": [tp.to_payload() for tp in interpolated_points],
-      "derivedMetrics": metrics,
     }
-
-    if cfg.coordinate_system == "pixels":
-      payload = _to_pixels_payload(payload)
-    elif cfg.coordinate_system != "normalized":
-      raise ValueError(f"Unsupported coordinate system: {cfg.coordinate_system}")
+    if writer is not None:
+      if pixels_size is not None:
+        header["coordinateSystem"] = "pixels"
+      writer.finish(header, metrics)
+      # Summary only: the points are in `output_path`.
+      payload = {
+        **header,
+        "derivedMetrics": metrics,
+        "resultsFile": output_path.name,
+        "frameCount": writer.frame_count,
+        "pointCount": writer.point_count,
+      }
+      writer = None
+    else:
+      payload = {
+        **header,
+        "frameDetections": [fd.to_payload() for fd in frame_detections],
+        "trackPoints": track.to_payload(),
+        "derivedMetrics": metrics,
+      }
+      if cfg.coordinate_system == "pixels":
+        payload = _to_pixels_payload(payload)
 
   except Exception as exc:
     diagnostics["error"] = str(exc)
     raise
   finally:
-    cap.release()
+    if raw_stream is not None:
+      raw_stream.close()
+    if isinstance(recorder, CheckpointRecorder):
+      # Keep what was detected so a retry can resume from here.
+      recorder.close()
+    elif recorder is not None:
+      recorder.discard()
+    if writer is not None:
+      writer.discard()
+    decode_total = DecodeStats.combine(decode_stats)
+    diagnostics["totalFramesRead"] = decode_total.frames_grabbed
+    diagnostics["detectorSeconds"] = round(diagnostics["detectorSeconds"], 3)
+    diagnostics.update(decode_total.to_diagnostics())
     if diagnostics_path is not None:
       diagnostics_path.parent.mkdir(parents=True, exist_ok=True)
       diagnostics_path.write_text(json.dumps(diagnostics, indent=2), encoding="utf-8")
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from .schemas import BBox, Detection
+
+
+@dataclass(slots=True)
+class RoiWindow:
+  """Pixel crop window [x0, x1) x [y0, y1) inside a `frame_w` x `frame_h` frame."""
+
+  x0: int
+  y0: int
+  x1: int
+  y1: int
+  frame_w: int
+  frame_h: int
+
+  def crop(self, frame: np.ndarray) -> np.ndarray:
+    return frame[self.y0 : self.y1, self.x0 : self.x1]
+
+  def to_frame(self, detection: Detection) -> Detection:
+    """Map a detection normalized to the crop back to full-frame normalized xywh."""
+    crop_w = float(self.x1 - self.x0)
+    crop_h = float(self.y1 - self.y0)
+    bbox = detection.bbox
+    return Detection(
+      bbox=BBox(
+        x=(self.x0 + (bbox.x * crop_w)) / self.frame_w,
+        y=(self.y0 + (bbox.y * crop_h)) / self.frame_h,
+        w=(bbox.w * crop_w) / self.frame_w,
+        h=(bbox.h * crop_h) / self.frame_h,
+      ),
+      conf=detection.conf,
+      cls=detection.cls,
+    )
+
+
+def roi_window(
+  bbox: BBox,
+  frame_w: int,
+  frame_h: int,
+  expand: float,
+  min_side: float = 0.25,
+) -> RoiWindow:
+  """
+  Crop around a normalized `bbox`, padded by `expand` times its size on every
+  side and at least `min_side` of the frame in each dimension, clamped to
+  the frame.
+  """
+  cx, cy = bbox.centroid()
+  half_w = max(bbox.w * (0.5 + expand), min_side / 2.0)
+  half_h = max(bbox.h * (0.5 + expand), min_side / 2.0)
+  x0 = int(np.floor(max(0.0, cx - half_w) * frame_w))
+  y0 = int(np.floor(max(0.0, cy - half_h) * frame_h))
+  x1 = int(np.ceil(min(1.0, cx + half_w) * frame_w))
+  y1 = int(np.ceil(min(1.0, cy + half_h) * frame_h))
+  return RoiWindow(
+    x0=x0,
+    y0=y0,
+    x1=max(x1, x0 + 1),
+    y1=max(y1, y0 + 1),
+    frame_w=frame_w,
+    frame_h=frame_h,
+  )
+
+
+class RoiPlanner:
+  """
+  Decides per sampled frame whether to detect on the full frame or on a crop
+  around the tracker's last box.
+
+  Full-frame detection is used while there is no box, whenever the tracker
+  has lost the instructor, and every `refresh_interval` frames so people who
+  walk in from outside the crop are still seen.
+  """
+
+  def __init__(self, tracker: Any, expand: float, refresh_interval: int) -> None:
+    self.tracker = tracker
+    self.expand = expand
+    self.refresh_interval = max(1, refresh_interval)
+    self._since_full = 0
+
+  def window_for(self, frame: np.ndarray) -> Optional[RoiWindow]:
+    prev_bbox = self.tracker.prev_bbox
+    if (
+      prev_bbox is None
+      or self.tracker.lost_count > 0
+      or self._since_full >= self.refresh_interval
+    ):
+      self._since_full = 0
+      return None
+    self._since_full += 1
+    height, width = frame.shape[:2]
+    return roi_window(prev_bbox, frame_w=width, frame_h=height, expand=self.expand)
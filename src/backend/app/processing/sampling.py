@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+from .schemas import BBox
+
+
+class AdaptiveSampler:
+  """
+  Varies how many of the `process_fps` samples are actually analyzed.
+
+  After each analyzed frame the tracker result is fed back through
+  `observe`. While the instructor's centroid moves slower than `still_speed`
+  (normalized frame units per second) the analysis interval doubles, up to
+  `max_multiplier` samples. Any frame where the track is lost, the centroid
+  moves faster than `fast_speed`, or the box overlaps its previous position
+  by less than `min_iou` drops straight back to analyzing every sample.
+  """
+
+  def __init__(
+    self,
+    max_multiplier: int,
+    still_speed: float,
+    fast_speed: float,
+    min_iou: float,
+  ) -> None:
+    self.max_multiplier = max(1, max_multiplier)
+    self.still_speed = still_speed
+    self.fast_speed = fast_speed
+    self.min_iou = min_iou
+    self.multiplier = 1
+    self.skipped_total = 0
+    self._skip_remaining = 0
+    self._prev_t_ms: Optional[int] = None
+    self._prev_bbox: Optional[BBox] = None
+
+  def should_analyze(self) -> bool:
+    if self._skip_remaining > 0:
+      self._skip_remaining -= 1
+      self.skipped_total += 1
+      return False
+    self._skip_remaining = self.multiplier - 1
+    return True
+
+  def observe(self, t_ms: int, bbox: Optional[BBox]) -> None:
+    prev_bbox = self._prev_bbox
+    prev_t_ms = self._prev_t_ms
+    self._prev_bbox = bbox
+    self._prev_t_ms = t_ms
+    if bbox is None or prev_bbox is None or prev_t_ms is None or t_ms <= prev_t_ms:
+      self._reset()
+      return
+
+    (cx, cy), (px, py) = bbox.centroid(), prev_bbox.centroid()
+    speed = math.hypot(cx - px, cy - py) / ((t_ms - prev_t_ms) / 1000.0)
+    if speed > self.fast_speed or bbox.iou(prev_bbox) < self.min_iou:
+      self._reset()
+    elif speed < self.still_speed:
+      self.multiplier = min(self.max_multiplier, self.multiplier * 2)
+
+  def _reset(self) -> None:
+    self.multiplier = 1
+    self._skip_remaining = 0
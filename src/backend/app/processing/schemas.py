@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any, Literal, Optional
+from typing import Any, Iterator, Literal, Optional, overload
+
+import numpy as np
 
 
 TrackQuality = Literal["measured", "lost", "interpolated"]
@@ -49,11 +52,100 @@ class Detection:
   cls: int
 
 
+class DetectionArrays(Sequence[Detection]):
+  """
+  Struct-of-arrays detections for one frame: normalized float32 `xywh`
+  (N, 4), float32 `conf` (N,) and int16 `cls` (N,). Indexing or iterating
+  builds `Detection` objects lazily, so code written against
+  `list[Detection]` keeps working while array-aware code reads the columns.
+  """
+
+  __slots__ = ("xywh", "conf", "cls", "_items")
+
+  def __init__(self, xywh: np.ndarray, conf: np.ndarray, cls: np.ndarray) -> None:
+    self.xywh = np.ascontiguousarray(xywh, dtype=np.float32).reshape(-1, 4)
+    self.conf = np.ascontiguousarray(conf, dtype=np.float32).reshape(-1)
+    self.cls = np.ascontiguousarray(cls, dtype=np.int16).reshape(-1)
+    self._items: Optional[list[Detection]] = None
+
+  @classmethod
+  def empty(cls) -> "DetectionArrays":
+    return cls(np.empty((0, 4)), np.empty(0), np.empty(0))
+
+  @classmethod
+  def from_xyxy(
+    cls,
+    xyxy: np.ndarray,
+    conf: np.ndarray,
+    classes: np.ndarray,
+    width: int,
+    height: int,
+  ) -> "DetectionArrays":
+    """Clip pixel xyxy boxes to the frame, drop empty ones and normalize to xywh."""
+    scale = np.array([width, height, width, height], dtype=np.float32)
+    boxes = np.clip(np.asarray(xyxy, dtype=np.float32).reshape(-1, 4), 0.0, scale)
+    sizes = boxes[:, 2:] - boxes[:, :2]
+    keep = np.all(sizes > 0.0, axis=1)
+    xywh = np.concatenate((boxes[keep, :2], sizes[keep]), axis=1)
+    xywh /= scale
+    return cls(xywh, np.asarray(conf)[keep], np.asarray(classes)[keep])
+
+  def __len__(self) -> int:
+    return self.conf.shape[0]
+
+  def _detections(self) -> list[Detection]:
+    if self._items is None:
+      self._items = [
+        Detection(bbox=BBox(x, y, w, h), conf=score, cls=label)
+        for (x, y, w, h), score, label in zip(
+          self.xywh.tolist(), self.conf.tolist(), self.cls.tolist()
+        )
+      ]
+    return self._items
+
+  @overload
+  def __getitem__(self, index: int) -> Detection: ...
+
+  @overload
+  def __getitem__(self, index: slice) -> list[Detection]: ...
+
+  def __getitem__(self, index):
+    if self._items is None and isinstance(index, int):
+      # Selecting a single detection should not materialize the others.
+      x, y, w, h = self.xywh[index].tolist()
+      return Detection(
+        bbox=BBox(x, y, w, h), conf=float(self.conf[index]), cls=int(self.cls[index])
+      )
+    return self._detections()[index]
+
+  def __iter__(self) -> Iterator[Detection]:
+    return iter(self._detections())
+
+  def __repr__(self) -> str:
+    return f"DetectionArrays(n={len(self)})"
+
+  def __getstate__(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return (self.xywh, self.conf, self.cls)
+
+  def __setstate__(self, state: tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+    self.xywh, self.conf, self.cls = state
+    self._items = None
+
+  def to_array(self) -> np.ndarray:
+    """(N, 6) float64 rows of x, y, w, h, conf, cls for `select_instructor_index`."""
+    array = np.empty((len(self), 6), dtype=np.float64)
+    array[:, :4] = self.xywh
+    array[:, 4] = self.conf
+    array[:, 5] = self.cls
+    return array
+
+
 @dataclass(slots=True)
 class FrameDetection:
   t_ms: int
   bbox: Optional[BBox]
   conf: Optional[float]
+  carried: bool = False
 
   def to_payload(self) -> dict[str, Any]:
     return {
@@ -67,6 +159,7 @@ class FrameDetection:
         "h": self.bbox.h,
       },
       "conf": self.conf,
+      "carried": self.carried,
     }
 
 
@@ -88,6 +181,72 @@ class TrackPoint:
     }
 
 
+# Quality codes used by TrackArrays.quality.
+QUALITY_MEASURED = 0
+QUALITY_LOST = 1
+QUALITY_INTERPOLATED = 2
+QUALITY_NAMES: tuple[TrackQuality, ...] = ("measured", "lost", "interpolated")
+_QUALITY_CODES = {name: code for code, name in enumerate(QUALITY_NAMES)}
+
+
+@dataclass(slots=True)
+class TrackArrays:
+  """Columnar track: int64 `t_ms`, float64 `cx`/`cy`, int8 `quality` codes."""
+
+  t_ms: np.ndarray
+  cx: np.ndarray
+  cy: np.ndarray
+  quality: np.ndarray
+  track_id: int = 1
+
+  @classmethod
+  def from_points(cls, points: Sequence[TrackPoint]) -> "TrackArrays":
+    count = len(points)
+    return cls(
+      t_ms=np.fromiter((p.t_ms for p in points), dtype=np.int64, count=count),
+      cx=np.fromiter((p.cx for p in points), dtype=np.float64, count=count),
+      cy=np.fromiter((p.cy for p in points), dtype=np.float64, count=count),
+      quality=np.fromiter(
+        (_QUALITY_CODES[p.quality] for p in points), dtype=np.int8, count=count
+      ),
+      track_id=points[0].track_id if count else 1,
+    )
+
+  def __len__(self) -> int:
+    return int(self.t_ms.shape[0])
+
+  def copy(self) -> "TrackArrays":
+    return TrackArrays(
+      t_ms=self.t_ms.copy(),
+      cx=self.cx.copy(),
+      cy=self.cy.copy(),
+      quality=self.quality.copy(),
+      track_id=self.track_id,
+    )
+
+  def lost_runs(self) -> tuple[np.ndarray, np.ndarray]:
+    """Start indices and exclusive end indices of each run of lost points."""
+    lost = np.concatenate(([0], (self.quality == QUALITY_LOST).view(np.int8), [0]))
+    edges = np.diff(lost)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+  def to_points(self) -> list[TrackPoint]:
+    return [
+      TrackPoint(t_ms=t, track_id=self.track_id, cx=x, cy=y, quality=QUALITY_NAMES[q])
+      for t, x, y, q in zip(
+        self.t_ms.tolist(), self.cx.tolist(), self.cy.tolist(), self.quality.tolist()
+      )
+    ]
+
+  def to_payload(self) -> list[dict[str, Any]]:
+    return [
+      {"tMs": t, "trackId": self.track_id, "cx": x, "cy": y, "quality": QUALITY_NAMES[q]}
+      for t, x, y, q in zip(
+        self.t_ms.tolist(), self.cx.tolist(), self.cy.tolist(), self.quality.tolist()
+      )
+    ]
+
+
 @dataclass(slots=True)
 class VideoMeta:
   width: int
@@ -96,10 +255,44 @@ class VideoMeta:
   frame_count: int
 
 
+@dataclass(slots=True)
+class PipelineProgress:
+  """Snapshot passed to `run_pipeline`'s `on_progress` callback."""
+
+  frames_done: int  # source frames covered so far, sampled or not
+  frame_count: int  # 0 when the container does not report it
+  elapsed_seconds: float
+  # Of frames_done, those replayed from a checkpoint rather than processed by this run.
+  frames_replayed: int = 0
+
+  @property
+  def fraction(self) -> Optional[float]:
+    if self.frame_count <= 0:
+      return None
+    return min(1.0, self.frames_done / float(self.frame_count))
+
+  @property
+  def frames_per_second(self) -> float:
+    if self.elapsed_seconds <= 0.0:
+      return 0.0
+    return max(0, self.frames_done - self.frames_replayed) / self.elapsed_seconds
+
+  @property
+  def eta_seconds(self) -> Optional[float]:
+    fps = self.frames_per_second
+    if self.frame_count <= 0 or fps <= 0.0:
+      return None
+    return max(0, self.frame_count - self.frames_done) / fps
+
+
 @dataclass(slots=True)
 class ProcessingConfig:
   coordinate_system: CoordinateSystem = "normalized"
   process_fps: float = 10.0
+  frame_source: str = "opencv"
+  frame_source_long_side: int = 0
+  decode_mode: str = "grab"
+  prefetch_frames: int = 8
   min_conf: float = 0.4
   min_area_ratio: float = 0.005
   max_area_ratio: float = 0.60
@@ -115,8 +308,25 @@ class ProcessingConfig:
   detector_model: str = "yolov8n.pt"
   detector_device: str = "cpu"
   detector_imgsz: int = 640
+  detector_batch_size: int = 8
+  detector_threads: int = 0
+  onnx_quantized: bool = False
+  motion_gate_threshold: float = 0.0
+  motion_gate_max_skip: int = 10
+  roi_inference: bool = False
+  roi_imgsz: int = 320
+  roi_expand: float = 1.0
+  roi_refresh_interval: int = 30
+  adaptive_sampling: bool = False
+  adaptive_max_multiplier: int = 4
+  adaptive_still_speed: float = 0.02
+  adaptive_fast_speed: float = 0.15
+  adaptive_min_iou: float = 0.5
   tracker_type: str = "single-target-iou"
   processing_timeout_seconds: int = 1800
+  parallel_workers: int = 0
+  stream_chunk_size: int = 4096
+  checkpoint_interval_seconds: float = 60.0
 
 
 @dataclass(slots=True)
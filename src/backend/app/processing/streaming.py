@@ -0,0 +1,328 @@
+"""
+Constant-memory output for long recordings.
+
+Track points pass through `StreamingInterpolator` (which holds back at most
+one lost run) and `OnlineTrackMetrics`, and frame detections and points are
+written in fixed-size chunks by `StreamingResultWriter`. Nothing grows with
+the length of the video.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .schemas import FrameDetection, TrackPoint
+from .tracking_binary import ColumnSpool
+
+
+class StreamingInterpolator:
+  """
+  Online `interpolate_short_gaps`: points are pushed in order and released
+  as soon as they can no longer change. A lost run is buffered until the
+  next non-lost point decides whether it is filled; runs that are already
+  too long to be filled are released immediately.
+  """
+
+  def __init__(self, max_gap_frames: int, max_gap_ms: Optional[int] = None) -> None:
+    self.max_gap_frames = max_gap_frames
+    self.max_gap_ms = max_gap_ms
+    self.interpolated = 0
+    self._before: Optional[TrackPoint] = None
+    self._run: list[TrackPoint] = []
+    self._run_released = False
+
+  def _fillable_so_far(self, last: TrackPoint) -> bool:
+    if self._before is None or self._before.quality != "measured":
+      return False
+    if self.max_gap_ms is None:
+      return len(self._run) <= self.max_gap_frames
+    return last.t_ms - self._before.t_ms <= self.max_gap_ms
+
+  def push(self, point: TrackPoint) -> list[TrackPoint]:
+    if self.max_gap_frames <= 0:
+      return [point]
+    if point.quality == "lost":
+      if self._run_released:
+        return [point]
+      self._run.append(point)
+      if self._fillable_so_far(point):
+        return []
+      # The gap can only get longer: release it unfilled.
+      released, self._run = self._run, []
+      self._run_released = True
+      return released
+
+    released = self._run
+    if released and point.quality == "measured" and self._fillable_so_far(point):
+      released = self._fill(released, point)
+    self._run = []
+    self._run_released = False
+    self._before = point
+    released.append(point)
+    return released
+
+  def _fill(self, run: list[TrackPoint], end_point: TrackPoint) -> list[TrackPoint]:
+    start_point = self._before
+    assert start_point is not None
+    span = float(len(run) + 1)
+    span_ms = float(end_point.t_ms - start_point.t_ms)
+    filled: list[TrackPoint] = []
+    for offset, point in enumerate(run, start=1):
+      if self.max_gap_ms is None or span_ms <= 0.0:
+        alpha = offset / span
+      else:
+        alpha = (point.t_ms - start_point.t_ms) / span_ms
+      filled.append(
+        TrackPoint(
+          t_ms=point.t_ms,
+          track_id=point.track_id,
+          cx=start_point.cx + ((end_point.cx - start_point.cx) * alpha),
+          cy=start_point.cy + ((end_point.cy - start_point.cy) * alpha),
+          quality="interpolated",
+        )
+      )
+    self.interpolated += len(filled)
+    return filled
+
+  def finish(self) -> list[TrackPoint]:
+    """Release a trailing lost run; it has no closing point, so it stays lost."""
+    released, self._run = self._run, []
+    return released
+
+
+class OnlineTrackMetrics:
+  """
+  Running equivalents of `compute_derived_metrics`. Coverage, gaps and
+  distance match the batch numbers exactly. Jitter uses Welford's variance,
+  which can differ from `np.std` in the last few digits.
+  """
+
+  def __init__(self, nominal_interval_ms: Optional[float] = None) -> None:
+    self.nominal_interval_ms = nominal_interval_ms
+    self._count = 0
+    self._covered = 0
+    self._total_ms = 0.0
+    self._covered_ms = 0.0
+    self._last: Optional[TrackPoint] = None
+    self._last_valid: Optional[TrackPoint] = None
+    self._gap_start_t: Optional[int] = None
+    self._gap_count = 0
+    self._longest_gap_ms = 0
+    self._distance = 0.0
+    self._steps = 0
+    self._step_mean = 0.0
+    self._step_m2 = 0.0
+
+  def _add_duration(self, point: TrackPoint, duration: float) -> None:
+    self._total_ms += duration
+    if point.quality != "lost":
+      self._covered_ms += duration
+
+  def add(self, point: TrackPoint) -> None:
+    if self._last is not None and self.nominal_interval_ms is not None:
+      self._add_duration(self._last, float(max(0, point.t_ms - self._last.t_ms)))
+    self._last = point
+    self._count += 1
+
+    if point.quality == "lost":
+      if self._gap_start_t is None:
+        self._gap_start_t = point.t_ms
+      return
+    self._covered += 1
+    if self._gap_start_t is not None:
+      self._gap_count += 1
+      self._longest_gap_ms = max(self._longest_gap_ms, max(0, point.t_ms - self._gap_start_t))
+      self._gap_start_t = None
+
+    previous = self._last_valid
+    self._last_valid = point
+    if previous is None:
+      return
+    dx = point.cx - previous.cx
+    dy = point.cy - previous.cy
+    magnitude = math.sqrt((dx * dx) + (dy * dy))
+    self._distance += magnitude
+    if self.nominal_interval_ms is not None:
+      dt_ms = point.t_ms - previous.t_ms
+      if dt_ms > 0:
+        magnitude *= self.nominal_interval_ms / float(dt_ms)
+    self._steps += 1
+    delta = magnitude - self._step_mean
+    self._step_mean += delta / self._steps
+    self._step_m2 += delta * (magnitude - self._step_mean)
+
+  def result(self) -> dict[str, float | int]:
+    if self._count == 0:
+      return {"coverage": 0.0, "gapCount": 0, "longestGapMs": 0, "distance": 0.0, "jitter": 0.0}
+    if self.nominal_interval_ms is None:
+      coverage = self._covered / float(self._count)
+    else:
+      assert self._last is not None
+      total_ms = self._total_ms + self.nominal_interval_ms
+      covered_ms = self._covered_ms
+      if self._last.quality != "lost":
+        covered_ms += self.nominal_interval_ms
+      coverage = covered_ms / total_ms if total_ms > 0.0 else 0.0
+
+    gap_count = self._gap_count
+    longest_gap_ms = self._longest_gap_ms
+    if self._gap_start_t is not None:
+      assert self._last is not None
+      gap_count += 1
+      longest_gap_ms = max(longest_gap_ms, max(0, self._last.t_ms - self._gap_start_t))
+
+    jitter = math.sqrt(self._step_m2 / self._steps) if self._steps else 0.0
+    return {
+      "coverage": coverage,
+      "gapCount": gap_count,
+      "longestGapMs": int(longest_gap_ms),
+      "distance": float(self._distance),
+      "jitter": float(jitter),
+    }
+
+
+class _ChunkedArray:
+  """JSON array items spooled to a part file in chunks of `chunk_size`."""
+
+  def __init__(self, path: Path, chunk_size: int) -> None:
+    self.path = path
+    self._handle = path.open("w", encoding="utf-8")
+    self._chunk: list[str] = []
+    self._chunk_size = max(1, chunk_size)
+    self._empty = True
+    self.count = 0
+
+  def append(self, item: dict[str, Any]) -> None:
+    self._chunk.append(json.dumps(item, separators=(",", ":")))
+    self.count += 1
+    if len(self._chunk) >= self._chunk_size:
+      self.flush()
+
+  def flush(self) -> None:
+    if not self._chunk:
+      return
+    if not self._empty:
+      self._handle.write(",")
+    self._handle.write(",".join(self._chunk))
+    self._chunk.clear()
+    self._empty = False
+
+  def close(self) -> None:
+    self.flush()
+    self._handle.close()
+
+
+class StreamingResultWriter:
+  """
+  Write the tracking payload to `output_path` without holding it in memory.
+  Frame detections and track points are spooled to part files as they
+  arrive; `finish` writes the envelope, copies the parts in and renames the
+  result into place. `pixels_size` converts coordinates on the fly. With
+  `binary_path`, the same rows are also spooled as columns and `finish`
+  writes the binary form there.
+  """
+
+  def __init__(
+    self,
+    output_path: Path,
+    chunk_size: int = 4096,
+    pixels_size: Optional[tuple[float, float]] = None,
+    binary_path: Optional[Path] = None,
+  ) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    self.output_path = output_path
+    self.pixels_size = pixels_size
+    self._frames = _ChunkedArray(
+      output_path.with_name(output_path.name + ".frames.part"), chunk_size
+    )
+    self._points = _ChunkedArray(
+      output_path.with_name(output_path.name + ".points.part"), chunk_size
+    )
+    self._columns = ColumnSpool(binary_path, chunk_size) if binary_path is not None else None
+
+  def add_frame(self, frame_det: FrameDetection) -> None:
+    item = frame_det.to_payload()
+    if self.pixels_size is not None and item["bbox"] is not None:
+      width, height = self.pixels_size
+      bbox = item["bbox"]
+      item["bbox"] = {
+        "x": float(bbox["x"]) * width,
+        "y": float(bbox["y"]) * height,
+        "w": float(bbox["w"]) * width,
+        "h": float(bbox["h"]) * height,
+      }
+    self._frames.append(item)
+    if self._columns is not None:
+      self._columns.add_frame(item)
+
+  def add_point(self, point: TrackPoint) -> None:
+    item = point.to_payload()
+    if self.pixels_size is not None:
+      width, height = self.pixels_size
+      item["cx"] = float(item["cx"]) * width
+      item["cy"] = float(item["cy"]) * height
+    self._points.append(item)
+    if self._columns is not None:
+      self._columns.add_point(item)
+
+  @property
+  def frame_count(self) -> int:
+    return self._frames.count
+
+  @property
+  def point_count(self) -> int:
+    return self._points.count
+
+  def finish(self, header: dict[str, Any], metrics: dict[str, Any]) -> None:
+    """Assemble the final JSON: `header` keys, both arrays, then derivedMetrics."""
+    self._frames.close()
+    self._points.close()
+    tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+    try:
+      with tmp_path.open("w", encoding="utf-8") as out:
+        out.write(json.dumps(header, separators=(",", ":"))[:-1])
+        out.write(',"frameDetections":[')
+        with self._frames.path.open("r", encoding="utf-8") as part:
+          shutil.copyfileobj(part, out)
+        out.write('],"trackPoints":[')
+        with self._points.path.open("r", encoding="utf-8") as part:
+          shutil.copyfileobj(part, out)
+        out.write('],"derivedMetrics":')
+        out.write(json.dumps(metrics, separators=(",", ":")))
+        out.write("}")
+      os.replace(tmp_path, self.output_path)
+      if self._columns is not None:
+        self._columns.finish({**header, "derivedMetrics": metrics})
+    finally:
+      tmp_path.unlink(missing_ok=True)
+      self.discard()
+
+  def discard(self) -> None:
+    self._frames.close()
+    self._points.close()
+    self._frames.path.unlink(missing_ok=True)
+    self._points.path.unlink(missing_ok=True)
+    if self._columns is not None:
+      self._columns.discard()
+
+
+def write_track_stream(
+  tracked: Iterable[tuple[FrameDetection, TrackPoint]],
+  writer: StreamingResultWriter,
+  interpolator: StreamingInterpolator,
+  metrics: OnlineTrackMetrics,
+) -> None:
+  """Drain `tracked` into `writer`, interpolating and scoring points on the way."""
+  for frame_det, point in tracked:
+    writer.add_frame(frame_det)
+    for ready in interpolator.push(point):
+      metrics.add(ready)
+      writer.add_point(ready)
+  for ready in interpolator.finish():
+    metrics.add(ready)
+    writer.add_point(ready)
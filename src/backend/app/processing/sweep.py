@@ -0,0 +1,155 @@
+"""
+Parameter sweeps over a single detection pass.
+
+Detection runs once (through the raw-detection cache) at the lowest `min_conf`
+of all variants; every variant then replays the cached detections through
+cleaning, tracking and metrics in a process pool. Cleaning drops detections
+below each variant's own `min_conf`, so results match separate full runs.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+
+from .detection import RawDetections
+from .detection_cache import cache_key, load_detections
+from .frames import probe_fps
+from .metrics import compute_derived_metrics
+from .pipeline import run_pipeline, track_detections
+from .schemas import QUALITY_INTERPOLATED, ProcessingConfig, TrackArrays, VideoMeta
+from .tracking import create_tracker, interpolate_track
+
+
+# Settings that only affect cleaning/tracking/metrics and can vary per variant.
+SWEEPABLE_PARAMETERS = frozenset(
+  {
+    "min_conf",
+    "min_area_ratio",
+    "max_area_ratio",
+    "min_aspect_ratio",
+    "max_aspect_ratio",
+    "iou_weight",
+    "conf_weight",
+    "low_iou_reject_threshold",
+    "low_iou_reject_patience",
+    "max_gap_frames",
+    "interpolate_gaps",
+    "tracker_type",
+  }
+)
+
+_SWEEP_DETECTIONS: Iterable[RawDetections] = ()
+_SWEEP_SOURCE_FPS = 30.0
+
+
+def variant_config(base: ProcessingConfig, overrides: dict[str, Any]) -> ProcessingConfig:
+  unknown = sorted(set(overrides) - SWEEPABLE_PARAMETERS)
+  if unknown:
+    raise ValueError(
+      f"Cannot sweep {', '.join(unknown)} over one detection pass. "
+      f"Sweepable parameters: {', '.join(sorted(SWEEPABLE_PARAMETERS))}."
+    )
+  return replace(base, **overrides)
+
+
+def _init_sweep_worker(detections: Iterable[RawDetections], source_fps: float) -> None:
+  # With the fork start method the detections are inherited, not pickled.
+  global _SWEEP_DETECTIONS, _SWEEP_SOURCE_FPS
+  _SWEEP_DETECTIONS = detections
+  _SWEEP_SOURCE_FPS = source_fps
+
+
+def evaluate_variant(cfg: ProcessingConfig) -> dict[str, Any]:
+  """Clean, track and score the detections loaded into this worker."""
+  diagnostics = {"processedFrames": 0, "lostFrames": 0, "carriedFrames": 0}
+  _, track_points = track_detections(
+    _SWEEP_DETECTIONS, cfg, create_tracker(cfg), _SWEEP_SOURCE_FPS, diagnostics
+  )
+  track = TrackArrays.from_points(track_points)
+  if cfg.interpolate_gaps:
+    track = interpolate_track(track, max_gap_frames=cfg.max_gap_frames)
+  return {
+    **compute_derived_metrics(track),
+    "lostFrames": diagnostics["lostFrames"],
+    "interpolatedFrames": int(np.count_nonzero(track.quality == QUALITY_INTERPOLATED)),
+  }
+
+
+def rank_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+  """Best coverage first; ties go to fewer gaps, then lower jitter."""
+  ranked = sorted(
+    rows,
+    key=lambda row: (-row["coverage"], row["gapCount"], row["jitter"], row["variant"]),
+  )
+  for rank, row in enumerate(ranked, start=1):
+    row["rank"] = rank
+  return ranked
+
+
+def run_sweep(
+  video_path: Path,
+  video_meta: VideoMeta,
+  base_config: ProcessingConfig,
+  variants: list[dict[str, Any]],
+  cache_path: Path,
+  workers: int = 0,
+  on_progress: Optional[Callable[[float], None]] = None,
+) -> dict[str, Any]:
+  """
+  Score every variant (a dict of ProcessingConfig overrides) against one
+  detection pass and return {"results": ranked rows, "diagnostics": ...}.
+  """
+  if not variants:
+    raise ValueError("A sweep needs at least one variant")
+  if base_config.roi_inference or base_config.adaptive_sampling:
+    raise ValueError("roi_inference and adaptive_sampling cannot be swept")
+  configs = [variant_config(base_config, overrides) for overrides in variants]
+
+  started = time.monotonic()
+  detect_cfg = replace(base_config, min_conf=min(cfg.min_conf for cfg in configs))
+  _, diagnostics = run_pipeline(video_path, video_meta, detect_cfg, cache_path=cache_path)
+  cached = load_detections(cache_path, cache_key(diagnostics["videoSha256"], detect_cfg))
+  if cached is None:
+    raise RuntimeError(
+      diagnostics.get("detectionCacheError") or "Raw detections were not cached"
+    )
+  detect_seconds = time.monotonic() - started
+  if on_progress is not None:
+    on_progress(0.5)
+
+  source_fps = video_meta.fps if video_meta.fps > 0 else probe_fps(video_path)
+  workers = max(1, min(workers or os.cpu_count() or 1, len(configs)))
+  if workers == 1:
+    _init_sweep_worker(cached, source_fps)
+    scores = [evaluate_variant(cfg) for cfg in configs]
+  else:
+    with ProcessPoolExecutor(
+      max_workers=workers,
+      initializer=_init_sweep_worker,
+      initargs=(cached, source_fps),
+    ) as pool:
+      scores = list(pool.map(evaluate_variant, configs))
+
+  rows = [
+    {"variant": idx, "params": overrides, **score}
+    for idx, (overrides, score) in enumerate(zip(variants, scores))
+  ]
+  return {
+    "results": rank_results(rows),
+    "diagnostics": {
+      "variants": len(configs),
+      "workers": workers,
+      "sampledFrames": len(cached),
+      "detectionMinConf": detect_cfg.min_conf,
+      "detectionCache": diagnostics["detectionCache"],
+      "detectSeconds": round(detect_seconds, 3),
+      "sweepSeconds": round(time.monotonic() - started - detect_seconds, 3),
+    },
+  }
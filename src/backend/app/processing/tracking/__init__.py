@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Protocol
 
 from ..schemas import BBox, FrameDetection, ProcessingConfig, TrackPoint
-from .iou_single import SingleTargetIouTracker, interpolate_short_gaps
+from .iou_single import SingleTargetIouTracker, interpolate_short_gaps, interpolate_track
 
 
 class Tracker(Protocol):
@@ -46,5 +46,6 @@ __all__ = [
   "canonical_tracker_name",
   "create_tracker",
   "interpolate_short_gaps",
+  "interpolate_track",
 ]
 
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import replace
 from typing import Optional
 
-from ..schemas import BBox, FrameDetection, TrackPoint
+import numpy as np
+
+from ..schemas import (
+  QUALITY_INTERPOLATED,
+  QUALITY_MEASURED,
+  BBox,
+  FrameDetection,
+  TrackArrays,
+  TrackPoint,
+)
 
 
 class SingleTargetIouTracker:
@@ -36,48 +44,62 @@ class SingleTargetIouTracker:
     return frame_det, point
 
 
-def interpolate_short_gaps(
-  points: list[TrackPoint],
+def interpolate_track(
+  track: TrackArrays,
   max_gap_frames: int,
-) -> list[TrackPoint]:
-  if max_gap_frames <= 0 or len(points) < 3:
-    return points
+  max_gap_ms: Optional[int] = None,
+) -> TrackArrays:
+  """
+  Linearly fill runs of lost points bracketed by measured points.
 
-  result = [replace(point) for point in points]
-  idx = 0
-  while idx < len(result):
-    if result[idx].quality != "lost":
-      idx += 1
-      continue
+  By default points are assumed evenly spaced: a run is filled when it has
+  at most `max_gap_frames` points, weighted by position. For non-uniform
+  timestamps (adaptive sampling) pass `max_gap_ms`: a run is filled when the
+  bracketing measured points are at most that far apart, weighted by time.
+  """
+  result = track.copy()
+  count = len(track)
+  if max_gap_frames <= 0 or count < 3:
+    return result
 
-    start = idx - 1
-    end = idx
-    while end < len(result) and result[end].quality == "lost":
-      end += 1
+  starts, ends = track.lost_runs()
+  before = starts - 1
+  inside = (before >= 0) & (ends < count)
+  starts, ends, before = starts[inside], ends[inside], before[inside]
+  eligible = (track.quality[before] == QUALITY_MEASURED) & (
+    track.quality[ends] == QUALITY_MEASURED
+  )
+  if max_gap_ms is None:
+    eligible &= (ends - starts) <= max_gap_frames
+  else:
+    eligible &= (track.t_ms[ends] - track.t_ms[before]) <= max_gap_ms
+  starts, ends, before = starts[eligible], ends[eligible], before[eligible]
+  if starts.size == 0:
+    return result
 
-    gap_len = end - idx
-    if (
-      start >= 0
-      and end < len(result)
-      and result[start].quality == "measured"
-      and result[end].quality == "measured"
-      and gap_len <= max_gap_frames
-    ):
-      start_point = result[start]
-      end_point = result[end]
-      span = float(end - start)
-      for offset, point_index in enumerate(range(start + 1, end), start=1):
-        alpha = offset / span
-        interp_x = start_point.cx + ((end_point.cx - start_point.cx) * alpha)
-        interp_y = start_point.cy + ((end_point.cy - start_point.cy) * alpha)
-        result[point_index] = TrackPoint(
-          t_ms=result[point_index].t_ms,
-          track_id=result[point_index].track_id,
-          cx=interp_x,
-          cy=interp_y,
-          quality="interpolated",
-        )
-    idx = end
+  # One row per filled point, carrying its run's bracketing indices.
+  lengths = ends - starts
+  left = np.repeat(before, lengths)
+  right = np.repeat(ends, lengths)
+  index = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
 
+  alpha = (index - left) / (right - left).astype(np.float64)
+  if max_gap_ms is not None:
+    span_ms = (track.t_ms[right] - track.t_ms[left]).astype(np.float64)
+    timed = span_ms > 0.0
+    alpha[timed] = (track.t_ms[index][timed] - track.t_ms[left][timed]) / span_ms[timed]
+  result.cx[index] = track.cx[left] + ((track.cx[right] - track.cx[left]) * alpha)
+  result.cy[index] = track.cy[left] + ((track.cy[right] - track.cy[left]) * alpha)
+  result.quality[index] = QUALITY_INTERPOLATED
   return result
 
+
+def interpolate_short_gaps(
+  points: list[TrackPoint],
+  max_gap_frames: int,
+  max_gap_ms: Optional[int] = None,
+) -> list[TrackPoint]:
+  """List-of-TrackPoint wrapper around `interpolate_track`."""
+  if max_gap_frames <= 0 or len(points) < 3:
+    return points
+  return interpolate_track(TrackArrays.from_points(points), max_gap_frames, max_gap_ms).to_points()
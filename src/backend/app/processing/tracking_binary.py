@@ -0,0 +1,276 @@
+"""
+Columnar binary form of the tracking payload.
+
+Layout (little-endian):
+
+  b"ITRK" | uint32 format version | uint32 header length | JSON header
+  column data, every column starting at a 64-byte aligned offset
+
+The JSON header carries the small payload fields (coordinateSystem, video,
+processingMeta, derivedMetrics) plus a `columns` table mapping each column
+name to its dtype, shape and byte offset. Missing frame boxes/confidences
+are NaN, and point qualities are codes into the header's `qualityNames`.
+Readers can memory-map the file and view each column without copying.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .schemas import QUALITY_NAMES
+
+
+MEDIA_TYPE = "application/vnd.instructor-tracking.columns"
+MAGIC = b"ITRK"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sII")
+_ALIGN = 64
+
+# Column name -> dtype; shapes are (count,) except frames.bbox (count, 4).
+COLUMNS = {
+  "frames.tMs": "<i8",
+  "frames.bbox": "<f8",
+  "frames.conf": "<f8",
+  "frames.carried": "|u1",
+  "points.tMs": "<i8",
+  "points.trackId": "<i4",
+  "points.cx": "<f8",
+  "points.cy": "<f8",
+  "points.quality": "|u1",
+}
+_QUALITY_CODES = {name: code for code, name in enumerate(QUALITY_NAMES)}
+
+
+def _aligned(offset: int) -> int:
+  return -(-offset // _ALIGN) * _ALIGN
+
+
+def _frame_row(frame: dict[str, Any]) -> tuple[int, tuple[float, ...], float, int]:
+  box = frame.get("bbox")
+  bbox = (np.nan,) * 4 if box is None else (box["x"], box["y"], box["w"], box["h"])
+  conf = np.nan if frame.get("conf") is None else frame["conf"]
+  return frame["tMs"], bbox, conf, int(bool(frame.get("carried")))
+
+
+def _point_row(point: dict[str, Any]) -> tuple[int, int, float, float, int]:
+  return (
+    point["tMs"],
+    point["trackId"],
+    point["cx"],
+    point["cy"],
+    _QUALITY_CODES[point["quality"]],
+  )
+
+
+def payload_columns(payload: dict[str, Any]) -> dict[str, np.ndarray]:
+  """Pack the payload's frameDetections/trackPoints into typed arrays."""
+  frames = [_frame_row(frame) for frame in payload.get("frameDetections") or []]
+  points = [_point_row(point) for point in payload.get("trackPoints") or []]
+  frame_cols = list(zip(*frames)) or [(), (), (), ()]
+  point_cols = list(zip(*points)) or [(), (), (), (), ()]
+  return {
+    "frames.tMs": np.array(frame_cols[0], dtype=np.int64),
+    "frames.bbox": np.array(frame_cols[1], dtype=np.float64).reshape(-1, 4),
+    "frames.conf": np.array(frame_cols[2], dtype=np.float64),
+    "frames.carried": np.array(frame_cols[3], dtype=np.uint8),
+    "points.tMs": np.array(point_cols[0], dtype=np.int64),
+    "points.trackId": np.array(point_cols[1], dtype=np.int32),
+    "points.cx": np.array(point_cols[2], dtype=np.float64),
+    "points.cy": np.array(point_cols[3], dtype=np.float64),
+    "points.quality": np.array(point_cols[4], dtype=np.uint8),
+  }
+
+
+def _layout(
+  header: dict[str, Any], shapes: dict[str, tuple[int, ...]]
+) -> tuple[bytes, dict[str, dict[str, Any]], int]:
+  """Preamble plus JSON header, the column table, and the total file size."""
+  header = {**header, "qualityNames": list(QUALITY_NAMES)}
+  # Offsets depend on the header length, which depends on the offsets:
+  # iterate until the header stops growing (twice at most in practice).
+  header_len = 0
+  while True:
+    offset = _aligned(_PREAMBLE.size + header_len)
+    table = {}
+    for name, dtype in COLUMNS.items():
+      shape = shapes[name]
+      table[name] = {"dtype": dtype, "shape": list(shape), "offset": offset}
+      nbytes = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+      offset = _aligned(offset + nbytes)
+    encoded = json.dumps({**header, "columns": table}, separators=(",", ":")).encode("utf-8")
+    if len(encoded) <= header_len:
+      break
+    header_len = len(encoded)
+  head = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_len) + encoded.ljust(header_len, b" ")
+  return head, table, offset
+
+
+def encode_tracking_binary(header: dict[str, Any], columns: dict[str, np.ndarray]) -> bytes:
+  """Serialize `header` (payload fields other than the arrays) and `columns`."""
+  head, table, size = _layout(header, {name: columns[name].shape for name in COLUMNS})
+  out = bytearray(size)
+  out[: len(head)] = head
+  for name, dtype in COLUMNS.items():
+    data = np.ascontiguousarray(columns[name], dtype=dtype).tobytes()
+    start = table[name]["offset"]
+    out[start : start + len(data)] = data
+  return bytes(out)
+
+
+def write_columns(header: dict[str, Any], columns: dict[str, np.ndarray], path: Path) -> None:
+  """
+  Write `header` and `columns` in the binary layout, atomically replacing
+  `path`. Columns are copied one at a time, so they can be memory-mapped.
+  """
+  head, table, size = _layout(header, {name: columns[name].shape for name in COLUMNS})
+  path.parent.mkdir(parents=True, exist_ok=True)
+  tmp_path = path.with_name(path.name + ".tmp")
+  try:
+    with tmp_path.open("wb") as out:
+      out.write(head)
+      for name, dtype in COLUMNS.items():
+        out.write(b"\0" * (table[name]["offset"] - out.tell()))
+        np.ascontiguousarray(columns[name], dtype=dtype).tofile(out)
+      out.write(b"\0" * (size - out.tell()))
+    os.replace(tmp_path, path)
+  finally:
+    tmp_path.unlink(missing_ok=True)
+
+
+def write_tracking_binary(payload: dict[str, Any], path: Path) -> None:
+  """Write `payload` in the binary layout, atomically replacing `path`."""
+  header = {
+    key: value
+    for key, value in payload.items()
+    if key not in ("frameDetections", "trackPoints")
+  }
+  write_columns(header, payload_columns(payload), path)
+
+
+class ColumnSpool:
+  """
+  Frame and point rows spooled to per-column part files as they are added,
+  so a streamed result gets its binary form without being held in memory.
+  """
+
+  def __init__(self, path: Path, flush_rows: int = 4096) -> None:
+    self.path = path
+    self._dir = path.with_name(path.name + ".columns.part")
+    self._dir.mkdir(parents=True, exist_ok=True)
+    self._handles = {name: (self._dir / name).open("wb") for name in COLUMNS}
+    self._frames: list[tuple[int, tuple[float, ...], float, int]] = []
+    self._points: list[tuple[int, int, float, float, int]] = []
+    self._flush_rows = max(1, flush_rows)
+    self.frame_count = 0
+    self.point_count = 0
+
+  def add_frame(self, frame: dict[str, Any]) -> None:
+    self._frames.append(_frame_row(frame))
+    self.frame_count += 1
+    if len(self._frames) >= self._flush_rows:
+      self._flush()
+
+  def add_point(self, point: dict[str, Any]) -> None:
+    self._points.append(_point_row(point))
+    self.point_count += 1
+    if len(self._points) >= self._flush_rows:
+      self._flush()
+
+  def _flush(self) -> None:
+    for prefix, rows in (("frames.", self._frames), ("points.", self._points)):
+      if not rows:
+        continue
+      names = [name for name in COLUMNS if name.startswith(prefix)]
+      for name, values in zip(names, zip(*rows)):
+        np.asarray(values, dtype=COLUMNS[name]).tofile(self._handles[name])
+      rows.clear()
+
+  def finish(self, header: dict[str, Any]) -> None:
+    """Write the binary file from the spooled columns, then remove them."""
+    try:
+      self._flush()
+      for handle in self._handles.values():
+        handle.close()
+      columns = {}
+      for name, dtype in COLUMNS.items():
+        rows = self.frame_count if name.startswith("frames.") else self.point_count
+        shape = (rows, 4) if name == "frames.bbox" else (rows,)
+        if rows:
+          columns[name] = np.memmap(self._dir / name, dtype=dtype, mode="r", shape=shape)
+        else:
+          columns[name] = np.empty(shape, dtype=dtype)
+      write_columns(header, columns, self.path)
+    finally:
+      self.discard()
+
+  def discard(self) -> None:
+    for handle in self._handles.values():
+      handle.close()
+    shutil.rmtree(self._dir, ignore_errors=True)
+
+
+@dataclass(slots=True)
+class TrackingBinary:
+  header: dict[str, Any]
+  columns: dict[str, np.ndarray]
+
+  @classmethod
+  def open(cls, path: Path) -> "TrackingBinary":
+    """Memory-map `path`; columns are read-only views into the file."""
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if data.shape[0] < _PREAMBLE.size:
+      raise ValueError(f"{path} is not a tracking results file")
+    magic, version, header_len = _PREAMBLE.unpack(bytes(data[: _PREAMBLE.size]))
+    if magic != MAGIC or version != FORMAT_VERSION:
+      raise ValueError(f"{path} is not a version {FORMAT_VERSION} tracking results file")
+    end = _PREAMBLE.size + header_len
+    header = json.loads(bytes(data[_PREAMBLE.size : end]).decode("utf-8"))
+    columns = {}
+    for name, spec in header.pop("columns").items():
+      dtype = np.dtype(spec["dtype"])
+      shape = tuple(spec["shape"])
+      nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+      start = int(spec["offset"])
+      columns[name] = data[start : start + nbytes].view(dtype).reshape(shape)
+    return cls(header=header, columns=columns)
+
+  def to_payload(self) -> dict[str, Any]:
+    """Rebuild the JSON payload; values round-trip exactly."""
+    cols = self.columns
+    quality_names = self.header.get("qualityNames") or list(QUALITY_NAMES)
+    frames = [
+      {
+        "tMs": t,
+        "bbox": None if math.isnan(box[0]) else dict(zip(("x", "y", "w", "h"), box)),
+        "conf": None if math.isnan(conf) else conf,
+        "carried": bool(carried),
+      }
+      for t, box, conf, carried in zip(
+        cols["frames.tMs"].tolist(),
+        cols["frames.bbox"].tolist(),
+        cols["frames.conf"].tolist(),
+        cols["frames.carried"].tolist(),
+      )
+    ]
+    points = [
+      {"tMs": t, "trackId": track_id, "cx": x, "cy": y, "quality": quality_names[q]}
+      for t, track_id, x, y, q in zip(
+        cols["points.tMs"].tolist(),
+        cols["points.trackId"].tolist(),
+        cols["points.cx"].tolist(),
+        cols["points.cy"].tolist(),
+        cols["points.quality"].tolist(),
+      )
+    ]
+    header = {key: value for key, value in self.header.items() if key != "qualityNames"}
+    metrics = header.pop("derivedMetrics", None)
+    return {**header, "frameDetections": frames, "trackPoints": points, "derivedMetrics": metrics}
@@ -0,0 +1,130 @@
+"""
+Time windows and display downsampling over columnar tracking results.
+
+Windows are found by binary search on the sorted `tMs` columns, so a lookup
+costs O(log n) regardless of session length. Track points are downsampled
+with Largest-Triangle-Three-Buckets (LTTB), which keeps the visually
+significant turns of the path; frame detections follow the selected points.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+
+_BATCH_CELLS = 1 << 16
+
+
+def lttb_indices(x: np.ndarray, ys: Sequence[np.ndarray], threshold: int) -> np.ndarray:
+  """
+  Indices of the `threshold` points LTTB keeps from the series `ys` over `x`.
+  With several series (cx and cy), triangle areas are summed across them.
+  The first and last points are always kept.
+
+  Each bucket's pick depends on the previous bucket's. Instead of walking
+  the buckets in Python, all of them are scored at once against provisional
+  picks, then only buckets whose previous pick changed are scored again,
+  until nothing changes. That fixed point is exactly the sequential result.
+  """
+  count = x.shape[0]
+  if threshold >= count or threshold < 3:
+    return np.arange(count)
+  x = x.astype(np.float64)
+  ys = [y.astype(np.float64) for y in ys]
+  # Interior points split into threshold - 2 buckets of (nearly) equal size.
+  edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+  starts, ends = edges[:-1], edges[1:]
+  # Third vertex: the average of the next bucket (the last point at the end).
+  # The next buckets tile [edges[1], count), so one reduceat sums them all.
+  next_sizes = np.diff(np.append(ends, count))
+  cx = np.add.reduceat(x, ends) / next_sizes
+  cys = [np.add.reduceat(y, ends) / next_sizes for y in ys]
+  widths = ends - starts
+  offsets = np.arange(int(widths.max()))
+  # Buckets scored per batch, so the temporaries stay small and in cache.
+  batch_rows = max(1, _BATCH_CELLS // offsets.shape[0])
+
+  def best(rows: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+    valid = offsets[None, :] < widths[rows, None]
+    candidates = np.where(valid, starts[rows, None] + offsets[None, :], starts[rows, None])
+    xa = x[anchors][:, None]
+    run = x[candidates]
+    run -= xa  # x - xa
+    reach = cx[rows, None] - xa
+    area = np.zeros(candidates.shape, dtype=np.float64)
+    for y, cy in zip(ys, cys):
+      ya = y[anchors][:, None]
+      rise = y[candidates]
+      rise -= ya
+      rise *= reach
+      rise -= run * (cy[rows, None] - ya)
+      area += np.abs(rise, out=rise)
+    area[~valid] = -1.0
+    return candidates[np.arange(rows.shape[0]), np.argmax(area, axis=1)]
+
+  picks = starts.copy()
+  todo = np.arange(starts.shape[0])
+  while todo.shape[0]:
+    anchors = np.where(todo > 0, picks[todo - 1], 0)
+    updated = np.concatenate([
+      best(todo[i : i + batch_rows], anchors[i : i + batch_rows])
+      for i in range(0, todo.shape[0], batch_rows)
+    ])
+    changed = todo[updated != picks[todo]]
+    picks[todo] = updated
+    todo = changed[changed + 1 < starts.shape[0]] + 1
+  return np.concatenate(([0], picks, [count - 1]))
+
+
+def window_columns(
+  columns: dict[str, np.ndarray],
+  from_ms: Optional[int] = None,
+  to_ms: Optional[int] = None,
+  max_points: Optional[int] = None,
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+  """
+  Restrict columnar results (see tracking_binary.COLUMNS) to
+  from_ms <= tMs <= to_ms and downsample points to at most `max_points`.
+  Returns the new columns and a summary of what was selected.
+  """
+  point_t = columns["points.tMs"]
+  frame_t = columns["frames.tMs"]
+  lo = -np.inf if from_ms is None else from_ms
+  hi = np.inf if to_ms is None else to_ms
+  p_start = int(np.searchsorted(point_t, lo, side="left"))
+  p_end = int(np.searchsorted(point_t, hi, side="right"))
+  f_start = int(np.searchsorted(frame_t, lo, side="left"))
+  f_end = int(np.searchsorted(frame_t, hi, side="right"))
+  total = p_end - p_start
+
+  point_idx = np.arange(p_start, p_end)
+  frame_idx = np.arange(f_start, f_end)
+  downsampled = max_points is not None and total > max_points
+  if downsampled:
+    keep = lttb_indices(
+      point_t[p_start:p_end],
+      (columns["points.cx"][p_start:p_end], columns["points.cy"][p_start:p_end]),
+      max_points,
+    )
+    point_idx = point_idx[keep]
+    # Frame detections at the kept points' times (the nearest frame at or after).
+    window_frame_t = frame_t[f_start:f_end]
+    if window_frame_t.shape[0]:
+      positions = np.searchsorted(window_frame_t, point_t[point_idx], side="left")
+      positions = np.minimum(positions, window_frame_t.shape[0] - 1)
+      frame_idx = frame_idx[np.unique(positions)]
+
+  windowed = {
+    name: column[frame_idx] if name.startswith("frames.") else column[point_idx]
+    for name, column in columns.items()
+  }
+  summary = {
+    "fromMs": from_ms,
+    "toMs": to_ms,
+    "totalPoints": total,
+    "returnedPoints": int(point_idx.shape[0]),
+    "downsampled": bool(downsampled),
+  }
+  return windowed, summary
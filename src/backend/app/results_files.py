@@ -0,0 +1,108 @@
+"""
+Result files a completed job leaves in the session's `results/` dir for the
+tracking endpoint to serve as-is (see http_cache.py).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+from . import fast_json
+from .blob_store import link_file
+from .http_cache import ENCODING_SUFFIXES, remove_variants, write_compressed_variants
+from .processing.tracking_binary import write_tracking_binary
+
+
+TRACKING_JSON = "instructor-tracking.json"
+TRACKING_BINARY = "instructor-tracking.bin"
+# Exact body of the JSON tracking response: {"version": "v1", "data": payload}.
+TRACKING_RESPONSE = "tracking-response.json"
+# Raw detections of the last run, replayed when the key matches (detection_cache.py). Sweeps
+# detect at their lowest min_conf, a different key, so they keep their own file.
+DETECTION_CACHE = "raw-detections.npz"
+SWEEP_DETECTION_CACHE = "raw-detections-sweep.npz"
+# What another session with the same video and processing config can share.
+SHAREABLE_FILES = (TRACKING_JSON, TRACKING_RESPONSE, TRACKING_BINARY)
+
+
+def write_payload_file(results_dir: Path, payload: dict[str, Any]) -> Path:
+  """Write the readable payload, replacing (not rewriting) a file another session may link."""
+  path = results_dir / TRACKING_JSON
+  tmp_path = path.with_name(path.name + ".tmp")
+  tmp_path.write_bytes(fast_json.dumps(payload, indent=True))
+  os.replace(tmp_path, path)
+  return path
+
+
+def write_response_file(
+  results_dir: Path,
+  payload: Optional[dict[str, Any]] = None,
+  streamed_path: Optional[Path] = None,
+) -> Path:
+  """
+  Write the JSON response body from `payload`, or by wrapping a streamed
+  results file without loading it, plus its compressed variants.
+  """
+  path = results_dir / TRACKING_RESPONSE
+  tmp_path = path.with_name(path.name + ".tmp")
+  with tmp_path.open("wb") as out:
+    if streamed_path is not None:
+      out.write(b'{"version":"v1","data":')
+      with streamed_path.open("rb") as src:
+        shutil.copyfileobj(src, out)
+      out.write(b"}")
+    else:
+      out.write(fast_json.dumps({"version": "v1", "data": payload}))
+  os.replace(tmp_path, path)
+  write_compressed_variants(path)
+  return path
+
+
+def write_binary_file(
+  results_dir: Path,
+  payload: Optional[dict[str, Any]] = None,
+  streamed_path: Optional[Path] = None,
+) -> Path:
+  path = results_dir / TRACKING_BINARY
+  if payload is None and streamed_path is not None:
+    # Streamed before the pipeline wrote the binary form: load it once.
+    payload = fast_json.loads(streamed_path.read_bytes())
+  write_tracking_binary(payload, path)
+  write_compressed_variants(path)
+  return path
+
+
+def publish_results(
+  results_dir: Path,
+  payload: Optional[dict[str, Any]] = None,
+  streamed_path: Optional[Path] = None,
+) -> Path:
+  """
+  Pre-encode everything the tracking endpoint serves and return the JSON
+  response file. For streamed results the pipeline has already written the
+  binary form from spooled columns; when it has not, it is built on the
+  first request for it instead.
+  """
+  results_dir.mkdir(parents=True, exist_ok=True)
+  response_path = write_response_file(results_dir, payload=payload, streamed_path=streamed_path)
+  binary_path = results_dir / TRACKING_BINARY
+  if streamed_path is None:
+    write_binary_file(results_dir, payload=payload)
+  elif binary_path.is_file():
+    write_compressed_variants(binary_path)
+  else:
+    remove_variants(binary_path)
+  return response_path
+
+
+def link_results(source_dir: Path, results_dir: Path) -> None:
+  """Share another session's published results (and their compressed variants) by hard link."""
+  results_dir.mkdir(parents=True, exist_ok=True)
+  for name in SHAREABLE_FILES:
+    for suffix in ("", *ENCODING_SUFFIXES.values()):
+      source = source_dir / (name + suffix)
+      if source.is_file():
+        link_file(source, results_dir / (name + suffix))
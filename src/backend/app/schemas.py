@@ -28,12 +28,23 @@ class ProcessingInfo(BaseModel):
   error: Optional[str] = None
 
 
+class TrackingSummary(BaseModel):
+  version: str
+  frameCount: int
+  pointCount: int
+  byteSize: int
+  derivedMetrics: Optional[dict[str, Any]] = None
+  createdAt: datetime
+
+
 class SessionDetail(BaseModel):
   session: SessionSummary
   media: MediaInfo
   processing: ProcessingInfo
   relatedJobId: Optional[str] = None
   hasInstructorTrackingResult: bool = False
+  # Absent for results stored before summaries existed.
+  trackingSummary: Optional[TrackingSummary] = None
 
 
 class JobResponse(BaseModel):
@@ -46,6 +57,10 @@ class JobResponse(BaseModel):
   finishedAt: Optional[datetime] = None
   updatedAt: datetime
   error: Optional[str] = None
+  framesProcessed: Optional[int] = None
+  frameCount: Optional[int] = None
+  framesPerSecond: Optional[float] = None
+  etaSeconds: Optional[float] = None
 
 
 class ImportSessionResponse(BaseModel):
@@ -53,6 +68,25 @@ class ImportSessionResponse(BaseModel):
   sessionId: str
 
 
+class CreateUploadRequest(BaseModel):
+  filename: str = Field(min_length=1)
+  size: int = Field(gt=0)
+  metadata: Optional[dict[str, Any]] = None
+
+
+class UploadStatus(BaseModel):
+  uploadId: str
+  # Bytes received so far: where the next chunk must start.
+  offset: int
+  size: int
+  chunkSize: int
+
+
+class CompleteUploadRequest(BaseModel):
+  # When given, the received file must have this digest.
+  sha256: Optional[str] = None
+
+
 class TrackingPayload(BaseModel):
   coordinateSystem: Literal["normalized", "pixels"]
   video: dict
@@ -60,6 +94,8 @@ class TrackingPayload(BaseModel):
   frameDetections: list[dict]
   trackPoints: list[dict]
   derivedMetrics: dict
+  # Set when the request asked for a time window or downsampling.
+  window: Optional[dict[str, Any]] = None
 
 
 class TrackingResponse(BaseModel):
@@ -70,3 +106,33 @@ class TrackingResponse(BaseModel):
 class RetryJobResponse(BaseModel):
   jobId: str
 
+
+class SweepRequest(BaseModel):
+  # Each variant is a dict of ProcessingConfig overrides, e.g. {"min_conf": 0.3}.
+  variants: list[dict[str, Any]] = Field(min_length=1, max_length=200)
+
+
+class SweepResult(BaseModel):
+  rank: int
+  variant: int
+  params: dict[str, Any]
+  coverage: float
+  gapCount: int
+  longestGapMs: int
+  distance: float
+  jitter: float
+  lostFrames: int
+  interpolatedFrames: int
+
+
+class SweepResponse(BaseModel):
+  id: str
+  status: JobStatus
+  progress: float = Field(ge=0.0, le=1.0)
+  sessionId: str
+  createdAt: datetime
+  startedAt: Optional[datetime] = None
+  finishedAt: Optional[datetime] = None
+  error: Optional[str] = None
+  results: list[SweepResult] = Field(default_factory=list)
+  diagnostics: dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,163 @@
+"""
+Video uploads written to disk in fixed-size chunks, so API memory stays
+constant whatever the file size. File I/O runs in the threadpool, off the
+event loop.
+
+Resumable uploads (`/uploads` in main.py) are append-only: each PUT must
+start at the number of bytes already received, and a client that lost a
+response asks for the current offset and continues from there. `hold`
+serializes requests for one upload: an `asyncio.Lock` within the process and
+an exclusive `flock` on the data file across API worker processes, so a retry
+racing its first attempt on another worker cannot append the same bytes
+twice. Where `fcntl` is unavailable only the in-process lock applies.
+
+Each process keeps an `UploadState` with a running sha256 of the bytes
+received, so completing does not re-read the file. States are rebuilt from
+the file when it grew elsewhere, and dropped after `STATE_IDLE_SECONDS`
+without requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+try:
+  import fcntl
+except ImportError:  # not on Windows
+  fcntl = None
+
+
+CHUNK_BYTES = 1 << 20
+# File holding the bytes received so far, inside the upload's directory.
+UPLOAD_DATA = "data.part"
+# In-memory states of uploads without requests for this long are dropped.
+STATE_IDLE_SECONDS = 3600.0
+
+
+class UploadTooLarge(ValueError):
+  """More bytes were sent than the upload declared."""
+
+
+class UploadState:
+  """In-memory state of a resumable upload: its lock and the digest of `size` bytes."""
+
+  def __init__(self) -> None:
+    self.lock = asyncio.Lock()
+    self.digest = hashlib.sha256()
+    self.size = 0
+    self.used_at = time.monotonic()
+
+  def write(self, out: BinaryIO, data: bytes) -> None:
+    out.write(data)
+    self.digest.update(data)
+    self.size += len(data)
+
+  def _catch_up(self, path: Path) -> None:
+    size = path.stat().st_size
+    if size < self.size:
+      self.digest, self.size = hashlib.sha256(), 0
+    with path.open("rb") as src:
+      src.seek(self.size)
+      while chunk := src.read(CHUNK_BYTES):
+        self.digest.update(chunk)
+        self.size += len(chunk)
+
+  async def sync(self, path: Path) -> None:
+    """
+    Hash bytes on disk the digest has not seen: those appended by another
+    process, or all of them after a restart or eviction. Call from `hold`.
+    """
+    if path.stat().st_size != self.size:
+      await run_in_threadpool(self._catch_up, path)
+
+
+_states: dict[str, UploadState] = {}
+
+
+def upload_state(upload_id: str) -> UploadState:
+  now = time.monotonic()
+  for key, state in list(_states.items()):
+    if now - state.used_at > STATE_IDLE_SECONDS and not state.lock.locked():
+      del _states[key]
+  return _states.setdefault(upload_id, UploadState())
+
+
+def forget(upload_id: str) -> None:
+  _states.pop(upload_id, None)
+
+
+def _open_append(path: Path) -> BinaryIO:
+  # No O_CREAT: a completed or aborted upload must not get a new empty file.
+  return os.fdopen(os.open(path, os.O_WRONLY | os.O_APPEND), "ab")
+
+
+@asynccontextmanager
+async def hold(upload_id: str, path: Path) -> AsyncIterator[tuple[UploadState, BinaryIO]]:
+  """
+  Lock the upload and yield its state, synced with `path`, and `path` open
+  for appending. Raises FileNotFoundError when the upload was completed or
+  aborted, possibly by another process while waiting for the lock.
+  """
+  state = upload_state(upload_id)
+  async with state.lock:
+    out = await run_in_threadpool(_open_append, path)
+    try:
+      if fcntl is not None:
+        await run_in_threadpool(fcntl.flock, out.fileno(), fcntl.LOCK_EX)
+      # Completing renames the file; the lock may have been won on the old name.
+      if os.fstat(out.fileno()).st_ino != path.stat().st_ino:
+        raise FileNotFoundError(path)
+      await state.sync(path)
+      yield state, out
+    finally:
+      state.used_at = time.monotonic()
+      await run_in_threadpool(out.close)  # also releases the flock
+
+
+async def save_upload(upload: UploadFile, path: Path) -> tuple[str, int]:
+  """Copy `upload` to `path` chunk by chunk; returns its sha256 and size."""
+  state = UploadState()
+  tmp_path = path.with_name(path.name + ".part")
+  try:
+    out = await run_in_threadpool(tmp_path.open, "wb")
+    try:
+      while chunk := await upload.read(CHUNK_BYTES):
+        await run_in_threadpool(state.write, out, chunk)
+    finally:
+      await run_in_threadpool(out.close)
+    os.replace(tmp_path, path)
+  finally:
+    tmp_path.unlink(missing_ok=True)
+  return state.digest.hexdigest(), state.size
+
+
+async def append_stream(
+  stream: AsyncIterator[bytes], out: BinaryIO, limit: int, state: UploadState
+) -> int:
+  """
+  Append the request body `stream` to `out`, updating `state`, and return the
+  new size. Call with the state and file from `hold`. Bytes received before a
+  disconnect are kept; the client resumes after them.
+  """
+  buffer = bytearray()
+  try:
+    async for chunk in stream:
+      if state.size + len(buffer) + len(chunk) > limit:
+        raise UploadTooLarge(f"Upload is limited to {limit} bytes")
+      buffer += chunk
+      if len(buffer) >= CHUNK_BYTES:
+        await run_in_threadpool(state.write, out, bytes(buffer))
+        buffer.clear()
+  finally:
+    if buffer:
+      await run_in_threadpool(state.write, out, bytes(buffer))
+  return state.size
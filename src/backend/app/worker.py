@@ -8,6 +8,8 @@ and persists instructor-tracking results for the dashboard.
 import shutil
 import subprocess
 import json
+import time
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 
@@ -18,8 +20,18 @@ from rq import Queue, Worker
 from .config import settings
 from .database import SessionLocal
 from . import models
+from .processing.detection_cache import result_config_sha256
 from .processing.pipeline import run_pipeline
-from .processing.schemas import ProcessingConfig, VideoMeta
+from .processing.sweep import run_sweep
+from .processing.schemas import PipelineProgress, ProcessingConfig, VideoMeta
+from .results_files import (
+  DETECTION_CACHE,
+  SWEEP_DETECTION_CACHE,
+  TRACKING_BINARY,
+  TRACKING_JSON,
+  publish_results,
+  write_payload_file,
+)
 
 
 def _is_browser_playable_mp4(path: Path) -> bool:
@@ -144,6 +156,85 @@ def _decode_video_metadata(path: Path) -> tuple[int, int, float, int]:
   return width, height, fps, frame_count
 
 
+def processing_config() -> ProcessingConfig:
+  return ProcessingConfig(
+    coordinate_system="normalized",
+    process_fps=settings.process_fps,
+    frame_source=settings.frame_source,
+    frame_source_long_side=settings.frame_source_long_side,
+    decode_mode=settings.decode_mode,
+    prefetch_frames=settings.prefetch_frames,
+    min_conf=settings.detector_min_conf,
+    detector_type=getattr(settings, "detector_type", "yolov8n"),
+    detector_model=settings.detector_model,
+    detector_device=settings.detector_device,
+    detector_imgsz=settings.detector_imgsz,
+    detector_batch_size=settings.detector_batch_size,
+    detector_threads=settings.detector_threads,
+    onnx_quantized=settings.onnx_quantized,
+    motion_gate_threshold=settings.motion_gate_threshold,
+    motion_gate_max_skip=settings.motion_gate_max_skip,
+    roi_inference=settings.roi_inference,
+    roi_imgsz=settings.roi_imgsz,
+    roi_expand=settings.roi_expand,
+    roi_refresh_interval=settings.roi_refresh_interval,
+    adaptive_sampling=settings.adaptive_sampling,
+    adaptive_max_multiplier=settings.adaptive_max_multiplier,
+    adaptive_still_speed=settings.adaptive_still_speed,
+    adaptive_fast_speed=settings.adaptive_fast_speed,
+    adaptive_min_iou=settings.adaptive_min_iou,
+    tracker_type=getattr(settings, "tracker_type", "single-target-iou"),
+    max_gap_frames=settings.max_gap_frames,
+    processing_timeout_seconds=settings.processing_timeout_seconds,
+    parallel_workers=settings.parallel_workers,
+    stream_chunk_size=settings.stream_chunk_size,
+    checkpoint_interval_seconds=settings.checkpoint_interval_seconds,
+  )
+
+
+class _ProgressWriter:
+  """
+  Persist pipeline progress on the job, at most once per `interval` seconds
+  so a fast pipeline does not turn into a stream of SQLite commits. The
+  pipeline's share of the job runs from `start` to `end`.
+  """
+
+  def __init__(
+    self,
+    db,
+    job: models.ProcessingJob,
+    start: float,
+    end: float,
+    interval: float,
+  ) -> None:
+    self.db = db
+    self.job = job
+    self.start = start
+    self.end = end
+    self.interval = interval
+    self._last_write = float("-inf")
+
+  def __call__(self, progress: PipelineProgress) -> None:
+    now = time.monotonic()
+    fraction = progress.fraction
+    if now - self._last_write < self.interval and fraction != 1.0:
+      return
+    self._last_write = now
+    if fraction is not None:
+      self.job.progress = self.start + ((self.end - self.start) * fraction)
+    live = self.job.live_progress
+    if live is None:
+      live = models.JobProgress(job_id=self.job.id)
+      self.job.live_progress = live
+    live.frames_processed = progress.frames_done
+    live.frame_count = progress.frame_count
+    live.frames_per_second = round(progress.frames_per_second, 2)
+    eta = progress.eta_seconds
+    live.eta_seconds = None if eta is None else round(eta, 1)
+    live.updated_at = datetime.utcnow()
+    self.db.commit()
+
+
 def process_job(job_id: str) -> None:
   db = SessionLocal()
   try:
@@ -177,52 +268,73 @@ def process_job(job_id: str) -> None:
     session_dir = video_path.parent
     results_dir = session_dir / "results"
     diagnostics_path = results_dir / "processing-diagnostics.json"
-    payload_path = results_dir / "instructor-tracking.json"
-    cfg = ProcessingConfig(
-      coordinate_system="normalized",
-      process_fps=settings.process_fps,
-      min_conf=settings.detector_min_conf,
-      detector_type=getattr(settings, "detector_type", "yolov8n"),
-      detector_model=settings.detector_model,
-      detector_device=settings.detector_device,
-      detector_imgsz=settings.detector_imgsz,
-      tracker_type=getattr(settings, "tracker_type", "single-target-iou"),
-      max_gap_frames=settings.max_gap_frames,
-      processing_timeout_seconds=settings.processing_timeout_seconds,
-    )
+    payload_path = results_dir / TRACKING_JSON
+    cfg = processing_config()
     payload, diagnostics = run_pipeline(
       video_path=video_path,
       video_meta=VideoMeta(width=width, height=height, fps=fps, frame_count=frame_count),
       config=cfg,
       diagnostics_path=diagnostics_path,
+      cache_path=results_dir / DETECTION_CACHE if settings.detection_cache else None,
+      # Streaming writes the full payload to disk; the DB keeps only a summary.
+      output_path=payload_path if settings.stream_results else None,
+      binary_output_path=results_dir / TRACKING_BINARY if settings.stream_results else None,
+      checkpoint_dir=(
+        results_dir / "checkpoint" if settings.checkpoint_interval_seconds > 0 else None
+      ),
+      on_progress=_ProgressWriter(
+        db, job, start=0.3, end=0.95, interval=settings.progress_interval_seconds
+      ),
     )
-    results_dir.mkdir(parents=True, exist_ok=True)
-    payload_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if settings.stream_results:
+      response_path = publish_results(results_dir, streamed_path=payload_path)
+      frame_count, point_count = payload["frameCount"], payload["pointCount"]
+    else:
+      results_dir.mkdir(parents=True, exist_ok=True)
+      write_payload_file(results_dir, payload)
+      response_path = publish_results(results_dir, payload=payload)
+      frame_count, point_count = len(payload["frameDetections"]), len(payload["trackPoints"])
 
     tracking = (
       db.query(models.InstructorTrackingResult)
       .filter(models.InstructorTrackingResult.session_id == job.session.id)
       .first()
     )
+    now = datetime.utcnow()
     if tracking is None:
       tracking = models.InstructorTrackingResult(
-        session_id=job.session.id,
-        payload=payload,
-        created_at=datetime.utcnow(),
+        session_id=job.session.id, payload=payload, created_at=now
       )
       db.add(tracking)
     else:
+      # `payload` is deferred, so replacing it does not load the old one.
       tracking.payload = payload
-      tracking.created_at = datetime.utcnow()
+      tracking.created_at = now
+    summary = tracking.summary or models.TrackingResultSummary()
+    summary.version = "v1"
+    summary.frame_count = frame_count
+    summary.point_count = point_count
+    summary.byte_size = response_path.stat().st_size
+    summary.derived_metrics = payload.get("derivedMetrics")
+    summary.created_at = now
+    tracking.summary = summary
+    existing_meta = (
+      job.session.metadata_json if isinstance(job.session.metadata_json, dict) else {}
+    )
+    video_sha256 = existing_meta.get("videoSha256")
+    if video_sha256:
+      # Hash of the upload as received, so an identical upload finds this result.
+      fingerprint = tracking.fingerprint or models.ResultFingerprint()
+      fingerprint.video_sha256 = video_sha256
+      fingerprint.config_sha256 = result_config_sha256(cfg)
+      fingerprint.created_at = now
+      tracking.fingerprint = fingerprint
 
     job.status = "completed"
     job.progress = 1.0
     job.error = None
     job.finished_at = datetime.utcnow()
     job.session.status = "completed"
-    existing_meta = (
-      job.session.metadata_json if isinstance(job.session.metadata_json, dict) else {}
-    )
     job.session.metadata_json = {
       **existing_meta,
       "processingDiagnostics": diagnostics,
@@ -249,6 +361,57 @@ def process_job(job_id: str) -> None:
     db.close()
 
 
+def process_sweep(sweep_id: str) -> None:
+  """Run a parameter sweep; the session's tracking result is left untouched."""
+  db = SessionLocal()
+  try:
+    sweep = (
+      db.query(models.SweepJob)
+      .filter(models.SweepJob.sweep_id == sweep_id)
+      .join(models.Session)
+      .first()
+    )
+    if not sweep:
+      return
+
+    sweep.status = "running"
+    sweep.started_at = datetime.utcnow()
+    sweep.progress = 0.1
+    db.commit()
+
+    video_path = Path(sweep.session.video_path)
+    width, height, fps, frame_count = _decode_video_metadata(video_path)
+
+    def _on_progress(progress: float) -> None:
+      sweep.progress = progress
+      db.commit()
+
+    outcome = run_sweep(
+      video_path=video_path,
+      video_meta=VideoMeta(width=width, height=height, fps=fps, frame_count=frame_count),
+      # Crop/adaptive inference depend on tracker feedback and cannot be replayed.
+      base_config=replace(processing_config(), roi_inference=False, adaptive_sampling=False),
+      variants=list(sweep.variants),
+      cache_path=video_path.parent / "results" / SWEEP_DETECTION_CACHE,
+      workers=settings.sweep_workers,
+      on_progress=_on_progress,
+    )
+    sweep.result = outcome
+    sweep.status = "completed"
+    sweep.progress = 1.0
+    sweep.error = None
+    sweep.finished_at = datetime.utcnow()
+    db.commit()
+  except Exception as exc:  # noqa: BLE001
+    if "sweep" in locals() and sweep is not None:
+      sweep.status = "failed"
+      sweep.error = str(exc)
+      sweep.finished_at = datetime.utcnow()
+      db.commit()
+  finally:
+    db.close()
+
+
 def run_worker() -> None:
   redis_conn = Redis.from_url(settings.redis_url)
   q = Queue("processing", connection=redis_conn)
@@ -0,0 +1,65 @@
+"""
+Per-frame cost of instructor selection: list-of-Detection vs (N, 6) array.
+
+Run from src/backend:
+
+  python -m benchmarks.bench_cleaning
+"""
+
+from __future__ import annotations
+
+import random
+import timeit
+
+from app.processing.cleaning import (
+  detections_to_array,
+  select_instructor_detection,
+  select_instructor_index,
+)
+from app.processing.schemas import BBox, Detection, ProcessingConfig
+
+
+SIZES = (5, 50, 200)
+FRAMES = 200
+
+
+def _frame(rng: random.Random, count: int) -> list[Detection]:
+  return [
+    Detection(
+      bbox=BBox(
+        x=rng.uniform(0.0, 0.8),
+        y=rng.uniform(0.0, 0.6),
+        w=rng.uniform(0.03, 0.2),
+        h=rng.uniform(0.1, 0.4),
+      ),
+      conf=rng.uniform(0.25, 0.95),
+      cls=0,
+    )
+    for _ in range(count)
+  ]
+
+
+def main() -> None:
+  rng = random.Random(0)
+  cfg = ProcessingConfig(min_conf=0.25)
+  prev_bbox = BBox(0.4, 0.3, 0.1, 0.3)
+  print(f"{'detections':>10} {'list us':>10} {'array us':>10} {'speedup':>8}")
+  for size in SIZES:
+    frames = [_frame(rng, size) for _ in range(FRAMES)]
+    arrays = [detections_to_array(frame) for frame in frames]
+
+    def run_list() -> None:
+      for frame in frames:
+        select_instructor_detection(frame, prev_bbox, 0, cfg)
+
+    def run_array() -> None:
+      for array in arrays:
+        select_instructor_index(array, prev_bbox, 0, cfg)
+
+    list_us = min(timeit.repeat(run_list, number=5, repeat=5)) / (5 * FRAMES) * 1e6
+    array_us = min(timeit.repeat(run_array, number=5, repeat=5)) / (5 * FRAMES) * 1e6
+    print(f"{size:>10} {list_us:>10.1f} {array_us:>10.1f} {list_us / array_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+  main()
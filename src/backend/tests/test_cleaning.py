@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from app.processing.cleaning import (
+  detections_to_array,
+  select_instructor_detection,
+  select_instructor_index,
+)
+from app.processing.schemas import BBox, Detection, ProcessingConfig
+
+
+def _random_detections(rng: random.Random, count: int) -> list[Detection]:
+  detections = []
+  for _ in range(count):
+    w = rng.choice([0.0, rng.uniform(0.01, 0.5)])
+    h = rng.choice([0.0, rng.uniform(0.01, 0.9)])
+    detections.append(
+      Detection(
+        bbox=BBox(x=rng.uniform(-0.1, 0.9), y=rng.uniform(-0.1, 0.9), w=w, h=h),
+        # Coarse confidences so ties between candidates are common.
+        conf=rng.choice([0.3, 0.4, 0.5, 0.8, 0.9]),
+        cls=rng.choice([0, 0, 0, 2]),
+      )
+    )
+  return detections
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_selection_matches_scalar(seed: int) -> None:
+  rng = random.Random(seed)
+  configs = [
+    ProcessingConfig(),
+    ProcessingConfig(min_aspect_ratio=None, max_aspect_ratio=None, low_iou_reject_threshold=0.3),
+    ProcessingConfig(iou_weight=0.0, conf_weight=1.0, low_iou_reject_patience=0),
+  ]
+  for _ in range(300):
+    detections = _random_detections(rng, rng.choice([0, 1, 5, 50]))
+    prev_bbox = rng.choice(
+      [None, detections[0].bbox if detections else None, BBox(0.4, 0.2, 0.2, 0.6)]
+    )
+    lost_count = rng.randint(0, 8)
+    array = detections_to_array(detections)
+    for cfg in configs:
+      expected = select_instructor_detection(detections, prev_bbox, lost_count, cfg)
+      index = select_instructor_index(array, prev_bbox, lost_count, cfg)
+      assert (detections[index] if index is not None else None) is expected
@@ -0,0 +1,157 @@
+import pickle
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.processing.cleaning import select_instructor, select_instructor_detection
+from app.processing.detectors import canonical_detector_name, create_detector
+from app.processing.detectors.onnx_yolo import decode_predictions, letterbox
+from app.processing.schemas import Detection, DetectionArrays, ProcessingConfig
+
+
+def _raw_prediction(boxes_cxcywh: list[tuple[float, float, float, float]], scores: list[float]):
+  """Build a YOLOv8-style (84, anchors) output with person scores in row 4."""
+  prediction = np.zeros((84, len(boxes_cxcywh)), dtype=np.float32)
+  for idx, (box, score) in enumerate(zip(boxes_cxcywh, scores)):
+    prediction[:4, idx] = box
+    prediction[4, idx] = score
+  return prediction
+
+
+def test_decode_undoes_letterbox_and_suppresses_duplicates() -> None:
+  frame = np.zeros((360, 640, 3), dtype=np.uint8)  # 16:9 -> padded top/bottom in 640x640
+  square, scale, pad_x, pad_y = letterbox(frame, 640)
+  assert square.shape == (640, 640, 3)
+  assert (scale, pad_x, pad_y) == (1.0, 0.0, 140.0)
+
+  prediction = _raw_prediction(
+    [(320.0, 320.0, 64.0, 180.0), (322.0, 321.0, 64.0, 180.0), (100.0, 300.0, 40.0, 80.0)],
+    [0.9, 0.8, 0.3],
+  )
+  detections = decode_predictions(
+    prediction, conf=0.25, iou=0.5, scale=scale, pad_x=pad_x, pad_y=pad_y, width=640, height=360
+  )
+
+  assert len(detections) == 2  # the 0.8 box overlaps the 0.9 box and is suppressed
+  best = detections[0]
+  assert best.conf == pytest.approx(0.9)
+  assert best.bbox.x == pytest.approx(288 / 640)
+  assert best.bbox.y == pytest.approx(90 / 360)
+  assert best.bbox.w == pytest.approx(64 / 640)
+  assert best.bbox.h == pytest.approx(180 / 360)
+
+
+def _save_fake_yolo() -> Path:
+  """Save an ONNX graph shaped like a dynamic-batch YOLOv8 export with one fixed box."""
+  onnx = pytest.importorskip("onnx")
+  pytest.importorskip("onnxruntime")
+  from onnx import TensorProto, helper
+
+  prediction = _raw_prediction([(320.0, 320.0, 64.0, 180.0)], [0.9])[None]
+  # output = prediction + 0 * sum(images): constant boxes, broadcast over a dynamic batch.
+  graph = helper.make_graph(
+    [
+      helper.make_node("ReduceSum", ["images", "image_axes"], ["total"], keepdims=1),
+      helper.make_node("Squeeze", ["total", "last_axis"], ["per_image"]),
+      helper.make_node("Mul", ["per_image", "zero"], ["zeros"]),
+      helper.make_node("Add", ["zeros", "prediction"], ["output0"]),
+    ],
+    "fake-yolo",
+    [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, 640, 640])],
+    [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 84, 1])],
+    initializer=[
+      helper.make_tensor("image_axes", TensorProto.INT64, [3], [1, 2, 3]),
+      helper.make_tensor("last_axis", TensorProto.INT64, [1], [3]),
+      helper.make_tensor("zero", TensorProto.FLOAT, [], [0.0]),
+      helper.make_tensor("prediction", TensorProto.FLOAT, prediction.shape, prediction.ravel()),
+    ],
+  )
+  model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+  model.ir_version = 8
+  model_dir = Path(__file__).resolve().parents[1] / "data" / "models"
+  model_dir.mkdir(parents=True, exist_ok=True)
+  model_path = model_dir / f"test-{uuid.uuid4().hex[:8]}.onnx"
+  onnx.save(model, str(model_path))
+  return model_path
+
+
+def test_onnx_detector_runs_exported_graph() -> None:
+  model_path = _save_fake_yolo()
+  try:
+    assert canonical_detector_name("onnxruntime") == "onnx"
+    detector = create_detector(
+      ProcessingConfig(detector_type="onnx", detector_model=str(model_path), detector_threads=1)
+    )
+    frames = [np.zeros((360, 640, 3), dtype=np.uint8), np.zeros((720, 1280, 3), dtype=np.uint8)]
+    batch = detector.detect_batch(frames)
+  finally:
+    model_path.unlink(missing_ok=True)
+
+  assert [len(detections) for detections in batch] == [1, 1]
+  for detections in batch:
+    # Normalized output is independent of the input resolution.
+    assert detections[0].bbox.x == pytest.approx(288 / 640)
+    assert detections[0].bbox.h == pytest.approx(0.5)
+  assert detector.model_source == "onnxruntime"
+
+
+def test_onnx_quantized_setting_builds_and_loads_int8_copy() -> None:
+  model_path = _save_fake_yolo()
+  pytest.importorskip("onnxruntime.quantization")
+  int8_path = model_path.with_name(f"{model_path.stem}.int8.onnx")
+  try:
+    cfg = ProcessingConfig(
+      detector_type="onnx",
+      detector_model=str(model_path),
+      detector_threads=1,
+      onnx_quantized=True,
+    )
+    detector = create_detector(cfg)
+    assert int8_path.is_file()
+    detections = detector.detect_frame(np.zeros((360, 640, 3), dtype=np.uint8))
+  finally:
+    model_path.unlink(missing_ok=True)
+    int8_path.unlink(missing_ok=True)
+
+  assert len(detections) == 1
+  assert detections[0].bbox.x == pytest.approx(288 / 640)
+
+
+def test_score_filter_is_strictly_above_conf() -> None:
+  prediction = _raw_prediction([(320.0, 320.0, 64.0, 180.0)], [0.25])
+  kwargs = dict(iou=0.5, scale=1.0, pad_x=0.0, pad_y=140.0, width=640, height=360)
+  assert len(decode_predictions(prediction, conf=0.25, **kwargs)) == 0
+  assert len(decode_predictions(prediction, conf=0.2, **kwargs)) == 1
+
+
+def test_detection_arrays_clip_normalize_and_adapt_lazily() -> None:
+  xyxy = np.array([[32, 60, 96, 240], [10, 10, 10, 50], [-20, 0, 40, 400]], dtype=np.float32)
+  detections = DetectionArrays.from_xyxy(
+    xyxy, np.array([0.9, 0.8, 0.7]), np.array([0, 0, 0]), width=320, height=240
+  )
+
+  assert len(detections) == 2  # the zero-width box is dropped
+  assert detections.xywh.dtype == np.float32 and detections.xywh.flags.c_contiguous
+  np.testing.assert_allclose(detections.xywh, [[0.1, 0.25, 0.2, 0.75], [0.0, 0.0, 0.125, 1.0]])
+  assert detections[1].bbox.w == pytest.approx(0.125)
+  assert [det.conf for det in detections] == pytest.approx([0.9, 0.7])
+  assert isinstance(detections[0], Detection)
+  assert pickle.loads(pickle.dumps(detections)).xywh.tolist() == detections.xywh.tolist()
+
+
+def test_columnar_selection_matches_list_selection() -> None:
+  rng = np.random.default_rng(0)
+  cfg = ProcessingConfig()
+  for _ in range(50):
+    count = int(rng.integers(16, 64))
+    xy = rng.uniform(0, 200, size=(count, 2))
+    wh = rng.uniform(5, 120, size=(count, 2))
+    xyxy = np.concatenate((xy, xy + wh), axis=1)
+    detections = DetectionArrays.from_xyxy(
+      xyxy, rng.uniform(0.3, 1.0, count), np.zeros(count), width=320, height=240
+    )
+    prev_bbox = detections[0].bbox
+    expected = select_instructor_detection(list(detections), prev_bbox, 0, cfg)
+    assert select_instructor(detections, prev_bbox, 0, cfg) == expected
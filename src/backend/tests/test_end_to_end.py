@@ -1,8 +1,14 @@
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
 
-from app.main import app
+from app import models, uploads
+from app.database import Base
+from app.main import app, get_db
 from app.config import settings
 
 
@@ -34,3 +40,393 @@ def test_import_and_list_sessions(tmp_path: Path, monkeypatch) -> None:
   sessions = sessions_resp.json()
   assert any(s["sessionId"] == payload["sessionId"] for s in sessions)
 
+
+
+
+@pytest.fixture
+def api_db(tmp_path: Path):
+  """Sessionmaker for a fresh database that the app's endpoints use."""
+  engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+  Base.metadata.create_all(bind=engine)
+  TestSession = sessionmaker(bind=engine)
+
+  def override_get_db():
+    db = TestSession()
+    try:
+      yield db
+    finally:
+      db.close()
+
+  app.dependency_overrides[get_db] = override_get_db
+  try:
+    yield TestSession
+  finally:
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_session_and_job_listing_pages_with_cursor(api_db) -> None:
+  db = api_db()
+  start = datetime(2025, 1, 1)
+  for i in range(5):
+    session = models.Session(
+      session_id=f"s{i}", created_at=start + timedelta(minutes=i), video_path="raw.mp4"
+    )
+    db.add(session)
+    db.flush()
+    for k, job_status in enumerate(("failed", "completed" if i % 2 else "running")):
+      db.add(
+        models.ProcessingJob(
+          job_id=f"j{i}-{k}",
+          session_id=session.id,
+          status=job_status,
+          created_at=start + timedelta(minutes=i, seconds=k),
+        )
+      )
+  db.commit()
+  db.close()
+
+  first = client.get("/sessions", params={"limit": 2})
+  assert first.status_code == 200
+  assert [s["sessionId"] for s in first.json()] == ["s4", "s3"]
+  # Each summary reflects the session's latest job.
+  assert [(s["relatedJobId"], s["status"]) for s in first.json()] == [
+    ("j4-1", "processing"),
+    ("j3-1", "completed"),
+  ]
+  seen = [s["sessionId"] for s in first.json()]
+  cursor = first.headers["x-next-cursor"]
+  while cursor:
+    page = client.get("/sessions", params={"limit": 2, "cursor": cursor})
+    seen += [s["sessionId"] for s in page.json()]
+    cursor = page.headers.get("x-next-cursor")
+  assert seen == ["s4", "s3", "s2", "s1", "s0"]
+
+  jobs = client.get("/jobs", params={"active": True, "limit": 2})
+  assert [j["id"] for j in jobs.json()] == ["j4-1", "j2-1"]
+  rest = client.get("/jobs", params={"active": True, "cursor": jobs.headers["x-next-cursor"]})
+  assert [j["id"] for j in rest.json()] == ["j0-1"]
+  assert "x-next-cursor" not in rest.headers
+
+  assert client.get("/jobs", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_loading_a_session_leaves_its_jobs_unloaded(api_db) -> None:
+  db = api_db()
+  session = models.Session(session_id="s1", video_path="raw.mp4")
+  db.add(session)
+  db.flush()
+  db.add_all(
+    models.ProcessingJob(job_id=f"j{k}", session_id=session.id, status="failed") for k in range(3)
+  )
+  db.commit()
+  db.close()
+
+  statements: list[str] = []
+  bind = api_db.kw["bind"]
+
+  def record(conn, cursor, statement, *args) -> None:
+    statements.append(statement)
+
+  db = api_db()
+  event.listen(bind, "before_cursor_execute", record)
+  try:
+    loaded = db.query(models.Session).one()
+    assert not any("processing_jobs" in statement for statement in statements)
+    assert len(loaded.jobs) == 3
+  finally:
+    event.remove(bind, "before_cursor_execute", record)
+    db.close()
+
+
+def test_only_result_payloads_use_orjson(api_db) -> None:
+  db = api_db()
+  # orjson would reject both the int key and the int wider than 64 bits.
+  session = models.Session(session_id="s1", video_path="raw.mp4", metadata_json={1: 2**70})
+  db.add(session)
+  db.flush()
+  db.add(models.InstructorTrackingResult(session_id=session.id, payload={"x": float("nan")}))
+  db.commit()
+  db.expire_all()
+  assert session.metadata_json == {"1": 2**70}
+  assert db.query(models.InstructorTrackingResult).one().payload == {"x": None}
+  db.close()
+
+
+def test_cancel_job_with_progress_deletes_it(api_db) -> None:
+  db = api_db()
+  session = models.Session(session_id="s1", video_path="raw.mp4", status="processing")
+  db.add(session)
+  db.flush()
+  job = models.ProcessingJob(job_id="j1", session_id=session.id, status="running")
+  job.live_progress = models.JobProgress(frames_processed=10, frame_count=100)
+  db.add(job)
+  db.commit()
+  db.close()
+
+  assert client.delete("/jobs/j1").status_code == 204
+  db = api_db()
+  assert db.query(models.ProcessingJob).count() == 0
+  assert db.query(models.JobProgress).count() == 0
+  db.close()
+
+
+def test_session_detail_reads_tracking_summary_not_payload(api_db) -> None:
+  db = api_db()
+  session = models.Session(session_id="s1", video_path="raw.mp4")
+  db.add(session)
+  db.flush()
+  result = models.InstructorTrackingResult(
+    session_id=session.id, payload={"trackPoints": [{"tMs": 0}] * 1000}
+  )
+  result.summary = models.TrackingResultSummary(
+    version="v1",
+    frame_count=1000,
+    point_count=1000,
+    byte_size=12345,
+    derived_metrics={"coverage": 1.0},
+  )
+  db.add(result)
+  db.commit()
+  db.close()
+
+  statements: list[str] = []
+  bind = api_db.kw["bind"]
+
+  def record(conn, cursor, statement, *args) -> None:
+    statements.append(statement)
+
+  event.listen(bind, "before_cursor_execute", record)
+  try:
+    detail = client.get("/sessions/s1").json()
+    client.get("/sessions")
+  finally:
+    event.remove(bind, "before_cursor_execute", record)
+  assert detail["hasInstructorTrackingResult"] is True
+  assert detail["trackingSummary"]["pointCount"] == 1000
+  assert detail["trackingSummary"]["derivedMetrics"] == {"coverage": 1.0}
+  assert not any("payload" in statement for statement in statements)
+
+
+def test_resumable_upload_creates_session(api_db, tmp_path: Path, monkeypatch) -> None:
+  import hashlib
+
+  from app import main
+
+  monkeypatch.setattr(main, "_SESSION_VIDEO_ROOT", tmp_path / "sessions")
+  monkeypatch.setattr(main, "_UPLOAD_ROOT", tmp_path / "uploads")
+  monkeypatch.setattr(main, "_BLOB_ROOT", tmp_path / "blobs")
+  video = bytes(range(256)) * 40
+
+  created = client.post(
+    "/uploads",
+    json={"filename": "lecture.mp4", "size": len(video), "metadata": {"sessionName": "L1"}},
+  )
+  assert created.status_code == 201
+  upload_id = created.json()["uploadId"]
+  assert created.json()["offset"] == 0
+
+  first = client.put(f"/uploads/{upload_id}", params={"offset": 0}, content=video[:4000])
+  assert first.json()["offset"] == 4000
+  # A retried chunk whose first attempt did land is rejected; the client resyncs.
+  retried = client.put(f"/uploads/{upload_id}", params={"offset": 0}, content=video[:4000])
+  assert retried.status_code == 409
+  offset = client.get(f"/uploads/{upload_id}").json()["offset"]
+  assert offset == 4000
+  too_big = client.put(f"/uploads/{upload_id}", params={"offset": offset}, content=video)
+  assert too_big.status_code == 413
+  assert client.post(f"/uploads/{upload_id}/complete").status_code == 409
+
+  rest = client.put(f"/uploads/{upload_id}", params={"offset": offset}, content=video[offset:])
+  assert rest.json()["offset"] == len(video)
+  completed = client.post(
+    f"/uploads/{upload_id}/complete", json={"sha256": hashlib.sha256(video).hexdigest()}
+  )
+  assert completed.status_code == 201, completed.text
+  session_id = completed.json()["sessionId"]
+  assert (tmp_path / "sessions" / session_id / "raw.mp4").read_bytes() == video
+  assert not (tmp_path / "uploads" / upload_id).exists()
+  assert client.get(f"/uploads/{upload_id}").status_code == 404
+
+  db = api_db()
+  session = db.query(models.Session).filter(models.Session.session_id == session_id).one()
+  assert session.name == "L1"
+  assert session.metadata_json["videoSha256"] == hashlib.sha256(video).hexdigest()
+  db.close()
+
+
+def test_concurrent_chunks_at_one_offset_append_once(api_db, tmp_path: Path, monkeypatch) -> None:
+  import asyncio
+  import hashlib
+
+  import httpx
+
+  from app import main
+
+  monkeypatch.setattr(main, "_SESSION_VIDEO_ROOT", tmp_path / "sessions")
+  monkeypatch.setattr(main, "_UPLOAD_ROOT", tmp_path / "uploads")
+  monkeypatch.setattr(main, "_BLOB_ROOT", tmp_path / "blobs")
+  video = bytes(range(256)) * 16
+  upload_id = client.post("/uploads", json={"filename": "a.mp4", "size": len(video)}).json()[
+    "uploadId"
+  ]
+
+  async def slow_body():
+    yield video[:1000]
+    await asyncio.sleep(0.2)
+    yield video[1000:]
+
+  async def race() -> list[int]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+      url = f"/uploads/{upload_id}?offset=0"
+      slow = asyncio.create_task(api.put(url, content=slow_body()))
+      await asyncio.sleep(0.05)
+      retry = await api.put(url, content=video)
+      return [(await slow).status_code, retry.status_code]
+
+  assert asyncio.run(race()) == [200, 409]
+  completed = client.post(
+    f"/uploads/{upload_id}/complete", json={"sha256": hashlib.sha256(video).hexdigest()}
+  )
+  assert completed.status_code == 201, completed.text
+  session_id = completed.json()["sessionId"]
+  assert (tmp_path / "sessions" / session_id / "raw.mp4").read_bytes() == video
+
+
+@pytest.mark.skipif(uploads.fcntl is None, reason="needs fcntl")
+def test_chunk_waits_for_another_process_lock(api_db, tmp_path: Path, monkeypatch) -> None:
+  import fcntl
+  import hashlib
+  import threading
+
+  from app import main
+
+  monkeypatch.setattr(main, "_SESSION_VIDEO_ROOT", tmp_path / "sessions")
+  monkeypatch.setattr(main, "_UPLOAD_ROOT", tmp_path / "uploads")
+  monkeypatch.setattr(main, "_BLOB_ROOT", tmp_path / "blobs")
+  video = bytes(range(256)) * 16
+  upload_id = client.post("/uploads", json={"filename": "a.mp4", "size": len(video)}).json()[
+    "uploadId"
+  ]
+  data_path = tmp_path / "uploads" / upload_id / uploads.UPLOAD_DATA
+
+  # Another API worker holds the lock and appends the first chunk.
+  other = data_path.open("ab")
+  fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+  responses = []
+  put = threading.Thread(
+    target=lambda: responses.append(
+      client.put(f"/uploads/{upload_id}", params={"offset": 0}, content=video[:1000])
+    )
+  )
+  put.start()
+  put.join(0.2)
+  assert put.is_alive()
+  other.write(video[:1000])
+  other.close()
+  put.join(5)
+  assert responses[0].status_code == 409
+
+  rest = client.put(f"/uploads/{upload_id}", params={"offset": 1000}, content=video[1000:])
+  assert rest.json()["offset"] == len(video)
+  completed = client.post(
+    f"/uploads/{upload_id}/complete", json={"sha256": hashlib.sha256(video).hexdigest()}
+  )
+  assert completed.status_code == 201, completed.text
+  assert client.put(f"/uploads/{upload_id}", params={"offset": 0}, content=b"x").status_code == 404
+
+
+def test_idle_upload_states_are_dropped() -> None:
+  stale = uploads.upload_state("stale")
+  stale.used_at -= uploads.STATE_IDLE_SECONDS + 1
+  uploads.upload_state("fresh")
+  assert "stale" not in uploads._states
+  assert "fresh" in uploads._states
+  uploads.forget("fresh")
+
+
+def test_duplicate_upload_shares_video_and_reuses_result(
+  api_db, tmp_path: Path, monkeypatch
+) -> None:
+  import hashlib
+
+  from app import main, results_files
+  from app.processing.detection_cache import result_config_sha256
+  from app.worker import processing_config
+
+  monkeypatch.setattr(main, "_SESSION_VIDEO_ROOT", tmp_path / "sessions")
+  monkeypatch.setattr(main, "_BLOB_ROOT", tmp_path / "blobs")
+  video = b"lecture" * 1000
+  sha256 = hashlib.sha256(video).hexdigest()
+  blob = tmp_path / "blobs" / sha256[:2] / sha256
+
+  first = client.post("/sessions/import", files={"video": ("a.mp4", video, "video/mp4")})
+  first_id = first.json()["sessionId"]
+  first_video = tmp_path / "sessions" / first_id / "raw.mp4"
+  assert first_video.samefile(blob)
+
+  # What the worker leaves behind for the first upload.
+  payload = {
+    "coordinateSystem": "normalized",
+    "video": {"width": 640, "height": 360, "fps": 25.0},
+    "processingMeta": {"detector": "yolov8n", "tracker": "single-target-iou"},
+    "frameDetections": [{"tMs": 0, "bbox": None, "conf": None, "carried": False}],
+    "trackPoints": [{"tMs": 0, "trackId": 1, "cx": 0.5, "cy": 0.5, "quality": "measured"}],
+    "derivedMetrics": {"coverage": 1.0},
+  }
+  results_dir = first_video.parent / "results"
+  results_dir.mkdir()
+  results_files.write_payload_file(results_dir, payload)
+  response_path = results_files.publish_results(results_dir, payload=payload)
+  db = api_db()
+  session = db.query(models.Session).filter(models.Session.session_id == first_id).one()
+  session.status = "completed"
+  session.video_width, session.video_height, session.fps = 640, 360, 25.0
+  result = models.InstructorTrackingResult(session_id=session.id, payload=payload)
+  result.summary = models.TrackingResultSummary(
+    version="v1",
+    frame_count=1,
+    point_count=1,
+    byte_size=response_path.stat().st_size,
+    derived_metrics=payload["derivedMetrics"],
+  )
+  result.fingerprint = models.ResultFingerprint(
+    video_sha256=sha256, config_sha256=result_config_sha256(processing_config())
+  )
+  db.add(result)
+  db.commit()
+  db.close()
+
+  second = client.post("/sessions/import", files={"video": ("b.mp4", video, "video/mp4")})
+  second_id = second.json()["sessionId"]
+  second_dir = tmp_path / "sessions" / second_id
+  assert (second_dir / "raw.mp4").samefile(first_video)
+  assert (second_dir / "results" / results_files.TRACKING_RESPONSE).samefile(response_path)
+  job = client.get(f"/jobs/{second.json()['jobId']}").json()
+  assert job["status"] == "completed"
+  detail = client.get(f"/sessions/{second_id}").json()
+  assert detail["processing"]["status"] == "completed"
+  assert detail["trackingSummary"]["pointCount"] == 1
+  db = api_db()
+  reused = (
+    db.query(models.InstructorTrackingResult)
+    .join(models.Session)
+    .filter(models.Session.session_id == second_id)
+    .one()
+  )
+  # Points live in the shared files; the DB copy is only the header.
+  assert "trackPoints" not in reused.payload
+  assert reused.payload["resultsFile"] == results_files.TRACKING_JSON
+  db.close()
+
+  client.delete(f"/sessions/{first_id}")
+  assert blob.is_file()  # still the second session's video
+  tracking = client.get(f"/sessions/{second_id}/results/instructor-tracking")
+  assert tracking.json()["data"]["trackPoints"] == payload["trackPoints"]
+  windowed = client.get(
+    f"/sessions/{second_id}/results/instructor-tracking", params={"fromMs": 0, "toMs": 50}
+  )
+  assert windowed.json()["data"]["trackPoints"] == payload["trackPoints"]
+
+  client.delete(f"/sessions/{second_id}")
+  assert not blob.exists()
@@ -0,0 +1,383 @@
+import json
+import shutil
+from dataclasses import replace
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from app.processing import parallel, pipeline
+from app.processing.detectors import Detector
+from app.processing.schemas import BBox, Detection, PipelineProgress, ProcessingConfig, VideoMeta
+from app.processing.sweep import run_sweep
+from app.processing.tracking_binary import TrackingBinary
+
+
+WIDTH = 320
+HEIGHT = 240
+FPS = 30.0
+
+
+class _BrightColumnDetector(Detector):
+  """Reports the bright vertical bar drawn by `_write_video` as a person box."""
+
+  def detect_frame(self, image: np.ndarray) -> list[Detection]:
+    columns = np.flatnonzero(image[:, :, 0].max(axis=0) > 127)
+    if columns.size == 0:
+      return []
+    height, width = image.shape[:2]
+    x1 = float(columns[0])
+    x2 = float(columns[-1] + 1)
+    return [
+      Detection(
+        bbox=BBox(x=x1 / width, y=0.25, w=(x2 - x1) / width, h=0.5),
+        conf=0.9,
+        cls=0,
+      )
+    ]
+
+
+def _write_video(path: Path, frame_count: int) -> VideoMeta:
+  writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, (WIDTH, HEIGHT))
+  for idx in range(frame_count):
+    frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    # Bar drifts right, disappearing for a short stretch to exercise gap handling.
+    if not 40 <= idx < 46:
+      x = (idx * 2) % (WIDTH - 40)
+      frame[:, x : x + 40] = 255
+    writer.write(frame)
+  writer.release()
+  return VideoMeta(width=WIDTH, height=HEIGHT, fps=FPS, frame_count=frame_count)
+
+
+@pytest.fixture
+def sample_video(tmp_path: Path) -> tuple[Path, VideoMeta]:
+  path = tmp_path / "raw.avi"
+  return path, _write_video(path, frame_count=90)
+
+
+@pytest.fixture(autouse=True)
+def fake_detector(monkeypatch) -> None:
+  monkeypatch.setattr(pipeline, "create_detector", lambda config: _BrightColumnDetector())
+  # Segment workers are forked, so they inherit this patch.
+  monkeypatch.setattr(parallel, "create_detector", lambda config: _BrightColumnDetector())
+
+
+def _run(sample_video, **overrides):
+  path, meta = sample_video
+  cfg = ProcessingConfig(process_fps=10.0, min_conf=0.4, max_gap_frames=5, **overrides)
+  return pipeline.run_pipeline(video_path=path, video_meta=meta, config=cfg)
+
+
+def test_grab_decode_matches_full_read(sample_video) -> None:
+  grab_payload, grab_diag = _run(sample_video, decode_mode="grab")
+  read_payload, read_diag = _run(sample_video, decode_mode="read")
+
+  assert grab_payload == read_payload
+  assert grab_diag["processedFrames"] == 30
+  assert grab_diag["totalFramesRead"] == 90
+  assert grab_diag["decodedFrames"] == 30
+  assert read_diag["decodedFrames"] == 90
+  assert grab_diag["decodeFps"] > 0.0
+
+
+def test_prefetch_matches_inline_decode(sample_video) -> None:
+  prefetched, diagnostics = _run(sample_video, prefetch_frames=4)
+  inline, _ = _run(sample_video, prefetch_frames=0)
+
+  assert prefetched == inline
+  assert diagnostics["prefetchCapacity"] == 4
+  assert 0 <= diagnostics["prefetchMaxQueueDepth"] <= 4
+
+
+def test_batched_detection_keeps_frame_order(sample_video) -> None:
+  batched, diagnostics = _run(sample_video, detector_batch_size=7)
+  single, _ = _run(sample_video, detector_batch_size=1)
+
+  assert batched == single
+  # 30 sampled frames in batches of 7 -> 5 detector calls.
+  assert diagnostics["detectorCalls"] == 5
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_ffmpeg_source_normalizes_against_original_size(sample_video) -> None:
+  ffmpeg_payload, diagnostics = _run(
+    sample_video, frame_source="ffmpeg", frame_source_long_side=160
+  )
+  opencv_payload, _ = _run(sample_video, frame_source="opencv")
+
+  assert diagnostics["decodeMode"] == "ffmpeg-rawvideo"
+  assert diagnostics["decodedFrames"] == 30
+  assert ffmpeg_payload["video"] == opencv_payload["video"]
+  ffmpeg_points = ffmpeg_payload["trackPoints"]
+  opencv_points = opencv_payload["trackPoints"]
+  assert [p["tMs"] for p in ffmpeg_points] == [p["tMs"] for p in opencv_points]
+  assert [p["quality"] for p in ffmpeg_points] == [p["quality"] for p in opencv_points]
+  for ffmpeg_point, opencv_point in zip(ffmpeg_points, opencv_points):
+    # Half-resolution decode: box edges are accurate to about one scaled pixel.
+    assert ffmpeg_point["cx"] == pytest.approx(opencv_point["cx"], abs=2.0 / 160)
+
+
+def test_parallel_segments_match_serial(tmp_path: Path) -> None:
+  path = tmp_path / "long.avi"
+  meta = _write_video(path, frame_count=300)
+  cfg = ProcessingConfig(process_fps=10.0, prefetch_frames=0)
+
+  serial, _ = pipeline.run_pipeline(path, meta, cfg)
+  cfg.parallel_workers = 3
+  parallel, diagnostics = pipeline.run_pipeline(path, meta, cfg)
+
+  assert parallel == serial
+  assert [s["startFrame"] for s in diagnostics["parallelSegments"]] == [0, 102, 201]
+  assert diagnostics["processedFrames"] == 100
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_parallel_ffmpeg_segments_count_only_their_own_frames(tmp_path: Path) -> None:
+  path = tmp_path / "long.avi"
+  meta = _write_video(path, frame_count=300)
+  cfg = ProcessingConfig(process_fps=10.0, prefetch_frames=0, frame_source="ffmpeg")
+  cfg.parallel_workers = 3
+
+  _, diagnostics = pipeline.run_pipeline(path, meta, cfg)
+
+  # Each segment reads from its own start frame, so together they read the video once.
+  assert 290 <= diagnostics["totalFramesRead"] <= 300
+
+
+def _write_static_video(path: Path, frame_count: int = 90) -> VideoMeta:
+  writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, (WIDTH, HEIGHT))
+  for idx in range(frame_count):
+    frame = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    x = 40 if idx < 45 else 60  # instructor steps aside once, otherwise still
+    frame[:, x : x + 40] = 255
+    writer.write(frame)
+  writer.release()
+  return VideoMeta(width=WIDTH, height=HEIGHT, fps=FPS, frame_count=frame_count)
+
+
+def test_parallel_segments_restart_the_motion_gate(tmp_path: Path) -> None:
+  path = tmp_path / "static.avi"
+  meta = _write_static_video(path, frame_count=300)
+  cfg = ProcessingConfig(
+    process_fps=10.0, prefetch_frames=0, motion_gate_threshold=0.02, motion_gate_max_skip=5
+  )
+
+  serial, serial_diag = pipeline.run_pipeline(path, meta, cfg)
+  cfg.parallel_workers = 3
+  parallel_run, diagnostics = pipeline.run_pipeline(path, meta, cfg)
+
+  segments = diagnostics["parallelSegments"]
+  stride = 3
+  starts = [segment["startFrame"] // stride for segment in segments]
+  assert starts == [0, 34, 67]
+  frames = parallel_run["frameDetections"]
+  # Not identical to serial: every segment detects its first frame and restarts the cadence.
+  assert all(not frames[start]["carried"] for start in starts)
+  assert serial["frameDetections"][34]["carried"]
+  assert [f["carried"] for f in frames] != [f["carried"] for f in serial["frameDetections"]]
+  skipped_delta = serial_diag["skippedDetections"] - diagnostics["skippedDetections"]
+  assert 0 <= skipped_delta <= len(segments) - 1
+  # In a static scene the carried boxes are the same, so the tracks still match.
+  assert parallel_run["trackPoints"] == serial["trackPoints"]
+
+
+def test_motion_gate_skips_static_frames(tmp_path: Path) -> None:
+  path = tmp_path / "static.avi"
+  meta = _write_static_video(path)
+  cfg = ProcessingConfig(
+    process_fps=10.0,
+    detector_batch_size=4,
+    motion_gate_threshold=0.02,
+    motion_gate_max_skip=5,
+  )
+
+  payload, diagnostics = pipeline.run_pipeline(path, meta, cfg)
+
+  frames = payload["frameDetections"]
+  carried = [frame["carried"] for frame in frames]
+  # 30 sampled frames; re-detect forced every 6th frame and on the step at frame 45 (sample 15).
+  assert diagnostics["skippedDetections"] == sum(carried) == diagnostics["carriedFrames"]
+  assert not carried[0] and not carried[15]
+  assert max(len(run) for run in "".join("c" if c else "." for c in carried).split(".")) <= 5
+  assert frames[14]["bbox"]["x"] == pytest.approx(40 / WIDTH, abs=0.01)
+  assert frames[15]["bbox"]["x"] == pytest.approx(60 / WIDTH, abs=0.01)
+  assert all(point["quality"] == "measured" for point in payload["trackPoints"])
+
+
+def test_roi_inference_maps_crops_back_to_full_frame(sample_video, monkeypatch) -> None:
+  crop_shapes: list[tuple[int, int]] = []
+
+  class _RecordingDetector(_BrightColumnDetector):
+    def detect_frame(self, image: np.ndarray) -> list[Detection]:
+      crop_shapes.append(image.shape[:2])
+      return super().detect_frame(image)
+
+  monkeypatch.setattr(pipeline, "create_detector", lambda config: _RecordingDetector())
+  full, _ = _run(sample_video)
+  crop_shapes.clear()
+  roi, diagnostics = _run(sample_video, roi_inference=True, roi_refresh_interval=10)
+
+  assert diagnostics["roiDetections"] > 0
+  assert any(shape != (HEIGHT, WIDTH) for shape in crop_shapes)
+  assert [p["quality"] for p in roi["trackPoints"]] == [p["quality"] for p in full["trackPoints"]]
+  for roi_frame, full_frame in zip(roi["frameDetections"], full["frameDetections"]):
+    if full_frame["bbox"] is None:
+      continue
+    # The bar spans the full frame height, so only x/w are comparable across crops.
+    assert roi_frame["bbox"]["x"] == pytest.approx(full_frame["bbox"]["x"], abs=1e-9)
+    assert roi_frame["bbox"]["w"] == pytest.approx(full_frame["bbox"]["w"], abs=1e-9)
+
+
+def test_adaptive_sampling_slows_down_on_static_instructor(tmp_path: Path) -> None:
+  path = tmp_path / "static.avi"
+  meta = _write_static_video(path)
+  cfg = ProcessingConfig(process_fps=10.0, adaptive_sampling=True, adaptive_max_multiplier=4)
+
+  payload, diagnostics = pipeline.run_pipeline(path, meta, cfg)
+
+  times = [point["tMs"] for point in payload["trackPoints"]]
+  assert diagnostics["adaptiveSkippedFrames"] > 0
+  assert diagnostics["processedFrames"] + diagnostics["adaptiveSkippedFrames"] == 30
+  assert max(b - a for a, b in zip(times, times[1:])) == 400  # 4 x 100 ms samples
+  assert payload["derivedMetrics"]["coverage"] == pytest.approx(1.0)
+
+
+def test_detection_cache_replays_without_decoding(
+  sample_video, tmp_path: Path, monkeypatch
+) -> None:
+  path, meta = sample_video
+  cache_path = tmp_path / "results" / "raw-detections.npz"
+  cfg = ProcessingConfig(process_fps=10.0, motion_gate_threshold=0.001)
+  first, first_diag = pipeline.run_pipeline(path, meta, config=cfg, cache_path=cache_path)
+  assert first_diag["detectionCache"] == "miss"
+  assert cache_path.is_file()
+
+  def _no_detector(config):
+    raise AssertionError("detector should not run on a cache hit")
+
+  monkeypatch.setattr(pipeline, "create_detector", _no_detector)
+  # Cleaning/tracking settings are not part of the key.
+  second, second_diag = pipeline.run_pipeline(
+    path, meta, config=replace(cfg, max_gap_frames=2), cache_path=cache_path
+  )
+  assert second_diag["detectionCache"] == "hit"
+  assert second_diag["decodedFrames"] == 0
+  assert second["frameDetections"] == first["frameDetections"]
+
+  # Detector settings are.
+  monkeypatch.setattr(pipeline, "create_detector", lambda config: _BrightColumnDetector())
+  _, third_diag = pipeline.run_pipeline(
+    path, meta, config=replace(cfg, min_conf=0.5), cache_path=cache_path
+  )
+  assert third_diag["detectionCache"] == "miss"
+
+
+def test_progress_reports_frames_against_frame_count(sample_video) -> None:
+  path, meta = sample_video
+  reports = []
+  pipeline.run_pipeline(
+    path, meta, config=ProcessingConfig(process_fps=10.0), on_progress=reports.append
+  )
+  done = [report.frames_done for report in reports]
+  assert len(reports) == 31  # 30 sampled frames, then a final report
+  assert done == sorted(done) and done[-1] == meta.frame_count
+  assert reports[-1].fraction == 1.0 and reports[-1].eta_seconds == 0.0
+  assert reports[0].eta_seconds > 0.0 and reports[0].frames_per_second > 0.0
+
+
+@pytest.mark.parametrize("coordinate_system", ["normalized", "pixels"])
+def test_streamed_output_matches_in_memory_payload(
+  sample_video, tmp_path: Path, coordinate_system: str
+) -> None:
+  path, meta = sample_video
+  cfg = ProcessingConfig(
+    process_fps=10.0, coordinate_system=coordinate_system, stream_chunk_size=4
+  )
+  expected, expected_diag = pipeline.run_pipeline(path, meta, config=cfg)
+  output_path = tmp_path / "results" / "instructor-tracking.json"
+  binary_path = tmp_path / "results" / "instructor-tracking.bin"
+  summary, diagnostics = pipeline.run_pipeline(
+    path, meta, config=cfg, output_path=output_path, binary_output_path=binary_path
+  )
+
+  streamed = json.loads(output_path.read_text(encoding="utf-8"))
+  # The binary form is spooled alongside, never by re-reading the JSON.
+  assert TrackingBinary.open(binary_path).to_payload() == streamed
+  assert summary["resultsFile"] == output_path.name
+  assert "trackPoints" not in summary
+  assert summary["frameCount"] == len(expected["frameDetections"])
+  assert summary["pointCount"] == len(expected["trackPoints"])
+  assert diagnostics["interpolatedFrames"] == expected_diag["interpolatedFrames"] > 0
+  assert streamed["derivedMetrics"].pop("jitter") == pytest.approx(
+    expected["derivedMetrics"].pop("jitter")
+  )
+  assert streamed == expected
+  assert sorted(p.name for p in output_path.parent.iterdir()) == [
+    binary_path.name,
+    output_path.name,
+  ]
+
+
+def test_failed_run_resumes_from_checkpoint(sample_video, tmp_path: Path, monkeypatch) -> None:
+  path, meta = sample_video
+  cfg = ProcessingConfig(process_fps=10.0, detector_batch_size=4, prefetch_frames=0)
+  expected, _ = pipeline.run_pipeline(path, meta, config=cfg)
+  checkpoint_dir = tmp_path / "results" / "checkpoint"
+
+  class _CrashingDetector(_BrightColumnDetector):
+    calls = 0
+
+    def detect_batch(self, images):
+      if self.calls == 3:
+        raise RuntimeError("worker killed")
+      self.calls += 1
+      return super().detect_batch(images)
+
+  crashing = _CrashingDetector()
+  monkeypatch.setattr(pipeline, "create_detector", lambda config: crashing)
+  with pytest.raises(RuntimeError, match="worker killed"):
+    pipeline.run_pipeline(path, meta, config=cfg, checkpoint_dir=checkpoint_dir)
+  assert (checkpoint_dir / "checkpoint.json").is_file()
+
+  monkeypatch.setattr(pipeline, "create_detector", lambda config: _BrightColumnDetector())
+  reports = []
+  payload, diagnostics = pipeline.run_pipeline(
+    path, meta, config=cfg, checkpoint_dir=checkpoint_dir, on_progress=reports.append
+  )
+  assert diagnostics["resumedFromFrame"] == 36  # 12 frames checkpointed, stride 3
+  # Replayed frames count towards progress but not towards the rate.
+  assert [report.frames_replayed for report in reports[:2]] == [1, 4]
+  assert reports[-1].frames_replayed == 36
+  resumed = PipelineProgress(60, 90, 1.0, frames_replayed=36)
+  assert resumed.frames_per_second == 24.0 and resumed.eta_seconds == 1.25
+  assert diagnostics["detectorCalls"] == 5
+  assert payload["frameDetections"] == expected["frameDetections"]
+  assert payload["trackPoints"] == expected["trackPoints"]
+  assert not checkpoint_dir.exists()
+
+
+def test_sweep_matches_separate_runs(sample_video, tmp_path: Path) -> None:
+  path, meta = sample_video
+  base = ProcessingConfig(process_fps=10.0, prefetch_frames=0)
+  variants = [
+    {"min_conf": 0.4, "max_gap_frames": 0},
+    {"min_conf": 0.95},
+    {"min_conf": 0.4, "max_gap_frames": 8, "iou_weight": 0.5},
+  ]
+  outcome = run_sweep(
+    path, meta, base, variants, cache_path=tmp_path / "raw-detections.npz", workers=2
+  )
+
+  assert outcome["diagnostics"]["detectionMinConf"] == 0.4
+  assert [row["rank"] for row in outcome["results"]] == [1, 2, 3]
+  for row in outcome["results"]:
+    payload, _ = pipeline.run_pipeline(path, meta, config=replace(base, **row["params"]))
+    for name, value in payload["derivedMetrics"].items():
+      assert row[name] == pytest.approx(value)
+  coverages = [row["coverage"] for row in outcome["results"]]
+  assert coverages == sorted(coverages, reverse=True)
+
+  with pytest.raises(ValueError, match="detector_imgsz"):
+    run_sweep(path, meta, base, [{"detector_imgsz": 320}], cache_path=tmp_path / "x.npz")
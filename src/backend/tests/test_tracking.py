@@ -0,0 +1,142 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.processing.metrics import compute_derived_metrics
+from app.processing.schemas import TrackArrays, TrackPoint
+from app.processing.streaming import OnlineTrackMetrics, StreamingInterpolator
+from app.processing.tracking import interpolate_short_gaps, interpolate_track
+
+
+def _point(t_ms: int, cx: float, quality: str = "measured") -> TrackPoint:
+  return TrackPoint(t_ms=t_ms, track_id=1, cx=cx, cy=0.5, quality=quality)  # type: ignore[arg-type]
+
+
+def test_interpolation_by_time_handles_uneven_spacing() -> None:
+  points = [
+    _point(0, 0.0),
+    _point(100, 0.0, "lost"),
+    _point(400, 0.0, "lost"),
+    _point(500, 1.0),
+  ]
+
+  by_index = interpolate_short_gaps(points, max_gap_frames=5)
+  by_time = interpolate_short_gaps(points, max_gap_frames=5, max_gap_ms=600)
+
+  assert [p.cx for p in by_index] == pytest.approx([0.0, 1 / 3, 2 / 3, 1.0])
+  assert [p.cx for p in by_time] == pytest.approx([0.0, 0.2, 0.8, 1.0])
+  assert interpolate_short_gaps(points, max_gap_frames=5, max_gap_ms=400)[1].quality == "lost"
+
+
+def test_time_weighted_coverage() -> None:
+  points = [_point(0, 0.1), _point(400, 0.1, "lost"), _point(500, 0.1), _point(600, 0.1)]
+
+  assert compute_derived_metrics(points)["coverage"] == pytest.approx(0.75)
+  # The first point stands for 400 ms, the lost one for 100 ms, the last two for 100 ms each.
+  weighted = compute_derived_metrics(points, nominal_interval_ms=100.0)
+  assert weighted["coverage"] == pytest.approx(600 / 700)
+
+
+def _reference_interpolate(points: list[TrackPoint], max_gap_frames: int) -> list[tuple]:
+  """Point-by-point loop the vectorized interpolation replaced."""
+  rows = [(p.t_ms, p.cx, p.cy, p.quality) for p in points]
+  idx = 0
+  while idx < len(rows):
+    if rows[idx][3] != "lost":
+      idx += 1
+      continue
+    start, end = idx - 1, idx
+    while end < len(rows) and rows[end][3] == "lost":
+      end += 1
+    if (
+      start >= 0
+      and end < len(rows)
+      and rows[start][3] == rows[end][3] == "measured"
+      and end - idx <= max_gap_frames
+    ):
+      for offset, pos in enumerate(range(start + 1, end), start=1):
+        alpha = offset / float(end - start)
+        cx = rows[start][1] + ((rows[end][1] - rows[start][1]) * alpha)
+        cy = rows[start][2] + ((rows[end][2] - rows[start][2]) * alpha)
+        rows[pos] = (rows[pos][0], cx, cy, "interpolated")
+    idx = end
+  return rows
+
+
+def _reference_distance_and_jitter(points: list[TrackPoint]) -> tuple[float, float]:
+  valid = [p for p in points if p.quality != "lost"]
+  distance = 0.0
+  steps = []
+  for prev, point in zip(valid, valid[1:]):
+    dx, dy = point.cx - prev.cx, point.cy - prev.cy
+    steps.append(math.sqrt((dx * dx) + (dy * dy)))
+    distance += steps[-1]
+  return distance, float(np.std(steps)) if steps else 0.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_track_math_matches_scalar_loops(seed: int) -> None:
+  rng = random.Random(seed)
+  for _ in range(200):
+    points = [
+      TrackPoint(
+        t_ms=idx * 100,
+        track_id=1,
+        cx=rng.random(),
+        cy=rng.random(),
+        quality=rng.choice(["measured", "measured", "lost"]),  # type: ignore[arg-type]
+      )
+      for idx in range(rng.randint(0, 40))
+    ]
+    max_gap_frames = rng.choice([1, 3, 5])
+    filled = interpolate_short_gaps(points, max_gap_frames=max_gap_frames)
+    track = interpolate_track(TrackArrays.from_points(points), max_gap_frames=max_gap_frames)
+    if len(points) >= 3:
+      # Exact equality: the vectorized code must not change a single bit.
+      assert [(p.t_ms, p.cx, p.cy, p.quality) for p in filled] == _reference_interpolate(
+        points, max_gap_frames
+      )
+    assert compute_derived_metrics(track) == compute_derived_metrics(filled)
+    distance, jitter = _reference_distance_and_jitter(filled)
+    metrics = compute_derived_metrics(filled)
+    assert (metrics["distance"], metrics["jitter"]) == (distance, jitter)
+
+
+@pytest.mark.parametrize("max_gap_ms", [None, 450])
+def test_streaming_interpolation_and_metrics_match_batch(max_gap_ms) -> None:
+  rng = random.Random(7)
+  for _ in range(300):
+    t_ms = 0
+    points = []
+    for _ in range(rng.randint(0, 40)):
+      t_ms += rng.choice([100, 100, 200, 300])
+      points.append(
+        TrackPoint(
+          t_ms=t_ms,
+          track_id=1,
+          cx=rng.random(),
+          cy=rng.random(),
+          quality=rng.choice(["measured", "measured", "lost"]),  # type: ignore[arg-type]
+        )
+      )
+    max_gap_frames = rng.choice([1, 3, 5])
+    nominal = 100.0 if max_gap_ms is not None else None
+    interpolator = StreamingInterpolator(max_gap_frames, max_gap_ms=max_gap_ms)
+    online = OnlineTrackMetrics(nominal_interval_ms=nominal)
+    streamed = []
+    for point in points:
+      streamed.extend(interpolator.push(point))
+    streamed.extend(interpolator.finish())
+    for point in streamed:
+      online.add(point)
+
+    track = interpolate_track(
+      TrackArrays.from_points(points), max_gap_frames=max_gap_frames, max_gap_ms=max_gap_ms
+    )
+    assert TrackArrays.from_points(streamed).to_points() == track.to_points()
+    batch = compute_derived_metrics(track, nominal_interval_ms=nominal)
+    result = online.result()
+    assert result["jitter"] == pytest.approx(batch.pop("jitter"), abs=1e-12)
+    assert {name: value for name, value in result.items() if name != "jitter"} == batch
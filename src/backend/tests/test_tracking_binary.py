@@ -0,0 +1,161 @@
+import gzip
+import json
+from pathlib import Path
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import http_cache
+from app.processing.tracking_binary import (
+  MAGIC,
+  TrackingBinary,
+  payload_columns,
+  write_tracking_binary,
+)
+from app.processing.windowing import lttb_indices, window_columns
+from app.results_files import TRACKING_BINARY, TRACKING_RESPONSE, publish_results
+
+
+def _payload() -> dict:
+  return {
+    "coordinateSystem": "normalized",
+    "video": {"width": 1280, "height": 720, "fps": 29.97},
+    "processingMeta": {"detector": "yolov8n", "tracker": "single-target-iou"},
+    "frameDetections": [
+      {"tMs": 0, "bbox": {"x": 0.1, "y": 0.2, "w": 0.3, "h": 0.4}, "conf": 0.9, "carried": False},
+      {"tMs": 100, "bbox": None, "conf": None, "carried": False},
+      {
+        "tMs": 200,
+        "bbox": {"x": 1 / 3, "y": 0.2, "w": 0.3, "h": 0.4},
+        "conf": 0.9,
+        "carried": True,
+      },
+    ],
+    "trackPoints": [
+      {"tMs": 0, "trackId": 1, "cx": 0.25, "cy": 0.4, "quality": "measured"},
+      {"tMs": 100, "trackId": 1, "cx": 0.3, "cy": 0.4, "quality": "interpolated"},
+      {"tMs": 200, "trackId": 1, "cx": 1 / 3 + 0.15, "cy": 0.4, "quality": "measured"},
+    ],
+    "derivedMetrics": {"coverage": 1.0, "gapCount": 0, "longestGapMs": 0, "distance": 0.2},
+  }
+
+
+def test_binary_results_round_trip_and_map_columns(tmp_path: Path) -> None:
+  path = tmp_path / "instructor-tracking.bin"
+  payload = _payload()
+  write_tracking_binary(payload, path)
+
+  assert path.read_bytes()[:4] == MAGIC
+  results = TrackingBinary.open(path)
+  assert isinstance(results.columns["points.cx"], np.memmap)
+  for column in results.columns.values():
+    assert column.ctypes.data % 8 == 0
+  assert results.columns["frames.bbox"].shape == (3, 4)
+  assert results.columns["points.quality"].tolist() == [0, 2, 0]
+  # Exact round trip, including None boxes and full float precision.
+  assert results.to_payload() == payload
+  assert json.dumps(results.to_payload()) == json.dumps(payload)
+
+  empty = {**payload, "frameDetections": [], "trackPoints": []}
+  write_tracking_binary(empty, path)
+  assert TrackingBinary.open(path).to_payload() == empty
+
+
+def test_window_and_lttb_downsampling() -> None:
+  count = 10_000
+  t_ms = np.arange(count, dtype=np.int64) * 100
+  cx = np.full(count, 0.5)
+  cx[5_000] = 0.9  # a single spike must survive downsampling
+  payload = {
+    **_payload(),
+    "frameDetections": [
+      {"tMs": int(t), "bbox": None, "conf": None, "carried": False} for t in t_ms
+    ],
+    "trackPoints": [
+      {"tMs": int(t), "trackId": 1, "cx": float(x), "cy": 0.4, "quality": "measured"}
+      for t, x in zip(t_ms, cx)
+    ],
+  }
+  columns = payload_columns(payload)
+
+  windowed, summary = window_columns(columns, from_ms=1_000, to_ms=2_000)
+  assert windowed["points.tMs"].tolist() == list(range(1_000, 2_001, 100))
+  assert windowed["frames.tMs"].tolist() == windowed["points.tMs"].tolist()
+  assert summary == {
+    "fromMs": 1_000,
+    "toMs": 2_000,
+    "totalPoints": 11,
+    "returnedPoints": 11,
+    "downsampled": False,
+  }
+
+  sampled, summary = window_columns(columns, max_points=100)
+  assert summary["returnedPoints"] == 100 and summary["downsampled"]
+  assert sampled["points.tMs"][0] == 0 and sampled["points.tMs"][-1] == t_ms[-1]
+  assert 0.9 in sampled["points.cx"]
+  assert np.all(np.diff(sampled["points.tMs"]) > 0)
+  assert sampled["frames.tMs"].tolist() == sampled["points.tMs"].tolist()
+
+
+def _sequential_lttb(x: np.ndarray, ys: list[np.ndarray], threshold: int) -> list[int]:
+  """Textbook LTTB, one bucket at a time."""
+  edges = np.linspace(1, len(x) - 1, threshold - 1).astype(np.int64)
+  selected = [0]
+  for bucket in range(threshold - 2):
+    start, end = edges[bucket], edges[bucket + 1]
+    next_end = edges[bucket + 2] if bucket + 2 < len(edges) else len(x)
+    a = selected[-1]
+    cx = x[end:next_end].mean()
+    area = sum(
+      np.abs(
+        (x[a] - cx) * (y[start:end] - y[a])
+        - (x[a] - x[start:end]) * (y[end:next_end].mean() - y[a])
+      )
+      for y in ys
+    )
+    selected.append(int(start + np.argmax(area)))
+  return selected + [len(x) - 1]
+
+
+def test_vectorized_lttb_matches_sequential() -> None:
+  rng = np.random.default_rng(7)
+  for count, threshold in ((50, 3), (1_000, 37), (5_000, 900), (20_000, 6_000)):
+    x = np.cumsum(rng.integers(1, 200, count)).astype(np.float64)
+    ys = [np.cumsum(rng.normal(0, 0.01, count)) for _ in range(2)]
+    assert lttb_indices(x, ys, threshold).tolist() == _sequential_lttb(x, ys, threshold)
+
+
+def test_published_results_are_served_pre_compressed_with_etags(tmp_path: Path) -> None:
+  payload = _payload()
+  publish_results(tmp_path, payload=payload)
+  path = tmp_path / TRACKING_RESPONSE
+  body = {"version": "v1", "data": payload}
+  assert json.loads(path.read_bytes()) == body
+  assert gzip.decompress((tmp_path / (TRACKING_RESPONSE + ".gz")).read_bytes()) == (
+    path.read_bytes()
+  )
+  assert (tmp_path / TRACKING_BINARY).is_file()
+
+  app = FastAPI()
+
+  @app.get("/results")
+  def results(request: Request):
+    return http_cache.cached_file_response(request, path, "application/json", "1:v")
+
+  client = TestClient(app)
+  first = client.get("/results", headers={"Accept-Encoding": "gzip"})
+  assert first.status_code == 200
+  assert first.headers["content-encoding"] == "gzip"
+  assert first.json() == body
+  etag = first.headers["etag"]
+
+  again = client.get("/results", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+  assert again.status_code == 304
+  assert again.content == b""
+
+  # Each encoding is its own representation with its own tag.
+  plain = client.get("/results", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+  assert plain.status_code == 200
+  assert "content-encoding" not in plain.headers
+  assert plain.headers["etag"] != etag
@@ -1,15 +1,17 @@
 import { useRef } from 'react';
 
-const VideoUploadDropzone = ({ file, onFileChange }) => {
+const VideoUploadDropzone = ({ file, onFileChange, disabled = false }) => {
   const fileInputRef = useRef(null);
 
   const handleFile = (selectedFile) => {
-    if (!selectedFile) return;
+    // The file cannot change while its chunks are being uploaded.
+    if (!selectedFile || disabled) return;
     onFileChange(selectedFile);
   };
 
   const onDrop = (event) => {
     event.preventDefault();
+    if (disabled) return;
     const dropped = event.dataTransfer.files?.[0];
     handleFile(dropped);
   };
@@ -19,8 +21,9 @@ const VideoUploadDropzone = ({ file, onFileChange }) => {
       className="video-dropzone"
       onDrop={onDrop}
       onDragOver={(event) => event.preventDefault()}
-      onClick={() => fileInputRef.current?.click()}
+      onClick={() => !disabled && fileInputRef.current?.click()}
       role="button"
+      aria-disabled={disabled}
       tabIndex={0}
     >
       <input
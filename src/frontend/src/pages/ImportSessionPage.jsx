@@ -4,7 +4,7 @@ import { Link, useNavigate } from 'react-router-dom';
 import VideoUploadDropzone from '../components/sessions/VideoUploadDropzone';
 import SessionMetadataForm from '../components/sessions/SessionMetadataForm';
 import UploadProgressBar from '../components/sessions/UploadProgressBar';
-import { importSession } from '../services/sessions';
+import { importSessionResumable } from '../services/sessions';
 
 const ImportSessionPage = () => {
   const navigate = useNavigate();
@@ -17,6 +17,7 @@ const ImportSessionPage = () => {
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
   const [statusLabel, setStatusLabel] = useState('');
+  const [uploadProgress, setUploadProgress] = useState(0);
   const canSubmit = Boolean(file) && !submitting;
 
   const updateMetadata = (key, value) => {
@@ -32,18 +33,21 @@ const ImportSessionPage = () => {
 
     setSubmitting(true);
     setError('');
-    setStatusLabel('Uploading session and creating processing job...');
-
-    const formData = new FormData();
-    formData.append('video', file);
-    formData.append('metadata', JSON.stringify(metadata));
+    setStatusLabel('Uploading recording...');
 
     try {
-      const result = await importSession(formData);
+      // Uploads in chunks; after a failure, submitting again resumes where it stopped.
+      const result = await importSessionResumable(file, metadata, {
+        onProgress: (fraction) => {
+          setUploadProgress(Math.round(fraction * 100));
+          if (fraction >= 1) setStatusLabel('Creating processing job...');
+        },
+      });
       setStatusLabel('Processing job created. Redirecting...');
       navigate(`/jobs/${result.jobId}`);
     } catch (submitError) {
-      setError(submitError.message || 'Unable to import session.');
+      const message = submitError.message || 'Unable to import session.';
+      setError(`${message} Start processing again to resume the upload.`);
       setStatusLabel('');
     } finally {
       setSubmitting(false);
@@ -64,7 +68,7 @@ const ImportSessionPage = () => {
       <form className="import-form import-session-form" onSubmit={onSubmit}>
         <div className="page-panel sessions-page-panel import-panel">
           <h2>Upload Recording</h2>
-          <VideoUploadDropzone file={file} onFileChange={setFile} />
+          <VideoUploadDropzone file={file} onFileChange={setFile} disabled={submitting} />
           <p className="helper-text import-dropzone-hint">
             {file
               ? `Selected file: ${file.name} (${Math.round(file.size / 1024 / 1024)} MB)`
@@ -77,7 +81,12 @@ const ImportSessionPage = () => {
           <SessionMetadataForm metadata={metadata} onChange={updateMetadata} />
         </div>
 
-        {submitting ? <UploadProgressBar progress={65} label={statusLabel} /> : null}
+        {submitting ? (
+          <UploadProgressBar
+            progress={uploadProgress}
+            label={`${statusLabel} ${uploadProgress}%`}
+          />
+        ) : null}
         {statusLabel && !error && !submitting ? (
           <p className="import-status-label">{statusLabel}</p>
         ) : null}
@@ -1,3 +1,5 @@
+import { TRACKING_COLUMNS_MEDIA_TYPE } from './trackingColumns';
+
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ?? '';
 
 export class ApiError extends Error {
@@ -16,6 +18,9 @@ const parseResponse = async (response) => {
   if (contentType.includes('application/json')) {
     return response.json();
   }
+  if (contentType.includes(TRACKING_COLUMNS_MEDIA_TYPE)) {
+    return response.arrayBuffer();
+  }
   const text = await response.text();
   return text ? { message: text } : null;
 };
@@ -35,7 +40,7 @@ const request = async (method, path, options = {}) => {
   const requestHeaders = { ...headers };
   let requestBody = body;
 
-  if (body && !(body instanceof FormData)) {
+  if (body && !(body instanceof FormData) && !(body instanceof Blob)) {
     requestHeaders['Content-Type'] = 'application/json';
     requestBody = JSON.stringify(body);
   }
@@ -63,4 +68,6 @@ const request = async (method, path, options = {}) => {
 export const get = (path, options) => request('GET', path, options);
 export const post = (path, body, options = {}) =>
   request('POST', path, { ...options, body });
+export const put = (path, body, options = {}) =>
+  request('PUT', path, { ...options, body });
 export const del = (path, options) => request('DELETE', path, options);
@@ -1,5 +1,7 @@
-import { del, get, post } from './apiClient';
+import { ApiError, del, get, post } from './apiClient';
 import { createMockJob, getMockJobsSnapshot } from './jobs';
+import { hasPendingUpload, uploadVideoResumable } from './uploads';
+import { decodeTrackingColumns, TRACKING_COLUMNS_MEDIA_TYPE } from './trackingColumns';
 import { exampleSessionDetail, exampleSessionsList } from '../types/analytics';
 
 const buildDefaultTracking = (videoWidth = 1280, videoHeight = 720) => {
@@ -126,8 +128,13 @@ export const getSession = async (sessionId) => {
     // Fetch tracking results separately if available
     if (data?.hasInstructorTrackingResult) {
       try {
-        const trackingData = await get(`/sessions/${sessionId}/results/instructor-tracking`);
-        resource.tracking = trackingData?.data ?? null;
+        const trackingData = await get(`/sessions/${sessionId}/results/instructor-tracking`, {
+          headers: { Accept: `${TRACKING_COLUMNS_MEDIA_TYPE}, application/json;q=0.9` },
+        });
+        resource.tracking =
+          trackingData instanceof ArrayBuffer
+            ? decodeTrackingColumns(trackingData)
+            : trackingData?.data ?? null;
       } catch (_trackingError) {
         // Tracking endpoint failed, leave tracking as null
         resource.tracking = null;
@@ -207,6 +214,22 @@ export const getSession = async (sessionId) => {
   }
 };
 
+export const importSessionResumable = async (file, metadata, options = {}) => {
+  const pending = hasPendingUpload(file);
+  try {
+    const data = await uploadVideoResumable(file, metadata, options);
+    return { jobId: data?.jobId, sessionId: data?.sessionId };
+  } catch (error) {
+    // Backend unreachable before anything was uploaded: fall back to a mock job like
+    // importSession. Otherwise surface the error so the upload can be resumed.
+    if (pending || hasPendingUpload(file) || !(error instanceof ApiError) || error.status !== 0) {
+      throw error;
+    }
+    const mockJob = createMockJob({ ...metadata, fileName: file.name });
+    return { jobId: mockJob.id, sessionId: mockJob.sessionId };
+  }
+};
+
 export const importSession = async (formData) => {
   try {
     const data = await post('/sessions/import', formData);
@@ -0,0 +1,64 @@
+// Decoder for the columnar tracking results format served by
+// GET /sessions/{id}/results/instructor-tracking when requested via Accept
+// (see src/backend/app/processing/tracking_binary.py for the layout).
+
+export const TRACKING_COLUMNS_MEDIA_TYPE = 'application/vnd.instructor-tracking.columns';
+
+const MAGIC = 'ITRK';
+const FORMAT_VERSION = 1;
+const PREAMBLE_BYTES = 12;
+
+const readColumn = (buffer, spec) => {
+  const count = spec.shape.reduce((total, size) => total * size, 1);
+  switch (spec.dtype) {
+    case '<f8':
+      return new Float64Array(buffer, spec.offset, count);
+    case '<i8':
+      return Array.from(new BigInt64Array(buffer, spec.offset, count), Number);
+    case '<i4':
+      return new Int32Array(buffer, spec.offset, count);
+    case '|u1':
+      return new Uint8Array(buffer, spec.offset, count);
+    default:
+      throw new Error(`Unsupported tracking column dtype ${spec.dtype}`);
+  }
+};
+
+export const decodeTrackingColumns = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC || view.getUint32(4, true) !== FORMAT_VERSION) {
+    throw new Error('Unsupported tracking results format');
+  }
+  const headerLength = view.getUint32(8, true);
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_BYTES, headerLength)),
+  );
+  const { columns: specs, qualityNames, derivedMetrics, ...rest } = header;
+  const columns = Object.fromEntries(
+    Object.entries(specs).map(([name, spec]) => [name, readColumn(buffer, spec)]),
+  );
+
+  const bbox = columns['frames.bbox'];
+  const conf = columns['frames.conf'];
+  const frameDetections = columns['frames.tMs'].map((tMs, index) => {
+    const x = bbox[index * 4];
+    return {
+      tMs,
+      bbox: Number.isNaN(x)
+        ? null
+        : { x, y: bbox[index * 4 + 1], w: bbox[index * 4 + 2], h: bbox[index * 4 + 3] },
+      conf: Number.isNaN(conf[index]) ? null : conf[index],
+      carried: columns['frames.carried'][index] === 1,
+    };
+  });
+  const trackPoints = columns['points.tMs'].map((tMs, index) => ({
+    tMs,
+    trackId: columns['points.trackId'][index],
+    cx: columns['points.cx'][index],
+    cy: columns['points.cy'][index],
+    quality: qualityNames[columns['points.quality'][index]],
+  }));
+
+  return { ...rest, frameDetections, trackPoints, derivedMetrics };
+};
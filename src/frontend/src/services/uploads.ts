@@ -0,0 +1,96 @@
+// Resumable video uploads (POST /uploads, PUT /uploads/{id}?offset=, POST /uploads/{id}/complete).
+// Chunks that fail are retried from the server's offset instead of restarting the file, and the
+// upload id is remembered per file so a retry after an error or a page reload continues it.
+
+import { ApiError, get, post, put } from './apiClient';
+
+const UPLOADS_STORAGE_KEY = 'frontend_resumable_uploads_v1';
+const MAX_CHUNK_RETRIES = 5;
+const RETRY_BASE_DELAY_MS = 1000;
+
+const fileKey = (file) => `${file.name}:${file.size}:${file.lastModified}`;
+
+const readSavedUploads = () => {
+  try {
+    const raw = localStorage.getItem(UPLOADS_STORAGE_KEY);
+    return raw ? JSON.parse(raw) : {};
+  } catch (_error) {
+    return {};
+  }
+};
+
+const saveUploadId = (file, uploadId) => {
+  const saved = readSavedUploads();
+  if (uploadId) {
+    saved[fileKey(file)] = uploadId;
+  } else {
+    delete saved[fileKey(file)];
+  }
+  localStorage.setItem(UPLOADS_STORAGE_KEY, JSON.stringify(saved));
+};
+
+export const hasPendingUpload = (file) => Boolean(readSavedUploads()[fileKey(file)]);
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const resumeOrCreate = async (file, metadata, signal) => {
+  const savedId = readSavedUploads()[fileKey(file)];
+  if (savedId) {
+    try {
+      return await get(`/uploads/${savedId}`, { signal });
+    } catch (error) {
+      if (!(error instanceof ApiError) || error.status !== 404) throw error;
+    }
+  }
+  const upload = await post(
+    '/uploads',
+    { filename: file.name, size: file.size, metadata },
+    { signal },
+  );
+  saveUploadId(file, upload.uploadId);
+  return upload;
+};
+
+export const uploadVideoResumable = async (file, metadata, { onProgress, signal } = {}) => {
+  const upload = await resumeOrCreate(file, metadata, signal);
+  const { uploadId, chunkSize } = upload;
+  let { offset } = upload;
+  let failures = 0;
+  onProgress?.(offset / file.size);
+
+  while (offset < file.size) {
+    const chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+    try {
+      const status = await put(`/uploads/${uploadId}?offset=${offset}`, chunk, {
+        headers: { 'Content-Type': 'application/octet-stream' },
+        signal,
+      });
+      offset = status.offset;
+      failures = 0;
+      onProgress?.(offset / file.size);
+    } catch (error) {
+      if (signal?.aborted) throw error;
+      if (error.status === 404) {
+        // Aborted or expired on the server: the next attempt starts a new upload.
+        saveUploadId(file, null);
+        throw error;
+      }
+      failures += 1;
+      if (failures > MAX_CHUNK_RETRIES) throw error;
+      if (error.status !== 409) {
+        await sleep(RETRY_BASE_DELAY_MS * 2 ** (failures - 1));
+      }
+      try {
+        // Part of the chunk may have landed; continue from what the server has.
+        ({ offset } = await get(`/uploads/${uploadId}`, { signal }));
+        onProgress?.(offset / file.size);
+      } catch (_statusError) {
+        // Keep the current offset; if it is stale the next PUT gets a 409 and resyncs.
+      }
+    }
+  }
+
+  const result = await post(`/uploads/${uploadId}/complete`, {}, { signal });
+  saveUploadId(file, null);
+  return result;
+};
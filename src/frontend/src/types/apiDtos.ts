@@ -13,6 +13,19 @@ export interface JobDto {
   updatedAt: string;
   sessionId?: string;
   error?: string;
+  framesProcessed?: number;
+  frameCount?: number;
+  framesPerSecond?: number;
+  etaSeconds?: number;
+}
+
+export interface TrackingSummaryDto {
+  version: string;
+  frameCount: number;
+  pointCount: number;
+  byteSize: number;
+  derivedMetrics?: Record<string, unknown>;
+  createdAt: string;
 }
 
 export interface SessionResourceDto {
@@ -25,4 +38,6 @@ export interface SessionResourceDto {
   tracking?: Record<string, unknown>;
   processing?: Record<string, unknown>;
   relatedJobId?: string;
+  hasInstructorTrackingResult?: boolean;
+  trackingSummary?: TrackingSummaryDto;
 }
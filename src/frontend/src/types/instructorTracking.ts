@@ -17,6 +17,8 @@ export interface FrameDetection {
   tMs: number;
   bbox: BBox | null;
   conf?: number | null;
+  /** True when the detector was skipped (static frame) and the previous box was reused. */
+  carried?: boolean;
 }
 
 export interface TrackPoint {